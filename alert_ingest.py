@@ -0,0 +1,341 @@
+"""Concurrent multi-source alert ingestion: first arrival wins.
+
+The same whale_alert post reaches us through several feeds (nitter mirrors
+as HTML or RSS, JSON feeds, a local webhook), each with its own lag and
+outages.  ``MultiSourceIngest`` polls every source from its own thread
+(sources sharing an interval are staggered across it), reduces each new item
+to a canonical key and forwards only the first copy of every alert:
+
+    key  (alert type, coin, rounded amount, canonical from, canonical to)
+    tx   (chain, hash) of the whale-alert.io transaction link, when present
+
+Copies seen within ``window`` seconds are duplicates when the keys match and
+the tx hashes do not contradict each other (two equal-looking transfers with
+different hashes are two alerts).  Later copies only feed the per-source
+stats: wins, lag behind the winner, post -> arrival lag and fetch time.
+With ``seen_path`` each polled source keeps its seen ids in its own file
+next to it (``whale_flow_seen.<source>.json``), so after a restart every
+cursor resumes where it stopped instead of re-priming on the current page.
+
+    ingest = MultiSourceIngest(mirror_sources([url, url + "/rss"]) + [JsonFeedSource(feed)])
+    ingest.start()
+    for alert in ingest.poll(timeout=1):
+        ...
+"""
+import os
+import re
+import json
+import time
+import queue
+import logging
+import threading
+from collections import deque, OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import requests
+
+from alert_parser import parse_alert
+from entity_registry import REGISTRY
+from timeline_source import HttpTimelineSource, TimelineCursor, SeenIds, USER_AGENT
+from timestamp_normalizer import snowflake_ms
+from tracing import summarize
+
+logger = logging.getLogger(__name__)
+
+TX_LINK_RE = re.compile(r'whale-alert\.io/transaction/([A-Za-z0-9_-]+)/([0-9A-Za-z]+)')
+HEX_RE = re.compile(r'(0x)?[0-9a-fA-F]+')
+
+
+def tx_ref(item):
+    """``(chain, hash)`` of the whale-alert.io transaction an item links to, or None."""
+    for url in list(item.get("urls") or []) + [item.get("text") or ""]:
+        m = TX_LINK_RE.search(url)
+        if m:
+            chain, tx = m.group(1).lower(), m.group(2)
+            # hex hashes come in either case; base58 ones (Solana, ...) are case-sensitive
+            return chain, tx.lower() if HEX_RE.fullmatch(tx) else tx
+    return None
+
+
+def alert_key(item):
+    """Canonical ``(key, tx)`` of an item; unparseable texts key on their normalised words."""
+    alert = parse_alert(item.get("text") or "")
+    if alert is None:
+        words = re.sub(r'\S*…|https?://\S+|[^\w\s#.,]', "", item.get("text") or "").split()
+        return ("text", " ".join(words).lower()), tx_ref(item)
+    sides = tuple(REGISTRY.lookup(alert[side])[0] or "unknown" for side in ("from_entity", "to_entity"))
+    return (alert["alert_type"], alert["currency"].upper(), round(alert["amount"] or 0)) + sides, tx_ref(item)
+
+
+def json_item(entry):
+    """Timeline item dict for one JSON feed entry.
+
+    Entries either carry the alert ``text`` (plus optional ``id``/``link``) or
+    are structured like the whale-alert.io API (``symbol``, ``amount``,
+    ``amount_usd``, ``from``/``to`` with ``owner``, ``blockchain``, ``hash``,
+    ``timestamp``), in which case the tweet text is rebuilt from the fields.
+    """
+    urls = [u for u in (entry.get("link"), entry.get("url")) if u]
+    if entry.get("text"):
+        text = entry["text"]
+    else:
+        def side(s):
+            owner = (entry.get(s) or {}).get("owner")
+            return f"#{owner}" if owner and owner != "unknown" else "unknown wallet"
+        action = {"mint": f"minted at {side('to')}",
+                  "burn": f"burned at {side('from')}"}.get(entry.get("transaction_type"),
+                                                          f"transferred from {side('from')} to {side('to')}")
+        text = f"{entry['amount']:,.0f} #{entry['symbol'].upper()} ({entry.get('amount_usd', 0):,.0f} USD) {action}"
+        if entry.get("hash") and entry.get("blockchain"):
+            urls.append(f"https://whale-alert.io/transaction/{entry['blockchain']}/{entry['hash']}")
+    posted = entry.get("timestamp")
+    return {"id": str(entry.get("id") or entry.get("hash") or ""), "text": text, "timestamp_text": None,
+            "link": entry.get("link"), "urls": urls, "pinned": False, "retweet": False,
+            "posted_ms": posted * 1000 if isinstance(posted, (int, float)) else None}
+
+
+class JsonFeedSource:
+    """Poll a JSON endpoint returning a list of alerts (or ``{items_key: [...]}``)."""
+
+    def __init__(self, url, name=None, items_key="transactions", timeout=10, session=None):
+        self.url = url
+        self.name = name or urlparse(url).netloc
+        self.items_key = items_key
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers.setdefault("User-Agent", USER_AGENT)
+        self.last_fetch_ms = None
+        self.last_parse_ms = None
+
+    def fetch(self):
+        t0 = time.perf_counter()
+        resp = self.session.get(self.url, timeout=self.timeout)
+        t1 = time.perf_counter()
+        self.last_fetch_ms = (t1 - t0) * 1000
+        resp.raise_for_status()
+        data = resp.json()
+        entries = (data.get(self.items_key) or []) if isinstance(data, dict) else data
+        # feeds list oldest first; timeline sources return newest first
+        items = [json_item(e) for e in reversed(entries)]
+        self.last_parse_ms = (time.perf_counter() - t1) * 1000
+        return items
+
+    def close(self):
+        self.session.close()
+
+
+class WebhookSource:
+    """Accept alerts POSTed as JSON (one entry or a list, see ``json_item``) on a local port."""
+
+    def __init__(self, port, host="127.0.0.1", name="webhook"):
+        self.port = port
+        self.host = host
+        self.name = name
+        self.last_fetch_ms = 0.0
+        self.last_parse_ms = 0.0
+        self._server = None
+
+    def listen(self, callback):
+        """Start serving; ``callback(items)`` runs on the request thread for every POST."""
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                try:
+                    data = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+                    entries = data if isinstance(data, list) else [data]
+                    callback([json_item(e) for e in entries])
+                except (ValueError, KeyError, TypeError) as e:
+                    self.send_error(400, str(e))
+                    return
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_port
+        threading.Thread(target=self._server.serve_forever, name=f"ingest-{self.name}", daemon=True).start()
+
+    def close(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def mirror_sources(urls, timeout=10):
+    """One ``HttpTimelineSource`` per nitter URL (HTML or ``/rss``), named after host and feed."""
+    sources = []
+    for url in urls:
+        src = HttpTimelineSource(url, timeout=timeout)
+        parsed = urlparse(url)
+        src.name = parsed.netloc + ("/rss" if parsed.path.rstrip("/").endswith("/rss") else "")
+        sources.append(src)
+    return sources
+
+
+class MultiSourceIngest:
+    """Poll several alert sources concurrently and forward the first copy of each alert."""
+
+    name = "multi"
+
+    def __init__(self, sources, interval=10, intervals=None, window=3600, max_backoff=120,
+                 poll_timeout=1.0, stats_window=1000, seen_path=None):
+        self.sources = {src.name: src for src in sources}
+        if len(self.sources) != len(sources):
+            raise ValueError("Alert sources need distinct names")
+        self.interval = interval
+        self.intervals = intervals or {}
+        self.window = window
+        self.max_backoff = max_backoff
+        self.poll_timeout = poll_timeout
+        self.seen_path = seen_path
+        self.stats = {name: {"polls": 0, "errors": 0, "items": 0, "wins": 0, "late": 0}
+                      for name in self.sources}
+        self._samples = {name: {k: deque(maxlen=stats_window) for k in ("fetch_ms", "lag_ms", "post_lag_ms")}
+                         for name in self.sources}
+        self.forwarded = 0
+        self.last_fetch_ms = 0.0
+        self.last_parse_ms = 0.0
+        self._by_key = {}
+        self._by_tx = {}
+        self._entries = OrderedDict()      # id(entry) -> entry, oldest first
+        self._out = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        by_interval = {}
+        for name, src in self.sources.items():
+            if hasattr(src, "listen"):
+                src.listen(lambda items, name=name: self.receive(name, items))
+                continue
+            interval = self.intervals.get(name, self.interval)
+            group = by_interval.setdefault(interval, [])
+            group.append(name)
+        for interval, names in by_interval.items():
+            for i, name in enumerate(names):
+                t = threading.Thread(target=self._run, args=(name, interval, interval * i / len(names)),
+                                     name=f"ingest-{name}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _seen(self, name):
+        if not self.seen_path:
+            return SeenIds()
+        root, ext = os.path.splitext(self.seen_path)
+        return SeenIds(f"{root}.{re.sub(r'[^A-Za-z0-9.-]+', '_', name)}{ext or '.json'}")
+
+    def _run(self, name, interval, offset):
+        src = self.sources[name]
+        cursor = TimelineCursor(src, self._seen(name))
+        delay = offset
+        while not self._stop.wait(delay):
+            try:
+                items = cursor.poll()
+                with self._lock:
+                    self.stats[name]["polls"] += 1
+                    if src.last_fetch_ms is not None:
+                        self._samples[name]["fetch_ms"].append(src.last_fetch_ms)
+                self.receive(name, items)
+                delay = interval
+            except Exception as e:
+                with self._lock:
+                    self.stats[name]["errors"] += 1
+                delay = min(max(delay, interval) * 2, self.max_backoff)
+                logger.warning(f"{name} fetch failed: {e}. Retry in {delay:.0f}s")
+
+    def _expire(self, now_ms):
+        cutoff = now_ms - self.window * 1000
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if entry["first_ms"] >= cutoff:
+                break
+            self._entries.popitem(last=False)
+            same = self._by_key.get(entry["key"], [])
+            if entry in same:
+                same.remove(entry)
+            if not same:
+                self._by_key.pop(entry["key"], None)
+            if entry["tx"]:
+                self._by_tx.pop(entry["tx"], None)
+
+    def _find(self, key, tx):
+        if tx and tx in self._by_tx:
+            return self._by_tx[tx]
+        for entry in self._by_key.get(key, ()):
+            if entry["tx"] is None or tx is None or entry["tx"] == tx:
+                return entry
+        return None
+
+    def receive(self, name, items):
+        """Dedupe new items (oldest first) from source ``name`` and queue the first arrivals."""
+        now = time.time() * 1000
+        with self._lock:
+            self._expire(now)
+            stats, samples = self.stats[name], self._samples[name]
+            stats["items"] += len(items)
+            for item in items:
+                if item.get("retweet"):
+                    continue
+                posted = item.get("posted_ms") or snowflake_ms(item.get("id"))
+                if posted:
+                    samples["post_lag_ms"].append(now - posted)
+                key, tx = alert_key(item)
+                entry = self._find(key, tx)
+                if entry is not None:
+                    if tx and entry["tx"] is None:
+                        entry["tx"] = tx
+                        self._by_tx[tx] = entry
+                    if name not in entry["sources"]:
+                        entry["sources"][name] = now
+                        stats["late"] += 1
+                        samples["lag_ms"].append(now - entry["first_ms"])
+                    continue
+                entry = {"key": key, "tx": tx, "first_ms": now, "source": name, "sources": {name: now}}
+                self._entries[id(entry)] = entry
+                self._by_key.setdefault(key, []).append(entry)
+                if tx:
+                    self._by_tx[tx] = entry
+                stats["wins"] += 1
+                self.forwarded += 1
+                self._out.put(dict(item, source=name, arrived_ms=now, key=key, tx=tx))
+
+    def poll(self, timeout=None):
+        """Alerts forwarded since the last call, oldest first; waits up to ``timeout`` s for the first."""
+        timeout = self.poll_timeout if timeout is None else timeout
+        try:
+            alerts = [self._out.get(timeout=timeout) if timeout else self._out.get_nowait()]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                alerts.append(self._out.get_nowait())
+            except queue.Empty:
+                break
+        src = self.sources[alerts[-1]["source"]]
+        self.last_fetch_ms = src.last_fetch_ms or 0.0
+        self.last_parse_ms = src.last_parse_ms or 0.0
+        return alerts
+
+    def source_stats(self):
+        """Per-source counters, win rate, coverage and lag percentiles (ms)."""
+        out = {}
+        with self._lock:
+            for name, stats in self.stats.items():
+                seen = stats["wins"] + stats["late"]
+                row = dict(stats, win_rate=stats["wins"] / seen if seen else None,
+                           coverage=seen / self.forwarded if self.forwarded else None)
+                for metric, values in self._samples[name].items():
+                    s = summarize(list(values))
+                    row.update({f"{metric}_{k}": s[k] for k in ("p50", "p90") if k in s})
+                out[name] = row
+        return out
+
+    def close(self):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=5)
+        for src in self.sources.values():
+            src.close()
@@ -0,0 +1,71 @@
+"""Single-pass parser for whale_alert tweets, shared by the scraper and the bot.
+
+One precompiled regex pulls amount, coin, USD value, source/destination and
+the alert type out of texts such as::
+
+    🚨 600 #BTC (58,201,509 USD) transferred from #Binance to #Bitfinex
+    🔥 50,000,000 #USDC (49,991,250 USD) burned at USDC Treasury
+    🔓 20,000,000 #XRP (42,424,604 USD) unlocked from escrow at #Ripple
+    An address with a balance of 1,000,000 #USDT (1,000,000 USD) has just been frozen!
+
+Entities lose their leading ``#``.  Mints, burns and escrow moves have only
+one entity, so the other side is filled with "mint", "burn" or "escrow".
+"""
+import re
+
+ALERT_TYPES = ("transfer", "mint", "burn", "lock", "unlock", "freeze", "activate", "fee")
+
+_ENTITY = r"[^\n]*?\S"      # '#Binance', 'unknown new wallet', 'Tether Treasury', 'Crypto.com'
+
+ALERT_RE = re.compile(
+    r"(?P<amount>\d[\d,]*(?:\.\d+)?)\s+\#(?P<coin>[A-Za-z0-9]+)"
+    r"(?:\s+\((?P<usd>[\d,]+(?:\.\d+)?)\s+USD\))?"
+    r"(?:\s+(?:"
+    rf"(?:transferred\s+from\s+(?P<src>{_ENTITY})\s+to\s+(?P<dst>{_ENTITY})"
+    rf"|(?P<mint>minted)\s+at\s+(?P<mint_at>{_ENTITY})"
+    rf"|(?P<burn>burned)\s+at\s+(?P<burn_at>{_ENTITY})"
+    rf"|(?P<lock>locked)\s+in\s+escrow\s+at\s+(?P<lock_at>{_ENTITY})"
+    rf"|(?P<unlock>unlocked)\s+from\s+escrow\s+at\s+(?P<unlock_at>{_ENTITY})"
+    r")(?=\s*(?:$|\n|[!,(]|\.\s*(?:$|\n)))"        # a '.' ends a name only at end of line: 'Crypto.com', 'Mt. Gox'
+    r"|has\s+just\s+been\s+(?P<event>frozen|activated|paid)"
+    r"))?"
+)
+
+
+def _entity(text):
+    return text.lstrip("#").strip() if text else "unknown"
+
+
+def parse_alert(text):
+    """Parse one alert text; returns a dict or None if it carries no amount/coin."""
+    m = ALERT_RE.search(text)
+    if not m:
+        return None
+    g = m.groupdict()
+    usd = g["usd"]
+
+    if g["src"] is not None:
+        alert_type, src, dst = "transfer", _entity(g["src"]), _entity(g["dst"])
+    elif g["mint"]:
+        alert_type, src, dst = "mint", "mint", _entity(g["mint_at"])
+    elif g["burn"]:
+        alert_type, src, dst = "burn", _entity(g["burn_at"]), "burn"
+    elif g["lock"]:
+        alert_type, src, dst = "lock", _entity(g["lock_at"]), "escrow"
+    elif g["unlock"]:
+        alert_type, src, dst = "unlock", "escrow", _entity(g["unlock_at"])
+    elif g["event"]:
+        alert_type = {"frozen": "freeze", "activated": "activate", "paid": "fee"}[g["event"]]
+        src = dst = "unknown"
+    else:
+        alert_type, src, dst = None, "unknown", "unknown"
+
+    return {
+        "amount": float(g["amount"].replace(",", "")),
+        "currency": g["coin"],
+        "usd_value": float(usd.replace(",", "")) if usd else None,
+        "from_entity": src,
+        "to_entity": dst,
+        "alert_type": alert_type,
+        "raw_text": text,
+    }
@@ -0,0 +1,146 @@
+"""Append-only CSV sink for scraped alerts.
+
+The scraper hands over every finished page; rows whose tweet id (taken from
+``tweet_link``) is already in the file are dropped, the rest are appended and
+flushed to disk, and only then is the page's "Load more" cursor saved in a
+sidecar JSON file.  A crash loses at most the page in flight, and a restart
+continues from the saved cursor without duplicating rows; a run that finishes
+clears the cursor so the next one starts from the timeline head again.
+"""
+import csv
+import json
+import logging
+import os
+import time
+
+from timeline_source import status_id
+
+logger = logging.getLogger(__name__)
+
+CSV_COLUMNS = ["amount", "currency", "usd_value", "from_entity", "to_entity", "raw_text",
+               "timestamp_text", "timestamp", "tweet_link", "alert_type", "from_type", "to_type"]
+
+
+class CsvAlertSink:
+    """Dedupe on tweet id and append pages of alert dicts to ``path``.
+
+    Rows are flushed after every page and fsynced at most every
+    ``fsync_interval`` seconds (0 = every page).  An existing file written
+    with an older header is rewritten once, on the first page, with the
+    missing ``CSV_COLUMNS`` added, so no scraped field is dropped.
+    """
+
+    def __init__(self, path="whale_alert_data.csv", cursor_path=None, fsync_interval=5.0):
+        self.path = path
+        self.cursor_path = cursor_path or os.path.splitext(path)[0] + ".cursor.json"
+        self.fsync_interval = fsync_interval
+        self.ids = set()
+        self.rows = 0
+        self.columns = CSV_COLUMNS
+        self.cursor = None
+        self.pages = 0
+        self._file = None
+        self._writer = None
+        self._last_fsync = 0.0
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                self.columns = reader.fieldnames
+                for row in reader:
+                    tid = status_id(row.get("tweet_link"))
+                    if tid:
+                        self.ids.add(tid)
+                    self.rows += 1
+            logger.info(f"{self.path}: {self.rows} rows, {len(self.ids)} tweet ids already stored")
+        if os.path.exists(self.cursor_path):
+            try:
+                with open(self.cursor_path) as f:
+                    state = json.load(f)
+                self.cursor = state.get("cursor")
+                self.pages = state.get("pages", 0)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not load cursor from {self.cursor_path}: {e}")
+
+    def __contains__(self, tid):
+        return tid in self.ids
+
+    def _upgrade_header(self):
+        missing = [c for c in CSV_COLUMNS if c not in self.columns]
+        if not missing:
+            return
+        columns = list(self.columns) + missing
+        tmp = self.path + ".tmp"
+        with open(self.path, newline="", encoding="utf-8") as src, \
+                open(tmp, "w", newline="", encoding="utf-8") as dst:
+            writer = csv.DictWriter(dst, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(csv.DictReader(src))
+        os.replace(tmp, self.path)
+        logger.info(f"{self.path}: added columns {', '.join(missing)}")
+        self.columns = columns
+
+    def _open(self):
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        if not new_file:
+            self._upgrade_header()
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction="ignore")
+        if new_file:
+            self._writer.writeheader()
+
+    def write_page(self, records, cursor=None):
+        """Append the unseen ``records`` of one page, then persist ``cursor``; returns rows written."""
+        if self._file is None:
+            self._open()
+        written = 0
+        for record in records:
+            tid = status_id(record.get("tweet_link"))
+            if tid in self.ids:
+                continue
+            if tid:
+                self.ids.add(tid)
+            self._writer.writerow(record)
+            written += 1
+        self.rows += written
+        self._file.flush()
+        if time.monotonic() - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_fsync = time.monotonic()
+        self.pages += 1
+        if cursor:
+            self.save_cursor(cursor)
+        return written
+
+    def save_cursor(self, cursor):
+        self.cursor = cursor
+        if self._file is not None:
+            # the rows behind a cursor must be on disk before the cursor itself
+            os.fsync(self._file.fileno())
+            self._last_fsync = time.monotonic()
+        tmp = self.cursor_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"cursor": cursor, "pages": self.pages, "rows": self.rows,
+                       "updated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}, f)
+        os.replace(tmp, self.cursor_path)
+
+    def clear_cursor(self):
+        """Forget the resume point once a run has finished."""
+        self.cursor = None
+        if os.path.exists(self.cursor_path):
+            os.remove(self.cursor_path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,418 @@
+"""SQLite alert store for long-running collection.
+
+The CSV repeats the full tweet text, entity strings and a text timestamp on
+every row, and the analyzer re-reads and re-parses all of it on every run.
+Here the hot ``alerts`` table keeps only integers and floats:
+
+    alerts      id, tweet_id, ts (epoch ms, UTC), coin, amount, usd_value,
+                from_entity, to_entity, alert_type (index into ALERT_TYPES)
+    alert_text  id -> raw_text, timestamp_text, tweet_link (read only on request)
+    coins       id -> symbol
+    entities    id -> name as it appears in the alert, canonical name, type code
+    meta        key -> value (the scraper's resume cursor)
+
+with indexes on ``(coin, ts)`` and ``(to_entity, ts)``.  Entity types live in
+the ``entities`` dimension, so a registry update only re-classifies that small
+table (``reclassify``).  ``query`` selects only the requested columns and lets
+the indexes pick the rows:
+
+    python alert_store.py migrate whale_alert_data.csv --db whale_alerts.db
+    python alert_store.py query --db whale_alerts.db --coin BTC --from-type unknown \\
+        --to-type exchange --min-usd 50e6 --start 2025-01-01 --end 2025-07-01
+
+An ``AlertStore`` can also stand in for ``alert_sink.CsvAlertSink`` as the
+scraper's sink: pages and their cursor are committed in one transaction.
+"""
+import os
+import json
+import time
+import sqlite3
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from alert_parser import ALERT_TYPES, parse_alert
+from entity_registry import REGISTRY, TYPE_CODE, ENTITY_TYPES
+from timeline_source import status_id
+from timestamp_normalizer import snowflake_times, to_utc
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS coins (id INTEGER PRIMARY KEY, symbol TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS entities (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE,
+                                     canonical TEXT, type INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY,
+    tweet_id INTEGER UNIQUE,
+    ts INTEGER NOT NULL,
+    coin INTEGER NOT NULL REFERENCES coins(id),
+    amount REAL,
+    usd_value REAL,
+    from_entity INTEGER NOT NULL REFERENCES entities(id),
+    to_entity INTEGER NOT NULL REFERENCES entities(id),
+    alert_type INTEGER
+);
+CREATE TABLE IF NOT EXISTS alert_text (id INTEGER PRIMARY KEY REFERENCES alerts(id),
+                                       raw_text TEXT, timestamp_text TEXT, tweet_link TEXT);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE INDEX IF NOT EXISTS alerts_coin_ts ON alerts(coin, ts);
+CREATE INDEX IF NOT EXISTS alerts_to_ts ON alerts(to_entity, ts);
+"""
+
+# frame column -> SQL expression; names follow the CSV layout
+ALERT_COLUMNS = {"tweet_id": "a.tweet_id", "timestamp": "a.ts", "currency": "a.coin", "amount": "a.amount",
+                 "usd_value": "a.usd_value", "from_entity": "a.from_entity", "to_entity": "a.to_entity",
+                 "alert_type": "a.alert_type"}
+TEXT_COLUMNS = {"raw_text": "t.raw_text", "timestamp_text": "t.timestamp_text", "tweet_link": "t.tweet_link"}
+TYPE_COLUMNS = {"from_type": "from_entity", "to_type": "to_entity"}     # derived from the entity dimension
+DEFAULT_COLUMNS = ("tweet_id", "timestamp", "currency", "amount", "usd_value", "from_entity", "to_entity",
+                   "alert_type", "from_type", "to_type")
+ALERT_TYPE_CODE = {name: code for code, name in enumerate(ALERT_TYPES)}
+
+
+def to_ms(value):
+    """Epoch ms for a datetime, date string or number (already ms)."""
+    if value is None or isinstance(value, (int, np.integer)):
+        return value
+    ts = pd.Timestamp(value)
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    return int(ts.value // 1_000_000)
+
+
+def _as_list(values):
+    return list(values) if isinstance(values, (list, tuple, set)) else [values]
+
+
+def _codes(values, mapping):
+    """Type filter (name, code or a list of them) as a list of codes."""
+    return [mapping[v] if isinstance(v, str) else v for v in _as_list(values)]
+
+
+class AlertStore:
+    """Alerts in SQLite with coin/entity dimensions and time indexes."""
+
+    def __init__(self, path="whale_alerts.db"):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self._coins = dict(self.db.execute("SELECT symbol, id FROM coins"))
+        self._entities = {name: eid for eid, name in self.db.execute("SELECT id, name FROM entities")}
+        self.cursor = self.get_meta("cursor")
+        self.rows = self.db.execute("SELECT COUNT(*) FROM alerts").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __len__(self):
+        return self.rows
+
+    def __contains__(self, tweet_id):
+        return self.db.execute("SELECT 1 FROM alerts WHERE tweet_id = ?", (int(tweet_id),)).fetchone() is not None
+
+    def get_meta(self, key):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_meta(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def _coin_ids(self, symbols):
+        new = [s for s in set(symbols) if s not in self._coins]
+        if new:
+            self.db.executemany("INSERT OR IGNORE INTO coins (symbol) VALUES (?)", [(s,) for s in new])
+            self._coins.update(self.db.execute(
+                f"SELECT symbol, id FROM coins WHERE symbol IN ({','.join('?' * len(new))})", new))
+        return [self._coins[s] for s in symbols]
+
+    def _entity_ids(self, names):
+        new = [n for n in set(names) if n not in self._entities]
+        if new:
+            rows = [(n, REGISTRY.lookup(n)[0], TYPE_CODE[REGISTRY.lookup(n)[1]]) for n in new]
+            self.db.executemany("INSERT OR IGNORE INTO entities (name, canonical, type) VALUES (?, ?, ?)", rows)
+            for chunk in range(0, len(new), 500):
+                part = new[chunk:chunk + 500]
+                self._entities.update((name, eid) for eid, name in self.db.execute(
+                    f"SELECT id, name FROM entities WHERE name IN ({','.join('?' * len(part))})", part))
+        return [self._entities[n] for n in names]
+
+    def reclassify(self, registry=REGISTRY):
+        """Re-resolve every stored entity name against ``registry``; returns the number changed."""
+        rows = self.db.execute("SELECT id, name, canonical, type FROM entities").fetchall()
+        changed = []
+        for eid, name, canonical, etype in rows:
+            new_canonical, new_type, _ = registry.lookup(name)
+            if (new_canonical, TYPE_CODE[new_type]) != (canonical, etype):
+                changed.append((new_canonical, TYPE_CODE[new_type], eid))
+        with self.db:
+            self.db.executemany("UPDATE entities SET canonical = ?, type = ? WHERE id = ?", changed)
+        return len(changed)
+
+    def insert_frame(self, df):
+        """Insert a frame in the CSV layout; rows already stored (same tweet id) are skipped.
+
+        ``timestamp`` is taken as UTC, falling back to the tweet-id snowflake;
+        parsed fields missing from a row are filled from its ``raw_text``, and
+        rows left without a time or a coin are dropped.  Returns rows inserted.
+        """
+        df = df.copy()
+        for col in ("amount", "currency", "usd_value", "from_entity", "to_entity", "alert_type",
+                    "raw_text", "timestamp_text", "timestamp", "tweet_link"):
+            if col not in df.columns:
+                df[col] = None
+        parsed_cols = ["amount", "currency", "usd_value", "from_entity", "to_entity", "alert_type"]
+        missing = df[parsed_cols].isna().any(axis=1) & df["raw_text"].notna()
+        if missing.any():
+            parsed = pd.DataFrame([parse_alert(t) or {} for t in df.loc[missing, "raw_text"]], index=df.index[missing])
+            for col in parsed_cols:
+                if col in parsed:
+                    df[col] = df[col].astype(object)
+                    df.loc[missing, col] = df.loc[missing, col].where(df.loc[missing, col].notna(), parsed[col])
+        ts = to_utc(df["timestamp"]) if df["timestamp"].notna().any() else pd.Series(pd.NaT, index=df.index)
+        ts = ts.fillna(snowflake_times(df["tweet_link"])) if ts.isna().any() else ts
+        keep = ts.notna() & df["currency"].notna()
+        if not keep.all():
+            logger.warning(f"Dropping {(~keep).sum()} rows without a timestamp or coin")
+            df, ts = df[keep], ts[keep]
+        if df.empty:
+            return 0
+
+        tweet_ids = [int(t) if t else None for t in map(status_id, df["tweet_link"].fillna(""))]
+        ts_ms = ts.values.astype("datetime64[ms]").astype(np.int64)
+        coins = self._coin_ids(df["currency"].astype(str).str.upper().tolist())
+        src = self._entity_ids(df["from_entity"].fillna("unknown").astype(str).tolist())
+        dst = self._entity_ids(df["to_entity"].fillna("unknown").astype(str).tolist())
+        types = [ALERT_TYPE_CODE.get(t) for t in df["alert_type"]]
+        amount = df["amount"].astype(float).tolist()
+        usd = df["usd_value"].astype(float).tolist()
+        texts = df[["raw_text", "timestamp_text", "tweet_link"]].astype(object).where(
+            df[["raw_text", "timestamp_text", "tweet_link"]].notna(), None).values.tolist()
+
+        inserted = 0
+        with self.db:
+            cur = self.db.cursor()
+            for i in range(len(df)):
+                cur.execute("INSERT OR IGNORE INTO alerts (tweet_id, ts, coin, amount, usd_value, from_entity, "
+                            "to_entity, alert_type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            (tweet_ids[i], int(ts_ms[i]), coins[i], None if amount[i] != amount[i] else amount[i],
+                             None if usd[i] != usd[i] else usd[i], src[i], dst[i], types[i]))
+                if cur.rowcount:
+                    cur.execute("INSERT INTO alert_text (id, raw_text, timestamp_text, tweet_link) "
+                                "VALUES (?, ?, ?, ?)", (cur.lastrowid, *texts[i]))
+                    inserted += 1
+        self.rows += inserted
+        return inserted
+
+    def write_page(self, records, cursor=None):
+        """Sink interface: store a page of alert dicts and its resume cursor in one transaction."""
+        written = self.insert_frame(pd.DataFrame(records)) if records else 0
+        if cursor:
+            with self.db:
+                self._set_meta("cursor", cursor)
+            self.cursor = cursor
+        return written
+
+    def save_cursor(self, cursor):
+        with self.db:
+            self._set_meta("cursor", cursor)
+        self.cursor = cursor
+
+    def clear_cursor(self):
+        with self.db:
+            self.db.execute("DELETE FROM meta WHERE key = 'cursor'")
+        self.cursor = None
+
+    def _sql(self, currency=None, from_type=None, to_type=None, from_entity=None, to_entity=None,
+              alert_type=None, min_usd=None, max_usd=None, start=None, end=None, columns=DEFAULT_COLUMNS,
+              limit=None):
+        where, params = [], []
+
+        def restrict(column, ids):
+            if not ids:
+                where.append("0")
+            else:
+                where.append(f"{column} IN ({','.join('?' * len(ids))})")
+                params.extend(ids)
+
+        if currency is not None:
+            restrict("a.coin", [self._coins.get(c.upper(), -1) for c in _as_list(currency)])
+        for column, etype, names in (("a.from_entity", from_type, from_entity), ("a.to_entity", to_type, to_entity)):
+            if etype is None and names is None:
+                continue
+            sql, args = "SELECT id FROM entities WHERE 1", []
+            if etype is not None:
+                codes = _codes(etype, TYPE_CODE)
+                sql += f" AND type IN ({','.join('?' * len(codes))})"
+                args += codes
+            if names is not None:
+                names = _as_list(names)
+                sql += f" AND canonical IN ({','.join('?' * len(names))})"
+                args += names
+            restrict(column, [r[0] for r in self.db.execute(sql, args)])
+        if alert_type is not None:
+            restrict("a.alert_type", _codes(alert_type, ALERT_TYPE_CODE))
+        for op, value in ((">=", min_usd), ("<", max_usd)):
+            if value is not None:
+                where.append(f"a.usd_value {op} ?")
+                params.append(float(value))
+        for op, value in ((">=", start), ("<", end)):
+            if value is not None:
+                where.append(f"a.ts {op} ?")
+                params.append(to_ms(value))
+
+        wanted = list(columns)
+        select = ["a.id"]
+        for col in wanted:
+            expr = ALERT_COLUMNS.get(col) or TEXT_COLUMNS.get(col) or ALERT_COLUMNS.get(TYPE_COLUMNS.get(col))
+            if expr is None:
+                raise ValueError(f"Unknown column {col!r}")
+            select.append(expr)
+        join = " JOIN alert_text t ON t.id = a.id" if any(c in TEXT_COLUMNS for c in wanted) else ""
+        sql = f"SELECT {', '.join(select)} FROM alerts a{join}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY a.ts"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        return sql, params, wanted
+
+    def query(self, currency=None, from_type=None, to_type=None, from_entity=None, to_entity=None,
+              alert_type=None, min_usd=None, max_usd=None, start=None, end=None, columns=DEFAULT_COLUMNS,
+              limit=None):
+        """Alerts matching every given filter as a DataFrame indexed by store id.
+
+        ``currency`` and the entity/type filters take a value or a list;
+        types are names or codes (see entity_registry.ENTITY_TYPES) and
+        entities match their canonical name.  ``start``/``end`` bound the
+        UTC time (inclusive start, exclusive end).  Only ``columns`` are read;
+        entity and coin columns come back as categoricals.
+        """
+        sql, params, wanted = self._sql(currency, from_type, to_type, from_entity, to_entity, alert_type,
+                                        min_usd, max_usd, start, end, columns, limit)
+        return self._frame(self.db.execute(sql, params).fetchall(), wanted)
+
+    def iter_query(self, chunksize=50_000, **filters):
+        """``query`` as DataFrames of at most ``chunksize`` rows, without holding the whole result."""
+        sql, params, wanted = self._sql(**filters)
+        cur = self.db.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(chunksize)
+            if not rows:
+                break
+            yield self._frame(rows, wanted)
+
+    def _frame(self, rows, wanted):
+        data = list(zip(*rows)) if rows else [[] for _ in range(len(wanted) + 1)]
+        df = pd.DataFrame(index=pd.Index(np.array(data[0], dtype=np.int64), name="id"))
+        for col, values in zip(wanted, data[1:]):
+            df[col] = self._decode(col, values)
+        return df
+
+    def _dimension(self, table, column):
+        """Categories array indexed by dimension id (ids are dense from 1)."""
+        rows = self.db.execute(f"SELECT id, {column} FROM {table}").fetchall()
+        out = np.empty(max((r[0] for r in rows), default=0) + 1, dtype=object)
+        for eid, value in rows:
+            out[eid] = value
+        return out
+
+    def _decode(self, col, values):
+        values = np.asarray(values, dtype=object)
+        if col == "timestamp":
+            return pd.to_datetime(values.astype(np.int64), unit="ms", utc=True)
+        if col == "currency":
+            return pd.Categorical(self._dimension("coins", "symbol")[values.astype(np.int64)])
+        if col in ("from_entity", "to_entity"):
+            return pd.Categorical(self._dimension("entities", "name")[values.astype(np.int64)])
+        if col in TYPE_COLUMNS:
+            return self._dimension("entities", "type")[values.astype(np.int64)].astype(np.int8)
+        if col == "alert_type":
+            names = np.array(list(ALERT_TYPES) + [None], dtype=object)
+            return pd.Categorical(names[np.where(pd.isna(values), -1, values).astype(np.int64)])
+        if col in ("amount", "usd_value"):
+            return values.astype(float)
+        if col == "tweet_id":
+            return pd.array(values, dtype="Int64")
+        return values
+
+    def stats(self):
+        count = lambda table: self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        first, last = self.db.execute("SELECT MIN(ts), MAX(ts) FROM alerts").fetchone()
+        return {"alerts": count("alerts"), "coins": count("coins"), "entities": count("entities"),
+                "first": pd.to_datetime(first, unit="ms", utc=True) if first else None,
+                "last": pd.to_datetime(last, unit="ms", utc=True) if last else None,
+                "bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0}
+
+    def close(self):
+        self.db.close()
+
+
+def migrate(csv_files, db_path, chunksize=50_000):
+    """Load scraped CSVs into the store; returns rows inserted."""
+    inserted = 0
+    with AlertStore(db_path) as store:
+        for path in csv_files:
+            for chunk in pd.read_csv(path, chunksize=chunksize):
+                inserted += store.insert_frame(chunk)
+            print(f"{path}: {store.rows} alerts stored")
+    return inserted
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+    m = sub.add_parser("migrate", help="load scraped CSVs")
+    m.add_argument("csv", nargs="+")
+    m.add_argument("--db", default="whale_alerts.db")
+    m.add_argument("--chunksize", type=int, default=50_000)
+    q = sub.add_parser("query", help="print matching alerts")
+    q.add_argument("--db", default="whale_alerts.db")
+    q.add_argument("--coin", nargs="+")
+    q.add_argument("--from-type", nargs="+", choices=ENTITY_TYPES)
+    q.add_argument("--to-type", nargs="+", choices=ENTITY_TYPES)
+    q.add_argument("--to-entity", nargs="+", help="canonical names")
+    q.add_argument("--alert-type", nargs="+", choices=ALERT_TYPES)
+    q.add_argument("--min-usd", type=float)
+    q.add_argument("--start")
+    q.add_argument("--end")
+    q.add_argument("--columns", nargs="+", default=list(DEFAULT_COLUMNS))
+    q.add_argument("--limit", type=int)
+    q.add_argument("--out", help="write the result as CSV")
+    s = sub.add_parser("stats")
+    s.add_argument("--db", default="whale_alerts.db")
+    args = ap.parse_args()
+
+    if args.command == "migrate":
+        t0 = time.perf_counter()
+        inserted = migrate(args.csv, args.db, args.chunksize)
+        print(f"Inserted {inserted} alerts in {time.perf_counter() - t0:.1f}s")
+        with AlertStore(args.db) as store:
+            print(store.stats())
+        return
+
+    with AlertStore(args.db) as store:
+        if args.command == "stats":
+            print(store.stats())
+            return
+        t0 = time.perf_counter()
+        df = store.query(args.coin, args.from_type, args.to_type, to_entity=args.to_entity,
+                         alert_type=args.alert_type, min_usd=args.min_usd, start=args.start, end=args.end,
+                         columns=args.columns, limit=args.limit)
+        print(f"{len(df)} alerts in {(time.perf_counter() - t0) * 1000:.1f}ms")
+        if args.out:
+            df.to_csv(args.out)
+        else:
+            print(df.to_string())
+
+
+if __name__ == "__main__":
+    main()
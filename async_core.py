@@ -0,0 +1,141 @@
+"""Asyncio core for the whale flow bot.
+
+Alert ingestion, signal evaluation, order execution and position monitoring
+run as separate tasks joined by bounded queues, so a slow ``account()`` call
+or page load no longer delays everything behind it.  The stages are plain
+callables supplied by the bot; blocking ones (polling, order placement,
+reconcile) run in thread pools:
+
+    poll()            -> list of new alerts (texts)          (blocking)
+    evaluate(alert)   -> signal or None                      (cheap, runs on the loop)
+    execute(signal)   -> anything                            (blocking)
+    monitor()         -> None                                (blocking, periodic)
+"""
+import time
+import signal
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()   # queue sentinel
+
+
+class WhaleBotCore:
+    def __init__(self, poll, evaluate, execute, monitor=None, poll_interval=10, monitor_interval=60,
+                 queue_size=100, order_workers=2):
+        self.poll = poll
+        self.evaluate = evaluate
+        self.execute = execute
+        self.monitor = monitor
+        self.poll_interval = poll_interval
+        self.monitor_interval = monitor_interval
+        self.queue_size = queue_size
+        self.order_workers = order_workers
+        self.stats = {'alerts': 0, 'signals': 0, 'orders': 0, 'errors': 0, 'backpressure': 0}
+        self.latencies_ms = []         # alert received -> execute() returned
+        self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ingest")
+        self._order_pool = ThreadPoolExecutor(max_workers=order_workers, thread_name_prefix="order")
+        self._stop = None
+        self._loop = None
+
+    def stop(self):
+        """Request a clean shutdown; safe to call from any thread or a signal handler."""
+        if self._loop and self._stop and not self._stop.is_set():
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    async def _sleep(self, seconds):
+        """Sleep that wakes up early on shutdown. Returns True if stopping."""
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+        return self._stop.is_set()
+
+    async def _ingest(self, alerts):
+        loop = asyncio.get_running_loop()
+        while not self._stop.is_set():
+            try:
+                texts = await loop.run_in_executor(self._io_pool, self.poll)
+                for text in texts:
+                    self.stats['alerts'] += 1
+                    if alerts.full():
+                        self.stats['backpressure'] += 1
+                        logger.warning("Alert queue full, waiting for the evaluator")
+                    await alerts.put((time.perf_counter(), text))
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Ingest err: {e}")
+            if await self._sleep(self.poll_interval):
+                break
+        await alerts.put(_STOP)
+
+    async def _evaluate(self, alerts, orders):
+        while True:
+            item = await alerts.get()
+            if item is _STOP:
+                break
+            received, text = item
+            try:
+                sig = self.evaluate(text)
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Signal err: {e}")
+                continue
+            if sig is not None:
+                self.stats['signals'] += 1
+                await orders.put((received, sig))
+        for _ in range(self.order_workers):
+            await orders.put(_STOP)
+
+    async def _execute(self, orders):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await orders.get()
+            if item is _STOP:
+                break
+            received, sig = item
+            try:
+                await loop.run_in_executor(self._order_pool, self.execute, sig)
+                self.stats['orders'] += 1
+                self.latencies_ms.append((time.perf_counter() - received) * 1000)
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Order err: {e}")
+
+    async def _monitor(self):
+        loop = asyncio.get_running_loop()
+        while not await self._sleep(self.monitor_interval):
+            try:
+                await loop.run_in_executor(self._io_pool, self.monitor)
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Monitor err: {e}")
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.add_signal_handler(sig, self._stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass   # not supported on this platform / not the main thread
+
+        alerts = asyncio.Queue(maxsize=self.queue_size)
+        orders = asyncio.Queue(maxsize=self.queue_size)
+        pipeline = [asyncio.create_task(self._ingest(alerts)),
+                    asyncio.create_task(self._evaluate(alerts, orders))]
+        pipeline += [asyncio.create_task(self._execute(orders)) for _ in range(self.order_workers)]
+        monitor = asyncio.create_task(self._monitor()) if self.monitor else None
+
+        try:
+            # ingest only returns after stop(); the rest drain their queues behind it
+            await asyncio.gather(*pipeline)
+        finally:
+            if monitor:
+                monitor.cancel()
+                await asyncio.gather(monitor, return_exceptions=True)
+            self._io_pool.shutdown(wait=True)
+            self._order_pool.shutdown(wait=True)
+            logger.info(f"Core stopped: {self.stats}")
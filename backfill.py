@@ -0,0 +1,156 @@
+"""Re-parse scraped alerts offline with the current parser.
+
+Streams existing CSVs (or saved nitter page snapshots, ``*.html``) in chunks
+through a process pool, rewrites the derived columns from ``raw_text`` and
+the timestamp (exact UTC from the tweet id where there is a link, else from
+``timestamp_text``), writes the result and reports which rows changed.  No
+network access is needed, so a parser fix can be applied to old data without
+scraping nitter again:
+
+    python backfill.py whale_alert_data.csv --in-place
+    python backfill.py snapshots/*.html --out snapshots.csv
+"""
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from alert_parser import parse_alert
+from entity_registry import REGISTRY
+from timeline_source import parse_timeline_html
+from timestamp_normalizer import format_utc, normalize_timestamps
+
+DERIVED_COLUMNS = ["amount", "currency", "usd_value", "from_entity", "to_entity", "alert_type",
+                   "from_type", "to_type", "timestamp"]
+
+
+def reparse_chunk(chunk):
+    """Recompute the derived columns of one chunk; returns (new_chunk, changed_counts, diff_rows)."""
+    new = chunk.copy()
+    parsed = [parse_alert(t) if isinstance(t, str) else None for t in chunk["raw_text"]]
+    ok = np.array([p is not None for p in parsed])
+    for col in ["amount", "currency", "usd_value", "from_entity", "to_entity", "alert_type"]:
+        values = [p[col] if p else None for p in parsed]
+        if col in new.columns:
+            new.loc[ok, col] = pd.Series(values, index=new.index)[ok]
+        else:
+            new[col] = values
+    new["from_type"] = REGISTRY.classify(new["from_entity"])["type"].to_numpy()
+    new["to_type"] = REGISTRY.classify(new["to_entity"])["type"].to_numpy()
+    links = chunk["tweet_link"] if "tweet_link" in chunk.columns else None
+    # without timestamp_text the tweet id's snowflake time is all there is
+    texts = (chunk["timestamp_text"] if "timestamp_text" in chunk.columns
+             else pd.Series(None, index=chunk.index, dtype=object))
+    ts = normalize_timestamps(texts, links)
+    new.loc[ts.notna(), "timestamp"] = ts[ts.notna()].map(format_utc)
+
+    counts, diffs = {}, []
+    for col in DERIVED_COLUMNS:
+        before = chunk[col] if col in chunk.columns else pd.Series(None, index=chunk.index, dtype=object)
+        after = new[col]
+        changed = ~((before == after) | (before.isna() & after.isna()))
+        # '600.0' vs 600.0 after a CSV round trip is not a change
+        changed &= before.astype(str) != after.astype(str)
+        counts[col] = int(changed.sum())
+        for idx in chunk.index[changed]:
+            diffs.append((idx, col, before[idx], after[idx]))
+    return new, counts, diffs
+
+
+def read_snapshots(paths):
+    """Rows with raw_text/timestamp_text/tweet_link from saved nitter timeline pages."""
+    rows = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for item in parse_timeline_html(f.read()):
+                rows.append({"raw_text": item["text"], "timestamp_text": item["timestamp_text"],
+                             "tweet_link": item["link"]})
+    return pd.DataFrame(rows)
+
+
+def iter_chunks(paths, chunksize):
+    """Chunks of every CSV in turn, then the rows of all HTML snapshots."""
+    csvs = [p for p in paths if not p.endswith((".html", ".htm"))]
+    pages = [p for p in paths if p.endswith((".html", ".htm"))]
+    offset = 0
+    for path in csvs:
+        rows = 0
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            chunk.index += offset      # row numbers stay unique across input files
+            rows += len(chunk)
+            yield chunk
+        offset += rows
+    if pages:
+        df = read_snapshots(pages)
+        df.index += offset
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+
+
+def bounded_map(pool, fn, items, window):
+    """Like pool.map, but keeps at most ``window`` chunks in flight so memory stays flat."""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def backfill(paths, out, chunksize=5000, workers=None, diff_file=None):
+    """Re-parse ``paths`` into ``out`` (written via a temp file); returns changed cells per column."""
+    totals = dict.fromkeys(DERIVED_COLUMNS, 0)
+    rows = changed_rows = 0
+    tmp = out + ".tmp"
+    header = True
+    diff_out = open(diff_file, "w", encoding="utf-8") if diff_file else None
+    try:
+        if diff_out:
+            diff_out.write("row,column,old,new\n")
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for new, counts, diffs in bounded_map(pool, reparse_chunk, iter_chunks(paths, chunksize), 2 * workers):
+                new.to_csv(tmp, mode="w" if header else "a", header=header, index=False)
+                header = False
+                rows += len(new)
+                changed_rows += len({d[0] for d in diffs})
+                for col, n in counts.items():
+                    totals[col] += n
+                if diff_out:
+                    pd.DataFrame(diffs).to_csv(diff_out, header=False, index=False)
+    finally:
+        if diff_out:
+            diff_out.close()
+    os.replace(tmp, out)
+
+    print(f"Re-parsed {rows} rows, {changed_rows} changed -> {out}")
+    for col, n in totals.items():
+        print(f"  {col:<12} {n:6d} changed")
+    return totals
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("inputs", nargs="+", help="scraped CSVs and/or saved nitter *.html pages")
+    ap.add_argument("--out", help="output CSV (default: <first input>.reparsed.csv)")
+    ap.add_argument("--in-place", action="store_true", help="overwrite the (single) input CSV")
+    ap.add_argument("--diff", help="write changed cells as row,column,old,new to this CSV")
+    ap.add_argument("--chunksize", type=int, default=5000)
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args()
+
+    if args.in_place:
+        if len(args.inputs) != 1 or args.inputs[0].endswith((".html", ".htm")):
+            ap.error("--in-place needs exactly one CSV input")
+        out = args.inputs[0]
+    else:
+        out = args.out or os.path.splitext(args.inputs[0])[0] + ".reparsed.csv"
+    backfill(args.inputs, out, args.chunksize, args.workers, args.diff)
+
+
+if __name__ == "__main__":
+    main()
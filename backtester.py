@@ -0,0 +1,267 @@
+"""Event-driven backtest of the whale flow bot on scraped alerts and cached candles.
+
+Alerts are replayed in time order through the bot's own rules
+(``strategy.signal_info``/``signal_symbol``, ``order_intents.position_qty``,
+``strategy.protective_prices``) against a simulated exchange:
+
+* the short is entered at the open of the first 1m candle at or after
+  ``alert time + entry delay``, minus slippage, paying the taker fee;
+* TP and SL are checked candle by candle from the entry candle on.  A gap
+  through a level fills at the candle open; when one candle touches both,
+  ``intrabar`` decides: "worst" (SL first), "best" (TP first) or "path"
+  (O-H-L-C if the open is nearer the high, else O-L-H-C);
+* a position still open after ``max_hold`` minutes is closed at the close;
+* while a symbol has a position, new signals on it are skipped, as the live
+  bot does, and sizing uses the equity realized so far.
+
+Candles come from the on-disk kline store (fetching only what is missing
+unless ``--offline``), loaded once per symbol as NumPy arrays:
+
+    python backtester.py --csv whale_alert_data.csv --offline --intrabar path
+"""
+import argparse
+import heapq
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from alert_parser import parse_alert
+from kline_loader import KlineLoader
+from kline_store import KlineStore
+from order_intents import position_qty
+from strategy import (ACCOUNT_RISK, MIN_NOTIONAL_USD, PAIR_CFG, TRADE_EXCHANGES,
+                      protective_prices, signal_info, signal_symbol)
+from symbol_cache import parse_symbol_info
+from timestamp_normalizer import normalize_timestamps, to_utc
+
+MINUTE_MS = 60_000
+TAKER_FEE = 0.0005          # Binance USDT-M taker
+SLIPPAGE_BPS = 2.0
+MAX_HOLD_MINUTES = 24 * 60
+MAX_ENTRY_GAP_MS = 2 * MINUTE_MS
+
+# (qty_prec, price_prec, step, tick) as in exchangeInfo; pass --exchange-info for current values
+DEFAULT_FILTERS = {
+    "BTCUSDT":   (3, 2, 0.001, 0.1),
+    "ETHUSDT":   (3, 2, 0.001, 0.01),
+    "XRPUSDT":   (1, 4, 0.1, 0.0001),
+    "DOGEUSDT":  (0, 6, 1.0, 0.00001),
+    "TRUMPUSDT": (1, 3, 0.1, 0.001),
+    "SOLUSDT":   (0, 4, 1.0, 0.01),
+    "LTCUSDT":   (3, 2, 0.001, 0.01),
+}
+FALLBACK_FILTER = (3, 4, 0.001, 0.0001)
+
+
+def load_filters(path):
+    """Symbol filters from a saved /fapi/v1/exchangeInfo response."""
+    with open(path) as f:
+        info = json.load(f)
+    return {s['symbol']: parse_symbol_info(s) for s in info['symbols']}
+
+
+def load_signals(csv_file, exchanges=TRADE_EXCHANGES):
+    """Every alert in the CSV that passes the bot's transfer filter, oldest first.
+
+    Columns: ``tx_ms`` (UTC ms), ``coin``, ``usd``.  Notional and pair filters
+    are left to the backtest so that they can be varied.
+    """
+    df = pd.read_csv(csv_file)
+    if 'timestamp' in df.columns:
+        ts = to_utc(df['timestamp'])
+    else:
+        ts = normalize_timestamps(df['timestamp_text'], df.get('tweet_link'))
+    rows = []
+    for text, t in zip(df['raw_text'], ts):
+        info = signal_info(parse_alert(text), exchanges) if isinstance(text, str) else None
+        if info and not pd.isna(t):
+            rows.append((t.value // 1_000_000, info['coin'], info['usd']))
+    signals = pd.DataFrame(rows, columns=['tx_ms', 'coin', 'usd'])
+    return signals.sort_values('tx_ms', kind='stable').reset_index(drop=True)
+
+
+def load_candles(symbols, start_ms, end_ms, cache_dir="kline_cache", offline=False, max_workers=4):
+    """``{symbol: arrays}`` (open_time, open, high, low, close, volume) covering the span."""
+    loader = KlineLoader(max_workers=max_workers, store=KlineStore(cache_dir), offline=offline)
+    loader.load({symbol: [(start_ms, end_ms)] for symbol in symbols})
+    return {symbol: loader.arrays(symbol) for symbol in symbols if loader.arrays(symbol) is not None}
+
+
+def simulate_short(candles, i0, tp, sl, max_hold, intrabar="worst", slippage=0.0):
+    """Exit of a short entered at candle ``i0``: ``(exit_index, exit_price, reason)``."""
+    n = len(candles['open_time'])
+    i1 = min(n, i0 + max_hold)
+    low = candles['low'][i0:i1]
+    high = candles['high'][i0:i1]
+    tp_hit = low <= tp
+    sl_hit = high >= sl
+    j_tp = int(tp_hit.argmax()) if tp_hit.any() else None
+    j_sl = int(sl_hit.argmax()) if sl_hit.any() else None
+
+    if j_tp is None and j_sl is None:
+        j = i1 - 1
+        reason = "timeout" if i1 - i0 == max_hold else "end_of_data"
+        return j, candles['close'][j] * (1 + slippage), reason
+
+    if j_sl is None or (j_tp is not None and j_tp < j_sl):
+        reason = "tp"
+    elif j_tp is None or j_sl < j_tp:
+        reason = "sl"
+    elif intrabar == "best":
+        reason = "tp"
+    elif intrabar == "path":
+        o = candles['open'][i0 + j_sl]
+        reason = "sl" if candles['high'][i0 + j_sl] - o <= o - candles['low'][i0 + j_sl] else "tp"
+    else:
+        reason = "sl"
+
+    j = i0 + (j_tp if reason == "tp" else j_sl)
+    o = candles['open'][j]
+    # stop-market legs: a gap through the level fills at the open
+    fill = min(tp, o) if reason == "tp" else max(sl, o)
+    return j, fill * (1 + slippage), reason
+
+
+class Backtester:
+    """Replay signals through the bot's sizing and TP/SL rules against candle arrays."""
+
+    def __init__(self, candles, pair_cfg=PAIR_CFG, min_notional=MIN_NOTIONAL_USD,
+                 account_risk=ACCOUNT_RISK, balance=10_000.0, fee=TAKER_FEE,
+                 slippage_bps=SLIPPAGE_BPS, intrabar="worst", max_hold=MAX_HOLD_MINUTES,
+                 entry_delay_ms=0, filters=None):
+        self.candles = candles
+        self.pair_cfg = pair_cfg
+        self.min_notional = min_notional
+        self.account_risk = account_risk
+        self.balance = balance
+        self.fee = fee
+        self.slippage = slippage_bps / 10_000
+        self.intrabar = intrabar
+        self.max_hold = max_hold
+        self.entry_delay_ms = entry_delay_ms
+        self.filters = {**DEFAULT_FILTERS, **(filters or {})}
+        self.skipped = {}
+
+    def _skip(self, reason):
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def run(self, signals):
+        """Trades (one row per simulated position) for a ``load_signals`` frame."""
+        equity = self.balance
+        pending = []            # (exit_ms, pnl) not yet realized
+        open_until = {}
+        trades = []
+        self.skipped = {}
+        for tx_ms, coin, usd in zip(signals['tx_ms'].to_numpy(), signals['coin'], signals['usd']):
+            sig = signal_symbol({'coin': coin, 'usd': usd}, self.pair_cfg, self.min_notional)
+            if not sig:
+                self._skip("below_min_notional")
+                continue
+            symbol, cfg = sig
+            if cfg is None:
+                self._skip("pair_not_configured")
+                continue
+            candles = self.candles.get(symbol)
+            if candles is None:
+                self._skip("no_candles")
+                continue
+
+            t_entry = int(tx_ms) + self.entry_delay_ms
+            while pending and pending[0][0] <= t_entry:
+                equity += heapq.heappop(pending)[1]
+            if open_until.get(symbol, 0) > t_entry:
+                self._skip("position_open")
+                continue
+
+            open_time = candles['open_time']
+            i0 = int(np.searchsorted(open_time, t_entry, 'left'))
+            if i0 >= len(open_time) or open_time[i0] - t_entry > MAX_ENTRY_GAP_MS:
+                self._skip("no_candles")
+                continue
+
+            qty_prec, price_prec, step, tick = self.filters.get(symbol, FALLBACK_FILTER)
+            mark = candles['open'][i0]
+            qty = position_qty(cfg, equity, mark, step, qty_prec, self.account_risk)
+            if qty <= 0:
+                self._skip("qty_zero")
+                continue
+            entry = mark * (1 - self.slippage)
+            tp, sl = protective_prices(entry, cfg, price_prec)
+            j, exit_price, reason = simulate_short(candles, i0, tp, sl, self.max_hold,
+                                                   self.intrabar, self.slippage)
+            exit_ms = int(open_time[j]) + MINUTE_MS
+            fees = self.fee * qty * (entry + exit_price)
+            pnl = qty * (entry - exit_price) - fees
+            heapq.heappush(pending, (exit_ms, pnl))
+            open_until[symbol] = exit_ms
+            trades.append((int(tx_ms), symbol, int(open_time[i0]), entry, qty, tp, sl,
+                           exit_ms, exit_price, reason, fees, pnl, (entry - exit_price) / entry * 100,
+                           equity))
+        return pd.DataFrame(trades, columns=[
+            'tx_ms', 'symbol', 'entry_ms', 'entry', 'qty', 'tp', 'sl', 'exit_ms', 'exit', 'reason',
+            'fees', 'pnl', 'move_pct', 'equity_before'])
+
+
+def summarize(trades, balance):
+    """Headline numbers of a backtest: counts by exit, win rate, PnL and max drawdown."""
+    if trades.empty:
+        return {'trades': 0}
+    curve = balance + trades.sort_values('exit_ms')['pnl'].cumsum()
+    peak = np.maximum.accumulate(np.concatenate([[balance], curve.to_numpy()]))
+    drawdown = ((np.concatenate([[balance], curve.to_numpy()]) - peak) / peak).min() * 100
+    out = {
+        'trades': len(trades),
+        'win_rate': float((trades['pnl'] > 0).mean()),
+        'pnl': float(trades['pnl'].sum()),
+        'return_pct': float(trades['pnl'].sum() / balance * 100),
+        'max_drawdown_pct': float(drawdown),
+        'fees': float(trades['fees'].sum()),
+    }
+    out.update({f"exit_{k}": int(v) for k, v in trades['reason'].value_counts().items()})
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--csv", default="whale_alert_data.csv")
+    ap.add_argument("--cache-dir", default="kline_cache")
+    ap.add_argument("--offline", action="store_true", help="use cached candles only")
+    ap.add_argument("--exchange-info", help="saved /fapi/v1/exchangeInfo JSON for symbol filters")
+    ap.add_argument("--balance", type=float, default=10_000.0)
+    ap.add_argument("--min-notional", type=float, default=MIN_NOTIONAL_USD)
+    ap.add_argument("--fee", type=float, default=TAKER_FEE)
+    ap.add_argument("--slippage-bps", type=float, default=SLIPPAGE_BPS)
+    ap.add_argument("--intrabar", choices=("worst", "best", "path"), default="worst")
+    ap.add_argument("--max-hold", type=int, default=MAX_HOLD_MINUTES, help="minutes")
+    ap.add_argument("--entry-delay", type=float, default=0.0, help="seconds from alert to entry")
+    ap.add_argument("--out", default="backtest_trades.csv")
+    args = ap.parse_args()
+
+    signals = load_signals(args.csv)
+    symbols = sorted({c + "USDT" for c in signals['coin']} & set(PAIR_CFG))
+    print(f"{len(signals)} unknown -> exchange transfers, {len(symbols)} configured symbols")
+    candles = load_candles(symbols, int(signals['tx_ms'].min()),
+                           int(signals['tx_ms'].max()) + (args.max_hold + 5) * MINUTE_MS,
+                           args.cache_dir, args.offline)
+
+    bt = Backtester(candles, min_notional=args.min_notional, balance=args.balance, fee=args.fee,
+                    slippage_bps=args.slippage_bps, intrabar=args.intrabar, max_hold=args.max_hold,
+                    entry_delay_ms=int(args.entry_delay * 1000),
+                    filters=load_filters(args.exchange_info) if args.exchange_info else None)
+    t0 = time.perf_counter()
+    trades = bt.run(signals)
+    dt = time.perf_counter() - t0
+    print(f"Simulated {len(signals)} signals in {dt * 1000:.1f}ms ({len(signals) / dt:,.0f} signals/s); "
+          f"skipped: {bt.skipped}")
+    for key, value in summarize(trades, args.balance).items():
+        print(f"  {key:<18} {value:,.4f}" if isinstance(value, float) else f"  {key:<18} {value}")
+    if not trades.empty:
+        print(trades.groupby('symbol')['pnl'].agg(['count', 'sum', 'mean']))
+        trades.to_csv(args.out, index=False)
+        print(f"Saved {len(trades)} trades to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
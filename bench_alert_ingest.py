@@ -0,0 +1,167 @@
+"""Multi-source ingestion against local fake feeds with injected delays.
+
+Alerts from whale_alert_data.csv are "posted" every ``--spacing`` seconds and
+show up on each fake feed after that feed's lag; every request also waits the
+feed's response latency and fails (HTTP 503) at its failure rate.  Feeds are
+given as ``kind:lag:latency:fail`` with kind html, rss or json:
+
+    python bench_alert_ingest.py --alerts 20 --feeds html:1:0.3:0 html:4:0.05:0.2 rss:6:0.1:0 json:0.5:0.2:0.3
+
+Checks that every alert is forwarded exactly once, then prints the per-source
+wins, lag behind the winner and post -> arrival lag next to the post ->
+forward lag of the combined feed.
+"""
+import argparse
+import csv
+import html
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from alert_ingest import JsonFeedSource, MultiSourceIngest, mirror_sources
+from alert_parser import parse_alert
+from bench_timeline_source import timeline_item_html
+from timestamp_normalizer import TWITTER_EPOCH_MS
+from tracing import summarize
+
+PAGE_SIZE = 20
+
+
+def make_alerts(csv_file, count, backlog):
+    """``backlog + count`` alert rows with fake tweet ids and tx hashes; publish times are set later."""
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        rows = [r for r in csv.DictReader(f) if parse_alert(r["raw_text"])][:backlog + count]
+    for row in rows:
+        row["tx_hash"] = f"{random.getrandbits(256):064x}"
+        row["tx_url"] = f"https://whale-alert.io/transaction/ethereum/0x{row['tx_hash']}"
+    return rows
+
+
+def rss_item_xml(row):
+    description = html.escape(f'<p>{html.escape(row["raw_text"])} <a href="{row["tx_url"]}">link</a></p>')
+    return (f"<item><title>{html.escape(row['raw_text'])}</title><description>{description}</description>"
+            f"<guid>{row['tweet_link']}</guid><link>{row['tweet_link']}</link></item>")
+
+
+class FakeFeeds:
+    """Timeline state of every fake feed at a given moment."""
+
+    def __init__(self, alerts, feeds, start, spacing, backlog):
+        self.alerts = alerts
+        self.feeds = feeds
+        for i, row in enumerate(alerts):
+            # the backlog is on every feed from the start, so each source primes its cursor on it
+            posted = start + (i - backlog + 1) * spacing if i >= backlog else start - 3600 + i
+            row["posted"] = posted
+            tid = (int(posted * 1000) - TWITTER_EPOCH_MS) << 22
+            row["id"] = str(tid)
+            row["tweet_link"] = f"https://nitter.net/whale_alert/status/{tid}#m"
+
+    def visible(self, feed):
+        now = time.time()
+        rows = [r for r in self.alerts if r["posted"] + feed["lag"] <= now]
+        return rows[-PAGE_SIZE:]
+
+    def body(self, feed):
+        rows = self.visible(feed)
+        if feed["kind"] == "json":
+            entries = []
+            for r in rows:
+                a = parse_alert(r["raw_text"])
+                owner = lambda e: "unknown" if e.lower().startswith("unknown") else e
+                entries.append({"id": r["tx_hash"], "blockchain": "ethereum", "hash": "0x" + r["tx_hash"],
+                                "symbol": a["currency"].lower(), "amount": a["amount"],
+                                "amount_usd": a["usd_value"] or 0, "transaction_type": a["alert_type"],
+                                "from": {"owner": owner(a["from_entity"])}, "to": {"owner": owner(a["to_entity"])},
+                                "timestamp": int(r["posted"])})
+            return "application/json", json.dumps({"transactions": entries})
+        rows = rows[::-1]
+        if feed["kind"] == "rss":
+            items = "".join(rss_item_xml(r) for r in rows)
+            return "application/rss+xml", f'<?xml version="1.0"?><rss><channel>{items}</channel></rss>'
+        page = "".join(timeline_item_html(r) for r in rows)
+        return "text/html", f'<html><body><div class="timeline">{page}</div></body></html>'
+
+
+def serve(state):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            feed = state.feeds[int(self.path.strip("/").split("/")[0])]
+            time.sleep(feed["latency"])
+            if random.random() < feed["fail"]:
+                self.send_error(503)
+                return
+            ctype, body = state.body(feed)
+            body = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--csv", default="whale_alert_data.csv")
+    ap.add_argument("--alerts", type=int, default=15)
+    ap.add_argument("--spacing", type=float, default=1.0, help="seconds between posts")
+    ap.add_argument("--interval", type=float, default=2.0, help="poll interval per source (s)")
+    ap.add_argument("--feeds", nargs="+", default=["html:1:0.3:0", "html:4:0.05:0.2", "rss:6:0.1:0",
+                                                   "json:0.5:0.2:0.3"])
+    args = ap.parse_args()
+    logging.getLogger("alert_ingest").setLevel(logging.ERROR)   # injected 503s
+
+    feeds = []
+    for spec in args.feeds:
+        kind, lag, latency, fail = spec.split(":")
+        feeds.append({"kind": kind, "lag": float(lag), "latency": float(latency), "fail": float(fail)})
+    backlog = 5
+    alerts = make_alerts(args.csv, args.alerts, backlog)
+    state = FakeFeeds(alerts, feeds, time.time() + 4 * args.interval, args.spacing, backlog)
+    server = serve(state)
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    sources = []
+    for i, feed in enumerate(feeds):
+        url = f"{base}/{i}/whale_alert" + ("/rss" if feed["kind"] == "rss" else "")
+        src = JsonFeedSource(url) if feed["kind"] == "json" else mirror_sources([url], timeout=5)[0]
+        src.name = f"{i}:{feed['kind']} lag={feed['lag']}s fail={feed['fail']:.0%}"
+        sources.append(src)
+    ingest = MultiSourceIngest(sources, interval=args.interval, max_backoff=4 * args.interval)
+    ingest.start()
+
+    forwarded = []
+    deadline = alerts[-1]["posted"] + max(f["lag"] for f in feeds) + 4 * args.interval
+    while time.time() < deadline:
+        forwarded += ingest.poll(timeout=0.5)
+    ingest.close()
+    server.shutdown()
+
+    fresh = alerts[backlog:]
+    posted = {r["tx_hash"]: r["posted"] for r in fresh}
+    got = [a["tx"][1][2:] for a in forwarded if a["tx"]]
+    print(f"published {len(fresh)}, forwarded {len(forwarded)}, distinct {len(set(got))}, "
+          f"missing {len(set(posted) - set(got))}, duplicates {len(got) - len(set(got))}")
+    lag = summarize([a["arrived_ms"] - posted[a["tx"][1][2:]] * 1000 for a in forwarded if a["tx"]
+                     and a["tx"][1][2:] in posted])
+    print(f"combined post -> forward lag: p50={lag.get('p50', float('nan')):.0f}ms p90={lag.get('p90', float('nan')):.0f}ms\n")
+    print(f"{'source':<28}{'polls':>6}{'err':>5}{'wins':>6}{'late':>6}{'win%':>6}"
+          f"{'behind p50':>12}{'post lag p50':>14}{'fetch p50':>11}")
+    for name, s in ingest.source_stats().items():
+        print(f"{name:<28}{s['polls']:>6}{s['errors']:>5}{s['wins']:>6}{s['late']:>6}"
+              f"{(s['win_rate'] or 0):>6.0%}{s.get('lag_ms_p50', float('nan')):>10.0f}ms"
+              f"{s.get('post_lag_ms_p50', float('nan')):>12.0f}ms{s.get('fetch_ms_p50', float('nan')):>9.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Golden check and throughput of the shared alert parser on the bundled CSV.
+
+Every ``raw_text`` in whale_alert_data.csv must parse to the ``amount`` and
+``currency`` recorded for it and to the USD value printed in the text; rows
+whose from/to differ from the CSV (written by the old regex cascade) are
+counted by kind so changes in entity extraction stay visible:
+
+    python bench_alert_parser.py --repeat 50
+"""
+import argparse
+import collections
+import csv
+import re
+import time
+
+from alert_parser import parse_alert
+
+USD_IN_TEXT = re.compile(r"\(([\d,]+(?:\.\d+)?) USD\)")
+
+
+def legacy_parse(text):
+    """The old WhaleAlertScraper.parse_tweet_text cascade (amount, usd, from/to), for timing."""
+    amount_matches = re.findall(r'([\d,]+(?:\.\d+)?)\s+#([A-Za-z0-9]+)', text)
+    if not amount_matches:
+        return None
+    usd_match = re.search(r'$$([\d,]+(?:\.\d+)?)\s+USD$$', text)
+    from_to = re.search(r'from\s+#([A-Za-z0-9]+)\s+to\s+#([A-Za-z0-9]+)', text)
+    if not from_to:
+        if re.search(r'(from|to)\s+(unknown wallet)', text):
+            re.search(r'to\s+#([A-Za-z0-9]+)', text) or re.search(r'from\s+#([A-Za-z0-9]+)', text)
+        else:
+            re.search(r'from\s+([A-Za-z0-9 ]+)\s+to', text)
+            re.search(r'to\s+([A-Za-z0-9 ]+)', text)
+    return amount_matches[0], usd_match
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--csv", default="whale_alert_data.csv")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    with open(args.csv, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    texts = [r["raw_text"] for r in rows]
+
+    failures, entity_changes, types = [], collections.Counter(), collections.Counter()
+    for row in rows:
+        p = parse_alert(row["raw_text"])
+        usd = USD_IN_TEXT.search(row["raw_text"])
+        expected_usd = float(usd.group(1).replace(",", "")) if usd else None
+        if (p is None or p["amount"] != float(row["amount"]) or p["currency"] != row["currency"]
+                or p["usd_value"] != expected_usd):
+            failures.append(row["raw_text"][:90])
+            continue
+        types[p["alert_type"]] += 1
+        if (p["from_entity"], p["to_entity"]) != (row["from_entity"], row["to_entity"]):
+            entity_changes[f"{row['from_entity']} -> {row['to_entity']}  became  "
+                           f"{p['from_entity']} -> {p['to_entity']}"] += 1
+
+    print(f"golden: {len(rows) - len(failures)}/{len(rows)} rows match amount, currency and USD value")
+    for text in failures[:10]:
+        print(f"  FAIL {text!r}")
+    print(f"alert types: {dict(types)}")
+    print(f"from/to differs from the CSV on {sum(entity_changes.values())} rows, most common:")
+    for change, n in entity_changes.most_common(8):
+        print(f"  {n:4d}  {change}")
+
+    for label, fn in (("legacy", legacy_parse), ("parser", parse_alert)):
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            for text in texts:
+                fn(text)
+        dt = time.perf_counter() - t0
+        print(f"{label:>7}: {len(texts) * args.repeat / dt:10,.0f} tweets/s")
+
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
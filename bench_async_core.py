@@ -0,0 +1,94 @@
+"""Alert-to-order latency of the old blocking loop vs the asyncio core.
+
+Both run the same fake stages: a timeline poll that takes ``--poll-ms``, an
+order flow that takes ``--order-ms`` and a position reconcile (``account()``)
+that takes ``--monitor-ms``.  Alerts arrive in bursts of ``--burst``:
+
+    python bench_async_core.py --duration 10 --monitor-ms 1500
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+from async_core import WhaleBotCore
+
+
+class FakeFeed:
+    """Emits a burst of alerts every ``every`` seconds, stamped with the time they were posted."""
+
+    def __init__(self, poll_ms, burst, every):
+        self.poll_ms = poll_ms
+        self.burst = burst
+        self.every = every
+        self.t0 = time.perf_counter()
+        self.emitted = 0
+
+    def poll(self):
+        time.sleep(self.poll_ms / 1000)
+        due = int((time.perf_counter() - self.t0) / self.every) + 1
+        out = []
+        while self.emitted < due * self.burst:
+            posted = self.t0 + (self.emitted // self.burst) * self.every
+            out.append((posted, f"alert {self.emitted}"))
+            self.emitted += 1
+        return out
+
+
+def run_serial(feed, order_ms, monitor_ms, interval, duration):
+    """The pre-asyncio main loop: poll, evaluate, trade and reconcile on one thread."""
+    latencies = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        for posted, _ in feed.poll():
+            time.sleep(order_ms / 1000)
+            latencies.append((time.perf_counter() - posted) * 1000)
+        time.sleep(monitor_ms / 1000)
+        time.sleep(interval)
+    return latencies
+
+
+def run_core(feed, order_ms, monitor_ms, interval, duration):
+    latencies = []
+
+    def execute(sig):
+        time.sleep(order_ms / 1000)
+        latencies.append((time.perf_counter() - sig) * 1000)
+
+    core = WhaleBotCore(poll=feed.poll,
+                        evaluate=lambda alert: alert[0],
+                        execute=execute,
+                        monitor=lambda: time.sleep(monitor_ms / 1000),
+                        poll_interval=interval,
+                        monitor_interval=interval)
+    threading.Timer(duration, core.stop).start()
+    asyncio.run(core.run())
+    return latencies
+
+
+def report(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else float("nan")
+    print(f"{label:>7}: orders={len(latencies):4d}  median={statistics.median(latencies):8.1f}ms  "
+          f"p95={p95:8.1f}ms  max={latencies[-1]:8.1f}ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--duration", type=float, default=10)
+    ap.add_argument("--interval", type=float, default=0.5, help="poll interval (s)")
+    ap.add_argument("--poll-ms", type=float, default=200)
+    ap.add_argument("--order-ms", type=float, default=150)
+    ap.add_argument("--monitor-ms", type=float, default=1000)
+    ap.add_argument("--burst", type=int, default=3)
+    ap.add_argument("--every", type=float, default=2.0, help="seconds between bursts")
+    args = ap.parse_args()
+
+    for label, runner in (("serial", run_serial), ("asyncio", run_core)):
+        feed = FakeFeed(args.poll_ms, args.burst, args.every)
+        report(label, runner(feed, args.order_ms, args.monitor_ms, args.interval, args.duration))
+
+
+if __name__ == "__main__":
+    main()
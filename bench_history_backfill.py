@@ -0,0 +1,134 @@
+"""Run the history backfill against a local server of paginated nitter pages.
+
+Each chain is a directory ``<chain>/`` holding ``index.html`` plus one
+``<cursor>.html`` per "Load more" cursor; a request for ``/<chain>?cursor=X``
+is answered with ``<chain>/X.html``.  Recorded pages can be dropped into such
+a layout with ``--pages``; by default chains are synthesised from
+whale_alert_data.csv.  The server adds ``--latency`` per request and answers
+every ``--throttle-every``-th request with 429.
+
+The run compares one worker with a fixed sleep per page (the old scraper loop)
+against the worker pool with adaptive pacing, then interrupts a run after
+``--stop-after`` pages per chain and checks that resuming completes every chain
+without duplicate rows:
+
+    python bench_history_backfill.py --chains 6 --pages-per-chain 5 --workers 4
+"""
+import argparse
+import csv
+import functools
+import itertools
+import os
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from alert_sink import CsvAlertSink
+from bench_timeline_source import timeline_page_html
+from history_backfill import AdaptivePacer, HistoryBackfill
+
+
+def synthesize_chains(directory, csv_file, chains, pages_per_chain, per_page=20):
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    it = iter(rows)
+    for c in range(chains):
+        os.makedirs(os.path.join(directory, f"chain{c}"), exist_ok=True)
+        for p in range(pages_per_chain):
+            page = list(itertools.islice(it, per_page))
+            name = "index" if p == 0 else f"p{p}"
+            nxt = f"p{p + 1}" if p + 1 < pages_per_chain else None
+            with open(os.path.join(directory, f"chain{c}", f"{name}.html"), "w", encoding="utf-8") as f:
+                f.write(timeline_page_html(page, nxt))
+    return chains * pages_per_chain
+
+
+class ChainHandler(SimpleHTTPRequestHandler):
+    latency = 0.0
+    throttle_every = 0
+    counter = itertools.count(1)
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        if self.throttle_every and next(self.counter) % self.throttle_every == 0:
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.end_headers()
+            return
+        url = urlsplit(self.path)
+        cursor = parse_qs(url.query).get("cursor", ["index"])[0]
+        self.path = f"{url.path.rstrip('/')}/{cursor}.html"
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(directory, latency, throttle_every):
+    handler = type("Handler", (ChainHandler,), {"latency": latency, "throttle_every": throttle_every,
+                                                 "counter": itertools.count(1)})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(handler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(label, chains, out, workers, pacer, max_pages=None):
+    state = out + ".state.json"
+    backfill = HistoryBackfill(chains, CsvAlertSink(out), state, workers, pacer)
+    t0 = time.perf_counter()
+    pages = backfill.run(max_pages)
+    dt = time.perf_counter() - t0
+    done = sum(chain["done"] for chain in backfill.state.values())
+    print(f"{label:>22}: {pages:3d} pages in {dt:6.2f}s ({pages / dt:5.1f} pages/s)  "
+          f"rows={backfill.sink.rows}  chains done={done}/{len(chains)}  throttled={pacer.throttled_count}")
+    return backfill
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", help="directory of recorded chains (default: synthesise)")
+    ap.add_argument("--csv", default="whale_alert_data.csv")
+    ap.add_argument("--chains", type=int, default=6)
+    ap.add_argument("--pages-per-chain", type=int, default=5)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--latency", type=float, default=0.2, help="server seconds per request")
+    ap.add_argument("--sleep", type=float, default=0.5, help="fixed per-page sleep of the baseline")
+    ap.add_argument("--throttle-every", type=int, default=15)
+    ap.add_argument("--stop-after", type=int, default=2, help="pages per chain before the interruption")
+    args = ap.parse_args()
+
+    directory = args.pages
+    if not directory:
+        directory = tempfile.mkdtemp()
+        synthesize_chains(directory, args.csv, args.chains, args.pages_per_chain)
+    names = sorted(d for d in os.listdir(directory) if os.path.isdir(os.path.join(directory, d)))
+
+    server = serve(directory, args.latency, args.throttle_every)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    chains = {name: f"{base}/{name}" for name in names}
+    work = tempfile.mkdtemp()
+    try:
+        fixed = AdaptivePacer(args.sleep, min_interval=args.sleep, step=0)
+        run("sequential fixed sleep", chains, os.path.join(work, "seq.csv"), 1, fixed)
+        run(f"{args.workers} workers adaptive", chains, os.path.join(work, "par.csv"), args.workers,
+            AdaptivePacer(args.sleep, min_interval=0.05))
+
+        out = os.path.join(work, "resume.csv")
+        run("interrupted", chains, out, args.workers, AdaptivePacer(args.sleep, 0.05), args.stop_after)
+        backfill = run("resumed", chains, out, args.workers, AdaptivePacer(args.sleep, 0.05))
+        df = pd.read_csv(out)
+        dupes = df["tweet_link"].duplicated().sum()
+        complete = all(chain["done"] for chain in backfill.state.values())
+        print(f"resume check: {len(df)} rows, {dupes} duplicates, all chains complete={complete}")
+        if dupes or not complete:
+            raise SystemExit(1)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Check the vectorized impact engine against the old per-row loop and time it.
+
+Builds a synthetic 1m random-walk candle series (with gaps), verifies that
+``compute_impact`` reproduces the pandas loop on a sample (prices and drops
+exactly, minutes to the low up to float rounding), then times the engine for
+growing numbers of transfers:
+
+    python bench_impact_engine.py --days 120 --sizes 1000 10000 100000 300000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from impact_engine import SparseTable, compute_impact
+
+MINUTE = 60_000
+
+
+def synthetic_candles(days, seed=0):
+    rng = np.random.default_rng(seed)
+    n = days * 1440
+    open_time = 1_700_000_000_000 // MINUTE * MINUTE + np.arange(n, dtype=np.int64) * MINUTE
+    open_time = open_time[rng.random(n) > 0.001]          # a few missing candles
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 5e-4, len(open_time))))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 3e-4, len(close))))
+    low = np.round(low, 2)                                 # create ties on the low
+    return open_time, open_, low
+
+
+def reference_impact(open_time, open_, low, tx_ms, window_ms):
+    """The analyzer's original per-transfer pandas logic."""
+    frame = pd.DataFrame({'open_time': pd.to_datetime(open_time, unit='ms'), 'open': open_, 'low': low})
+    out = []
+    for t in tx_ms:
+        timestamp = pd.Timestamp(int(t), unit='ms')
+        price_data = frame[(frame['open_time'] >= timestamp) &
+                           (frame['open_time'] <= timestamp + pd.Timedelta(milliseconds=window_ms))].copy()
+        if len(price_data) == 0:
+            out.append(None)
+            continue
+        price_data['time_diff'] = abs(price_data['open_time'] - timestamp)
+        price_at_tx = price_data.loc[price_data['time_diff'].idxmin()]['open']
+        after_tx = price_data[price_data['open_time'] >= timestamp]
+        lowest_price = after_tx['low'].min()
+        lowest_price_time = after_tx.loc[after_tx['low'].idxmin(), 'open_time']
+        out.append((price_at_tx, lowest_price,
+                    (lowest_price_time - timestamp).total_seconds() / 60,
+                    ((lowest_price - price_at_tx) / price_at_tx) * 100))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--days", type=int, default=120)
+    ap.add_argument("--window", type=int, default=15, help="window in minutes")
+    ap.add_argument("--check", type=int, default=500, help="transfers compared against the loop")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 300_000])
+    args = ap.parse_args()
+
+    open_time, open_, low = synthetic_candles(args.days)
+    window_ms = args.window * MINUTE
+    rng = np.random.default_rng(1)
+    span = (open_time[0] - 30 * MINUTE, open_time[-1] + 30 * MINUTE)
+
+    # parity with the loop, including unaligned timestamps and transfers outside the data
+    tx = rng.integers(*span, size=args.check)
+    tx[: args.check // 2] = tx[: args.check // 2] // MINUTE * MINUTE
+    impact = compute_impact(open_time, open_, low, tx, window_ms)
+    for i, ref in enumerate(reference_impact(open_time, open_, low, tx, window_ms)):
+        if ref is None:
+            assert not impact['valid'][i], i
+            continue
+        got = (impact['price_at_tx'][i], impact['lowest_price'][i],
+               impact['minutes_until_lowest'][i], impact['price_drop_pct'][i])
+        assert got[:2] == ref[:2] and got[3] == ref[3] and np.isclose(got[2], ref[2], rtol=1e-12), (i, got, ref)
+    print(f"parity: {args.check} transfers match the per-row loop")
+
+    t0 = time.perf_counter()
+    table = SparseTable(low)
+    print(f"index {len(open_time):,} candles: {(time.perf_counter() - t0) * 1000:.1f}ms")
+    for size in args.sizes:
+        tx = np.sort(rng.integers(*span, size=size))
+        t0 = time.perf_counter()
+        compute_impact(open_time, open_, low, tx, window_ms, low_table=table)
+        dt = time.perf_counter() - t0
+        print(f"{size:>9,} transfers: {dt * 1000:8.1f}ms  ({size / dt:,.0f} transfers/s)")
+
+
+if __name__ == "__main__":
+    main()
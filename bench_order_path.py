@@ -0,0 +1,166 @@
+"""Signal-to-order latency of short_perp with and without the hot standby.
+
+Runs the real order path of whale_bot_binance01 against a fake UMFutures
+client that sleeps ``--delay`` ms per REST call, then compares how long the
+position stays unprotected with sequential and concurrent TP/SL legs.
+``--trace`` also runs traced signals through ``execute_signal`` and prints
+the per-stage percentiles and the cost of the tracing itself:
+
+    python bench_order_path.py --delay 80 --runs 5 --fail-leg STOP_MARKET
+    python bench_order_path.py --trace /tmp/traces.jsonl
+"""
+import argparse
+import itertools
+import logging
+import statistics
+import time
+
+import whale_bot_binance01 as bot
+from order_intents import HotStandby
+from symbol_cache import SymbolInfoCache
+from timestamp_normalizer import TWITTER_EPOCH_MS
+from tracing import Tracer
+
+
+class FakeClient:
+    """Just enough of UMFutures for the order path, with injected network delay."""
+
+    def __init__(self, delay_ms=50, symbols=None, fail_leg=None):
+        self.delay = delay_ms / 1000
+        self.fail_leg = fail_leg
+        self._failed = set()
+        self.symbols = symbols or list(bot.PAIR_CFG)
+        self.calls = []
+        self._ids = itertools.count(1)
+
+    def _call(self, name):
+        self.calls.append(name)
+        time.sleep(self.delay)
+
+    def exchange_info(self):
+        self._call("exchange_info")
+        return {"symbols": [{
+            "symbol": s, "quantityPrecision": 1, "pricePrecision": 4,
+            "filters": [{"filterType": "LOT_SIZE", "stepSize": "0.1"},
+                        {"filterType": "PRICE_FILTER", "tickSize": "0.0001"}],
+        } for s in self.symbols]}
+
+    def account(self):
+        self._call("account")
+        return {"assets": [{"asset": "USDT", "walletBalance": "10000"}],
+                "positions": [{"symbol": s, "positionAmt": "0"} for s in self.symbols]}
+
+    def balance(self, **kwargs):
+        self._call("balance")
+        return [{"asset": "USDT", "balance": "10000"}]
+
+    def mark_price(self, symbol=None):
+        self._call("mark_price")
+        if symbol:
+            return {"symbol": symbol, "markPrice": "2.0"}
+        return [{"symbol": s, "markPrice": "2.0"} for s in self.symbols]
+
+    def change_leverage(self, **kwargs):
+        self._call("change_leverage")
+
+    def cancel_open_orders(self, **kwargs):
+        self._call("cancel_open_orders")
+
+    def new_order(self, **params):
+        self._call("new_order")
+        if params["type"] == self.fail_leg and params["type"] not in self._failed:
+            # reject the first attempt of this leg so it goes through the retry backoff
+            self._failed.add(params["type"])
+            raise ConnectionError(f"simulated failure on {params['type']}")
+        return {"orderId": next(self._ids), "avgPrice": "2.0", "status": "FILLED",
+                "updateTime": int(time.time() * 1000)}
+
+
+def bench(label, client, runs):
+    entry_calls, totals, stages = [], [], {}
+    for _ in range(runs):
+        if bot.standby:
+            bot.standby.open_positions.clear()
+        client.calls.clear()
+        timer = bot.short_perp("XRPUSDT", bot.PAIR_CFG["XRPUSDT"])
+        calls = client.calls[:client.calls.index("new_order") + 1]
+        entry_calls.append(len(calls))
+        totals.append(sum(v for k, v in timer.stages.items() if k != "protect"))
+        for k, v in timer.stages.items():
+            stages.setdefault(k, []).append(v)
+    print(f"{label:>5}: REST calls before entry ack={statistics.mean(entry_calls):.0f}  "
+          f"signal->entry ack={statistics.median(totals):7.1f}ms")
+    print("       " + "  ".join(f"{k}={statistics.median(v):.1f}ms" for k, v in stages.items()))
+
+
+def bench_protection(label, client, runs):
+    windows = []
+    for _ in range(runs):
+        bot.standby.open_positions.clear()
+        client._failed.clear()
+        bot.short_perp("XRPUSDT", bot.PAIR_CFG["XRPUSDT"])
+        windows.append(bot.OPEN_POS["XRPUSDT"]["unprotected_ms"])
+    print(f"{label:>10}: unprotected median={statistics.median(windows):7.1f}ms  max={max(windows):7.1f}ms")
+
+
+def bench_tracing(path, runs):
+    bot.tracer = Tracer(path)
+    for _ in range(runs):
+        bot.standby.open_positions.clear()
+        # a tweet posted 3s ago
+        tweet_id = (int(time.time() * 1000) - 3000 - TWITTER_EPOCH_MS) << 22
+        trace = bot.tracer.start(tweet_id)
+        trace.mark("parsed")
+        bot.execute_signal(("XRPUSDT", bot.PAIR_CFG["XRPUSDT"], trace))
+    summary = bot.tracer.summary()
+    for name in ("post_to_seen_ms", "queue_ms", "entry_ms", "seen_to_entry_ack_ms", "protect_ms",
+                 "seen_to_sl_ack_ms", "post_to_entry_exchange_ms"):
+        s = summary.get(name)
+        if s:
+            print(f"{name:>26}: p50={s['p50']:8.1f}ms  p99={s['p99']:8.1f}ms")
+    bot.tracer.close()
+
+    n = 20_000
+    tracer = Tracer()
+    t0 = time.perf_counter()
+    for i in range(n):
+        trace = tracer.start(1900000000000000000 + i)
+        for stage in ("parsed", "dispatched", "entry_ack", "tp_ack", "sl_ack"):
+            trace.mark(stage)
+        tracer.finish(trace, "ordered")
+    print(f"{'tracing overhead':>26}: {(time.perf_counter() - t0) / n * 1e6:.1f}us per trace")
+    bot.tracer = None
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--delay", type=float, default=50, help="injected latency per REST call (ms)")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--fail-leg", choices=["TAKE_PROFIT_MARKET", "STOP_MARKET"],
+                    help="reject the first attempt of this protective leg")
+    ap.add_argument("--trace", metavar="JSONL", help="also run traced signals, writing traces here")
+    args = ap.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    client = FakeClient(args.delay, fail_leg=args.fail_leg)
+    bot.client = client
+    bot.symbol_cache = SymbolInfoCache(client)
+    bot.symbol_cache.warm(bot.PAIR_CFG)
+
+    bot.standby = None
+    bench("cold", client, args.runs)
+
+    bot.standby = HotStandby(client, bot.PAIR_CFG, bot.symbol_cache, bot.ACCOUNT_RISK)
+    bot.standby.prepare()
+    bench("hot", client, args.runs)
+
+    for parallel in (False, True):
+        bot.PARALLEL_PROTECTION = parallel
+        bench_protection("concurrent" if parallel else "sequential", client, args.runs)
+
+    if args.trace:
+        bench_tracing(args.trace, args.runs)
+
+
+if __name__ == "__main__":
+    main()
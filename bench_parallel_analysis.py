@@ -0,0 +1,91 @@
+"""Per-symbol process-pool speedup of the analyzer on cached candles.
+
+Writes ``--days`` of synthetic 1m candles for ``--symbols`` symbols into a
+temporary kline store, spreads ``--transfers`` random transfers over them and
+runs the analyzer's ``analyze_chunk`` offline with each worker count, checking
+that every run gives the serial results:
+
+    python bench_parallel_analysis.py --symbols 8 --days 60 --transfers 200000 --workers 1 2 4 8
+
+Speedup is bounded by the number of cores and by the largest symbol's share
+of the work, since one symbol is never split across workers.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from impact_engine import DEFAULT_HORIZONS
+from kline_store import CANDLE_DTYPE, KlineStore
+from whalealerts_csv_analyser01 import analyze_chunk
+
+MINUTE = 60_000
+START_MS = 1_700_000_000_000 // 86_400_000 * 86_400_000
+
+
+def synthetic_store(root, symbols, days, seed=0):
+    rng = np.random.default_rng(seed)
+    store = KlineStore(root)
+    n = days * 1440
+    for symbol in symbols:
+        candles = np.empty(n, dtype=CANDLE_DTYPE)
+        candles['open_time'] = START_MS + np.arange(n, dtype=np.int64) * MINUTE
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 5e-4, n)))
+        candles['open'] = np.concatenate([[100.0], close[:-1]])
+        candles['close'] = close
+        spread = np.abs(rng.normal(0, 3e-4, (2, n)))
+        candles['high'] = np.maximum(candles['open'], close) * (1 + spread[0])
+        candles['low'] = np.minimum(candles['open'], close) * (1 - spread[1])
+        candles['volume'] = rng.lognormal(3, 1, n)
+        store.write(symbol, "1m", candles, covered=[(START_MS, START_MS + n * MINUTE - 1)])
+
+
+def synthetic_transfers(currencies, days, count, seed=1):
+    rng = np.random.default_rng(seed)
+    tx_ms = rng.integers(START_MS, START_MS + days * 1440 * MINUTE, size=count)
+    return pd.DataFrame({
+        'currency': rng.choice(currencies, size=count),
+        'amount': rng.lognormal(8, 2, count).round(2),
+        'usd_value': rng.lognormal(16, 1, count).round(0),
+        'timestamp': pd.to_datetime(tx_ms, unit='ms', utc=True),
+        'to_entity': rng.choice(['Binance', 'Coinbase', 'OKX'], size=count),
+    })
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--symbols", type=int, default=8)
+    ap.add_argument("--days", type=int, default=60)
+    ap.add_argument("--transfers", type=int, default=200_000)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = ap.parse_args()
+
+    currencies = [f"C{i:02d}" for i in range(args.symbols)]
+    transfers = synthetic_transfers(currencies, args.days, args.transfers)
+    print(f"{os.cpu_count()} cores, {args.symbols} symbols x {args.days} days of candles, "
+          f"{args.transfers:,} transfers")
+
+    with tempfile.TemporaryDirectory() as root:
+        synthetic_store(root, [f"{c}USDT" for c in currencies], args.days)
+        reference = None
+        base = None
+        for workers in args.workers:
+            t0 = time.perf_counter()
+            results, horizon_tables = analyze_chunk(transfers, root, offline=True, max_workers=4, window_minutes=15,
+                                                    horizons=DEFAULT_HORIZONS, verbose=False, workers=workers)
+            dt = time.perf_counter() - t0
+            out = (pd.concat(results).sort_values('transaction_id').reset_index(drop=True),
+                   pd.concat(horizon_tables, ignore_index=True))
+            if reference is None:
+                reference, base = out, dt
+            else:
+                assert out[0].equals(reference[0]) and out[1].equals(reference[1]), workers
+            print(f"{workers:>3} workers: {dt:7.2f}s  speedup {base / dt:5.2f}x  "
+                  f"efficiency {base / dt / workers:4.0%}")
+
+
+if __name__ == "__main__":
+    main()
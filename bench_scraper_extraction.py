@@ -0,0 +1,160 @@
+"""Compare the scraper's per-element, bulk-script and page_source extraction paths.
+
+Every saved nitter page in ``--pages`` (default: one synthesised from
+whale_alert_data.csv) is processed the way ``scrape_tweets`` does it, once per
+extraction mode.  By default the WebDriver is simulated: each call costs
+``--rtt`` milliseconds, like an IPC round trip to geckodriver, and calls are
+counted.  With ``--browser`` the pages are loaded from disk into a real
+headless Firefox instead:
+
+    python bench_scraper_extraction.py --pages snapshots/ --rtt 2
+    python bench_scraper_extraction.py --pages snapshots/ --browser
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import pathlib
+import statistics
+import tempfile
+import time
+from urllib.parse import urljoin
+
+from bench_timeline_source import synthesize_page
+from timeline_source import parse_timeline_page
+from twitter_scraper01 import WhaleAlertScraper
+
+
+class FakeElement:
+    def __init__(self, driver, item=None, attrs=None, text=""):
+        self.driver = driver
+        self.item = item
+        self.attrs = attrs or {}
+        self._text = text
+
+    @property
+    def text(self):
+        self.driver.call()
+        return self._text
+
+    def get_attribute(self, name):
+        self.driver.call()
+        return self.attrs.get(name)
+
+    def find_element(self, by, selector):
+        self.driver.call()
+        item = self.item
+        if selector == ".tweet-content":
+            return FakeElement(self.driver, text=item["text"])
+        if selector == ".tweet-date a":
+            return FakeElement(self.driver, attrs={"title": item["timestamp_text"]})
+        if selector == ".tweet-link":
+            return FakeElement(self.driver, attrs={"href": item["link"]})
+        raise ValueError(selector)
+
+
+class FakeDriver:
+    """Serves one saved page; every WebDriver call sleeps ``rtt_ms`` and is counted."""
+
+    def __init__(self, html, url, rtt_ms):
+        self.html = html
+        self.url = url
+        self.rtt = rtt_ms / 1000
+        self.calls = 0
+        self.items, self.next_href = parse_timeline_page(html)
+
+    def call(self):
+        self.calls += 1
+        time.sleep(self.rtt)
+
+    def find_elements(self, by, selector):
+        self.call()
+        if selector == ".timeline-item":
+            return [FakeElement(self, item, {"class": "timeline-item "}) for item in self.items]
+        if selector == ".show-more a" and self.next_href:
+            return [FakeElement(self, attrs={"href": self.next_href}, text="Load more")]
+        return []
+
+    def execute_script(self, script):
+        self.call()
+        # like the browser, ``a.href`` comes back absolute
+        items = [dict(id=i["id"], cls="timeline-item ", text=i["text"], timestamp_text=i["timestamp_text"],
+                      link=urljoin(self.url, i["link"])) for i in self.items]
+        return json.dumps({"items": items, "next": urljoin(self.url, self.next_href) if self.next_href else None})
+
+    @property
+    def page_source(self):
+        self.call()
+        return self.html
+
+    def get(self, url):
+        self.call()
+
+    def quit(self):
+        pass
+
+
+def scrape_page(scraper, url):
+    """One page of scrape_tweets: the item loop and the next-page lookup."""
+    scraper.driver.get(url)
+    if scraper.extraction == "elements":
+        tweets = [t for t in scraper.driver.find_elements("css selector", ".timeline-item")
+                  if t.get_attribute("class") == "timeline-item "]
+        records = [scraper.process_tweet(t) for t in tweets]
+        next_url = scraper.find_next_page_url()
+    else:
+        items, next_url = scraper.extract_page(url)
+        records = [scraper.process_item(item) for item in items]
+    return [r for r in records if r], next_url
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", help="directory of saved nitter pages (*.html)")
+    ap.add_argument("--rtt", type=float, default=1.0, help="simulated ms per WebDriver call")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--browser", action="store_true", help="use a real headless Firefox")
+    args = ap.parse_args()
+
+    if args.pages:
+        paths = sorted(glob.glob(os.path.join(args.pages, "*.html")))
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "whale_alert.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(synthesize_page(limit=20))
+        paths = [path]
+
+    scraper = WhaleAlertScraper(headless=True)
+    if args.browser:
+        scraper.start_driver()
+    # the scraper logs every tweet it processes; keep the timings clean
+    logging.getLogger().setLevel(logging.WARNING)
+    try:
+        baseline = None
+        for mode in ("elements", "script", "page_source"):
+            scraper.extraction = mode
+            times, calls, rows = [], 0, 0
+            for _ in range(args.repeat):
+                for path in paths:
+                    url = pathlib.Path(path).absolute().as_uri()
+                    if not args.browser:
+                        with open(path, encoding="utf-8") as f:
+                            scraper.driver = FakeDriver(f.read(), url, args.rtt)
+                    t0 = time.perf_counter()
+                    records, _ = scrape_page(scraper, url)
+                    times.append((time.perf_counter() - t0) * 1000)
+                    rows += len(records)
+                    calls += getattr(scraper.driver, "calls", 0)
+            per_page = statistics.median(times)
+            baseline = baseline or per_page
+            rtts = f"  round trips/page={calls / len(times):6.1f}" if not args.browser else ""
+            print(f"{mode:>12}: {per_page:8.1f}ms/page  ({baseline / per_page:5.1f}x)  "
+                  f"records/page={rows / len(times):5.1f}{rtts}")
+    finally:
+        if args.browser:
+            scraper.close_driver()
+
+
+if __name__ == "__main__":
+    main()
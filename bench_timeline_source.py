@@ -0,0 +1,99 @@
+"""Compare fetch-to-parse latency of the HTTP and Selenium timeline backends.
+
+Serves recorded nitter pages from a directory over a local stub HTTP server and
+polls them with each backend:
+
+    python bench_timeline_source.py --pages snapshots/ --polls 20 --selenium
+
+Without ``--pages`` a timeline page is synthesised from whale_alert_data.csv.
+"""
+import argparse
+import csv
+import functools
+import html
+import os
+import re
+import statistics
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from timeline_source import HttpTimelineSource, SeleniumTimelineSource
+
+
+def timeline_item_html(row):
+    """One nitter ``.timeline-item`` for a row of a scraped CSV (linking ``row["tx_url"]`` if set)."""
+    link = (row["tweet_link"] or "").replace("https://nitter.net", "")
+    text = html.escape(row["raw_text"]).replace("\n", "<br>")
+    if row.get("tx_url"):
+        text = re.sub(r"whale-alert\.io/transaction/\S*…", lambda m: f'<a href="{row["tx_url"]}">{m.group(0)}</a>', text)
+    return (
+        f'<div class="timeline-item " data-username="whale_alert">'
+        f'<a class="tweet-link" href="{link}"></a><div class="tweet-body"><div>'
+        f'<div class="tweet-header"><span class="tweet-date">'
+        f'<a href="{link}" title="{html.escape(row["timestamp_text"])}">x</a></span></div></div>'
+        f'<div class="tweet-content media-body" dir="auto">{text}</div></div></div>'
+    )
+
+
+def timeline_page_html(rows, next_cursor=None):
+    """A nitter-like timeline page for ``rows``, with a "Load more" link when ``next_cursor`` is set."""
+    more = f'<div class="show-more"><a href="?cursor={next_cursor}">Load more</a></div>' if next_cursor else ""
+    return ('<html><body><div class="timeline">' + "".join(timeline_item_html(r) for r in rows)
+            + more + "</div></body></html>")
+
+
+def synthesize_page(csv_file="whale_alert_data.csv", limit=20):
+    """Build a nitter-like timeline page from the raw_text column of a scraped CSV."""
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        rows = [row for _, row in zip(range(limit), csv.DictReader(f))]
+    return timeline_page_html(rows)
+
+
+def serve(directory):
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=directory)
+    handler.log_message = lambda *args: None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(source, polls):
+    fetch, parse, count = [], [], 0
+    for _ in range(polls):
+        items = source.fetch()
+        count = len(items) or count
+        fetch.append(source.last_fetch_ms)
+        parse.append(source.last_parse_ms)
+    source.close()
+    print(f"{source.name:>8}: items={count:3d}  fetch median={statistics.median(fetch):8.1f}ms  "
+          f"parse median={statistics.median(parse):6.2f}ms  max={max(f + p for f, p in zip(fetch, parse)):8.1f}ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", help="directory of recorded nitter pages (default: synthesise one)")
+    ap.add_argument("--page", default="whale_alert.html", help="page within --pages to poll")
+    ap.add_argument("--polls", type=int, default=20)
+    ap.add_argument("--selenium", action="store_true", help="also time the Selenium backend")
+    args = ap.parse_args()
+
+    directory = args.pages
+    if not directory:
+        directory = tempfile.mkdtemp()
+        with open(os.path.join(directory, args.page), "w", encoding="utf-8") as f:
+            f.write(synthesize_page())
+
+    server = serve(directory)
+    url = f"http://127.0.0.1:{server.server_address[1]}/{args.page}"
+    try:
+        # first poll is a full download, the rest are conditional and come back 304
+        run(HttpTimelineSource(url), args.polls)
+        if args.selenium:
+            run(SeleniumTimelineSource(url), args.polls)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Time the timestamp normalizer against the scraper's old per-row parsing.
+
+Checks that the vectorized parse of ``timestamp_text`` agrees with the
+``timestamp`` column of a scraped CSV and with the tweet-id snowflakes (the
+title text is minute-resolution, so the snowflake must fall in that minute),
+then times both paths over the column repeated ``--repeat`` times:
+
+    python bench_timestamp_normalizer.py --repeat 200
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from timestamp_normalizer import TimestampNormalizer, snowflake_times, to_utc
+
+
+def legacy_format_timestamp(timestamp_text):
+    """The old WhaleAlertScraper.format_timestamp branch taken by nitter titles."""
+    parts = timestamp_text.split("·")
+    return pd.to_datetime(f"{parts[0].strip()} {parts[1].strip().replace(' UTC', '')}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--csv", default="whale_alert_data.csv")
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+
+    df = pd.read_csv(args.csv)
+    parsed = TimestampNormalizer().parse_series(df["timestamp_text"])
+    exact = snowflake_times(df["tweet_link"])
+    lag = (exact - parsed).dt.total_seconds()
+    print(f"parsed {parsed.notna().sum()}/{len(df)}, equal to the CSV timestamp column: "
+          f"{(parsed == to_utc(df['timestamp'])).sum()}, snowflake within the title minute: "
+          f"{lag.between(0, 60).sum()}/{exact.notna().sum()}")
+
+    texts = pd.concat([df["timestamp_text"]] * args.repeat, ignore_index=True)
+    links = pd.concat([df["tweet_link"]] * args.repeat, ignore_index=True)
+    for label, fn in (("legacy per-row", lambda: [legacy_format_timestamp(t) for t in texts]),
+                      ("vectorized text", lambda: TimestampNormalizer().parse_series(texts)),
+                      ("snowflake", lambda: snowflake_times(links))):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        print(f"{label:>16}: {len(texts) / dt:12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Shared registry of the entities named in whale alerts.
+
+Every known entity has a canonical name, a type (exchange, defi, treasury,
+...) and a set of aliases, each optionally tagged with the kind of wallet it
+names (hot, cold, deposit).  Names are matched case-insensitively after
+dropping a leading ``#``; a name that is not an alias but starts with one on
+a word boundary ("Binance US") resolves to that entity, and anything starting
+with "unknown" is an unknown wallet.
+
+Columns are classified through ``pd.Categorical`` so each distinct name is
+looked up once and rows only carry integer codes.  ``ENTITY_TYPES`` fixes
+the codes stored in datasets: only ever append to it.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+ENTITY_TYPES = ("unknown", "exchange", "defi", "treasury", "market_maker", "custodian",
+                "mining_pool", "fund", "mint", "burn", "escrow", "other")
+TYPE_CODE = {name: code for code, name in enumerate(ENTITY_TYPES)}
+UNKNOWN, EXCHANGE = TYPE_CODE["unknown"], TYPE_CODE["exchange"]
+
+# canonical name: (type, {alias: wallet tag or None})
+ENTITIES = {
+    "Binance": ("exchange", {"Binance Hot Wallet": "hot", "Binance Cold Wallet": "cold",
+                             "Binance Beacon Deposit": "deposit"}),
+    "Coinbase": ("exchange", {"Coinbase Hot Wallet": "hot", "Coinbase Cold Wallet": "cold"}),
+    "Coinbase Institutional": ("exchange", {"Coinbase Prime": None}),
+    "Kraken": ("exchange", {}),
+    "Bitfinex": ("exchange", {}),
+    "HTX": ("exchange", {"Huobi": None}),
+    "OKX": ("exchange", {"OKEx": None}),
+    "Bybit": ("exchange", {}),
+    "KuCoin": ("exchange", {}),
+    "Bitstamp": ("exchange", {}),
+    "Crypto.com": ("exchange", {"CryptoCom": None}),
+    "Bitget": ("exchange", {}),
+    "Gate.io": ("exchange", {"GateIO": None}),
+    "Bithumb": ("exchange", {}),
+    "Upbit": ("exchange", {}),
+    "Gemini": ("exchange", {}),
+    "Bitvavo": ("exchange", {}),
+    "Robinhood": ("exchange", {}),
+    "Aave": ("defi", {}),
+    "JustLendDAO": ("defi", {}),
+    "Uniswap": ("defi", {}),
+    "Arbitrum": ("defi", {}),
+    "USDC Treasury": ("treasury", {}),
+    "Tether Treasury": ("treasury", {}),
+    "Paxos": ("treasury", {}),
+    "Ripple": ("treasury", {}),
+    "Fantom Foundation": ("treasury", {}),
+    "Cumberland": ("market_maker", {}),
+    "Wintermute": ("market_maker", {}),
+    "FalconX": ("market_maker", {}),
+    "Galaxy Digital": ("market_maker", {}),
+    "Ceffu": ("custodian", {}),
+    "Zero Hash": ("custodian", {}),
+    "Cobo": ("custodian", {}),
+    "MtGox": ("custodian", {"Mt. Gox": None}),
+    "Antpool": ("mining_pool", {}),
+    "VanEck": ("fund", {}),
+    # sides filled in by alert_parser for single-entity alerts
+    "mint": ("mint", {}),
+    "burn": ("burn", {"Burn Address": None}),
+    "escrow": ("escrow", {}),
+}
+
+
+def _key(name):
+    return name.strip().lstrip("#").strip().lower()
+
+
+class EntityRegistry:
+    """Resolve entity names to ``(canonical, type, wallet)``."""
+
+    def __init__(self, entities=ENTITIES):
+        self.entities = entities
+        self.aliases = {}
+        for canonical, (etype, aliases) in entities.items():
+            if etype not in TYPE_CODE:
+                raise ValueError(f"Unknown entity type {etype!r} for {canonical}")
+            self.aliases[_key(canonical)] = (canonical, etype, None)
+            for alias, wallet in aliases.items():
+                self.aliases[_key(alias)] = (canonical, etype, wallet)
+        # longest first, so 'Coinbase Institutional X' beats 'Coinbase'
+        self._prefixes = sorted(self.aliases, key=len, reverse=True)
+        self.lookup = lru_cache(maxsize=4096)(self._lookup)
+
+    def _lookup(self, name):
+        if not isinstance(name, str) or not name.strip():
+            return None, "unknown", None
+        key = _key(name)
+        if key in self.aliases:
+            return self.aliases[key]
+        if key.startswith("unknown"):
+            return None, "unknown", None
+        for alias in self._prefixes:
+            if key.startswith(alias + " "):
+                return self.aliases[alias]
+        return name.strip().lstrip("#"), "other", None
+
+    def type_of(self, name):
+        return self.lookup(name)[1]
+
+    def type_code(self, name):
+        return TYPE_CODE[self.lookup(name)[1]]
+
+    def is_exchange(self, name):
+        return self.lookup(name)[1] == "exchange"
+
+    def classify(self, names):
+        """Canonical name, type code (int8, see ENTITY_TYPES) and wallet tag for a column of names."""
+        cat = pd.Categorical(pd.Series(names, dtype=object))
+        # one lookup per distinct name; missing names have code -1, which picks the sentinel
+        resolved = [self.lookup(name) for name in cat.categories] + [(None, "unknown", None)]
+        codes = cat.codes
+        return pd.DataFrame({
+            "canonical": pd.Categorical(np.array([r[0] for r in resolved], dtype=object)[codes]),
+            "type": np.array([TYPE_CODE[r[1]] for r in resolved], dtype=np.int8)[codes],
+            "wallet": pd.Categorical(np.array([r[2] for r in resolved], dtype=object)[codes]),
+        }, index=getattr(names, "index", None))
+
+
+REGISTRY = EntityRegistry()
+
+
+def annotate(df, registry=REGISTRY):
+    """Add ``from_type``/``to_type`` codes plus the destination's ``to_canonical`` and ``to_wallet``."""
+    src = registry.classify(df["from_entity"])
+    dst = registry.classify(df["to_entity"])
+    df["from_type"] = src["type"].to_numpy()
+    df["to_type"] = dst["type"].to_numpy()
+    df["to_canonical"] = dst["canonical"].to_numpy()
+    df["to_wallet"] = dst["wallet"].to_numpy()
+    return df
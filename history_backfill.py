@@ -0,0 +1,238 @@
+"""Resumable, parallel historical scrape of the whale_alert nitter timeline.
+
+A nitter timeline can only be paged backwards one "Load more" cursor at a
+time, so the history is cut into independent chains (one date-sliced search
+per ``--slice-days``) and a small pool of workers walks the chains in
+parallel over plain HTTP sessions.  Every page's ``?cursor=`` URL is saved in
+a JSON state file once the page's rows are in the CSV sink, so an
+interrupted run picks up each chain where it stopped.  Requests are paced by
+an ``AdaptivePacer`` shared by all workers instead of a fixed sleep:
+
+    python history_backfill.py --since 2024-01-01 --until 2025-05-01 --workers 4
+    python history_backfill.py --url http://127.0.0.1:8000/whale_alert   # single chain
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib.parse import urlencode, urljoin
+
+import requests
+
+from alert_parser import parse_alert
+from alert_sink import CsvAlertSink
+from entity_registry import REGISTRY
+from timeline_source import USER_AGENT, parse_timeline_page
+from timestamp_normalizer import format_utc, normalize_timestamps
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUS = {429, 503}
+
+
+class AdaptivePacer:
+    """Spacing between requests shared by all workers (AIMD on the request rate).
+
+    Each success shrinks the interval by ``step`` seconds down to
+    ``min_interval``; a 429/503 doubles it (up to ``max_interval``) and holds
+    every worker back for the server's Retry-After, if it sent one.
+    """
+
+    def __init__(self, interval=1.0, min_interval=0.2, max_interval=60.0, step=0.05):
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.step = step
+        self.throttled_count = 0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def success(self):
+        with self._lock:
+            self.interval = max(self.min_interval, self.interval - self.step)
+
+    def throttled(self, retry_after=None):
+        with self._lock:
+            self.throttled_count += 1
+            self.interval = min(self.max_interval, self.interval * 2)
+            if retry_after:
+                self._next = max(self._next, time.monotonic() + retry_after)
+
+
+def date_chains(base_url, user, since, until, slice_days=7):
+    """One search URL per date slice, newest slice first: {name: url}."""
+    chains = {}
+    end = until
+    while end > since:
+        start = max(since, end - timedelta(days=slice_days))
+        query = urlencode({"f": "tweets", "q": "", "since": start.isoformat(), "until": end.isoformat()})
+        chains[f"{start.isoformat()}_{end.isoformat()}"] = f"{base_url}/{user}/search?{query}"
+        end = start
+    return chains
+
+
+def page_records(items, page_url):
+    """Alert rows (the scraper's CSV columns) for the parsable items of one page."""
+    records = []
+    for item in items:
+        if item["pinned"] or item["retweet"] or not item["text"]:
+            continue
+        parsed = parse_alert(item["text"])
+        if not parsed:
+            continue
+        parsed["timestamp_text"] = item["timestamp_text"]
+        parsed["tweet_link"] = urljoin(page_url, item["link"]) if item["link"] else None
+        parsed["from_type"] = REGISTRY.type_code(parsed["from_entity"])
+        parsed["to_type"] = REGISTRY.type_code(parsed["to_entity"])
+        records.append(parsed)
+    if records:
+        ts = normalize_timestamps([r["timestamp_text"] for r in records], [r["tweet_link"] for r in records])
+        for record, t in zip(records, ts):
+            record["timestamp"] = format_utc(t)
+    return records
+
+
+class HistoryBackfill:
+    """Walk several pagination chains concurrently into one ``CsvAlertSink``."""
+
+    def __init__(self, chains, sink, state_path="history_state.json", workers=4, pacer=None,
+                 timeout=15, max_retries=5):
+        self.sink = sink
+        self.state_path = state_path
+        self.workers = workers
+        self.pacer = pacer or AdaptivePacer()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.pages = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.state = self._load_state()
+        for name, url in chains.items():
+            self.state.setdefault(name, {"url": url, "cursor": None, "pages": 0, "rows": 0, "done": False})
+
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path) as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not load backfill state from {self.state_path}: {e}")
+        return {}
+
+    def _save_state(self):
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=1)
+        os.replace(tmp, self.state_path)
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers["User-Agent"] = USER_AGENT
+        return session
+
+    def fetch(self, url):
+        """GET one page with pacing; retries throttling and transient errors."""
+        for attempt in range(self.max_retries):
+            self.pacer.wait()
+            try:
+                resp = self._session().get(url, timeout=self.timeout)
+            except requests.RequestException as e:
+                logger.warning(f"{url}: {e} (attempt {attempt + 1}/{self.max_retries})")
+                self.pacer.throttled()
+                continue
+            if resp.status_code in THROTTLE_STATUS:
+                retry_after = resp.headers.get("Retry-After")
+                self.pacer.throttled(float(retry_after) if retry_after and retry_after.isdigit() else None)
+                logger.warning(f"{url}: HTTP {resp.status_code}, interval now {self.pacer.interval:.2f}s")
+                continue
+            resp.raise_for_status()
+            self.pacer.success()
+            return resp.text
+        raise RuntimeError(f"Giving up on {url} after {self.max_retries} attempts")
+
+    def walk(self, name, max_pages=None):
+        """Follow one chain from its saved cursor to the end (or ``max_pages`` pages)."""
+        chain = self.state[name]
+        url = chain["cursor"] or chain["url"]
+        walked = 0
+        while not chain["done"] and (max_pages is None or walked < max_pages):
+            items, next_href = parse_timeline_page(self.fetch(url))
+            records = page_records(items, url)
+            next_url = urljoin(url, next_href) if next_href and items else None
+            with self._lock:
+                written = self.sink.write_page(records)
+                chain["pages"] += 1
+                chain["rows"] += written
+                chain["cursor"] = next_url
+                chain["done"] = next_url is None
+                self.pages += 1
+                self._save_state()
+            walked += 1
+            logger.info(f"{name}: page {chain['pages']}, {written} new rows"
+                        f"{'' if next_url else ', end of chain'}")
+            url = next_url
+        return walked
+
+    def run(self, max_pages_per_chain=None):
+        pending = [name for name, chain in self.state.items() if not chain["done"]]
+        logger.info(f"{len(pending)} of {len(self.state)} chains left, {self.workers} workers")
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.walk, name, max_pages_per_chain): name for name in pending}
+            for future, name in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Chain {name} stopped: {e}")
+        self.sink.close()
+        return self.pages
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--base", default="https://nitter.net")
+    ap.add_argument("--user", default="whale_alert")
+    ap.add_argument("--since", type=date.fromisoformat, help="first day of the date-sliced chains")
+    ap.add_argument("--until", type=date.fromisoformat, default=date.today() + timedelta(days=1))
+    ap.add_argument("--slice-days", type=int, default=7)
+    ap.add_argument("--url", help="walk this single timeline URL instead of date slices")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--interval", type=float, default=1.0, help="initial seconds between requests")
+    ap.add_argument("--min-interval", type=float, default=0.2)
+    ap.add_argument("--max-pages", type=int, help="stop each chain after this many pages in this run")
+    ap.add_argument("--out", default="whale_alert_history.csv")
+    ap.add_argument("--state", default="history_state.json")
+    args = ap.parse_args()
+
+    if args.url:
+        chains = {"timeline": args.url}
+    elif args.since:
+        chains = date_chains(args.base, args.user, args.since, args.until, args.slice_days)
+    else:
+        ap.error("pass --since for date-sliced chains or --url for a single timeline")
+
+    backfill = HistoryBackfill(chains, CsvAlertSink(args.out), args.state, args.workers,
+                               AdaptivePacer(args.interval, args.min_interval))
+    t0 = time.perf_counter()
+    pages = backfill.run(args.max_pages)
+    done = sum(chain["done"] for chain in backfill.state.values())
+    print(f"{pages} pages in {time.perf_counter() - t0:.1f}s, {backfill.sink.rows} rows in {args.out}, "
+          f"{done}/{len(backfill.state)} chains complete, {backfill.pacer.throttled_count} throttled")
+
+
+if __name__ == "__main__":
+    main()
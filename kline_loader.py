@@ -0,0 +1,187 @@
+"""Batched Binance kline loading for the whale transfer analyzer.
+
+Instead of one REST request per transfer, the windows needed for every
+transfer of a symbol are merged into as few 1000-candle requests as possible,
+fetched concurrently over a pooled session while respecting the API weight
+limit, and the per-transfer windows are then sliced from the merged frames.
+With a ``KlineStore`` attached only ranges missing from the on-disk cache are
+requested, so a re-run over the same alerts needs no network at all.
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from kline_store import klines_to_array, array_to_frame
+
+KLINES_URL = "https://api.binance.com/api/v3/klines"
+KLINE_COLUMNS = [
+    'open_time', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_asset_volume', 'number_of_trades',
+    'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
+]
+INTERVAL_MS = {'1m': 60_000, '3m': 180_000, '5m': 300_000, '15m': 900_000, '1h': 3_600_000}
+MAX_CANDLES = 1000
+WEIGHT_LIMIT = 6000          # request weight per minute for api.binance.com
+
+
+def merge_windows(windows, interval_ms, max_candles=MAX_CANDLES):
+    """Pack (start_ms, end_ms) windows into as few request spans of ≤ max_candles as possible.
+
+    A request costs the same however much of its 1000 candles is used, so a
+    window that starts within reach of the previous span joins it even across
+    a gap; whatever does not fit continues in the next span.
+    """
+    chunk = max_candles * interval_ms
+    spans = []
+    for start, end in sorted(windows):
+        if spans:
+            span_start, span_end = spans[-1]
+            limit = span_start + chunk - 1
+            if end <= span_end:
+                continue
+            if start <= limit:
+                spans[-1] = (span_start, min(end, limit))
+                start = limit + 1
+        while start <= end:
+            spans.append((start, min(end, start + chunk - 1)))
+            start += chunk
+    return spans
+
+
+def klines_to_frame(data):
+    df = pd.DataFrame(data, columns=KLINE_COLUMNS)
+    df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
+    df['close_time'] = pd.to_datetime(df['close_time'], unit='ms')
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        df[col] = df[col].astype(float)
+    return df
+
+
+class KlineLoader:
+    """Fetch merged kline spans per symbol and serve per-transfer windows from memory."""
+
+    def __init__(self, interval="1m", max_workers=4, session=None, weight_limit=WEIGHT_LIMIT,
+                 store=None, offline=False):
+        self.interval = interval
+        self.store = store
+        self.offline = offline
+        self.interval_ms = INTERVAL_MS[interval]
+        self.max_workers = max_workers
+        self.weight_limit = weight_limit
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.requests_made = 0
+        self.frames = {}             # symbol -> merged DataFrame
+        self._open_ms = {}           # symbol -> int64 open_time array for slicing
+        self._pause_until = 0.0
+        self._lock = threading.Lock()
+
+    def _throttle(self):
+        with self._lock:
+            wait = self._pause_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def _pause(self, seconds):
+        with self._lock:
+            self._pause_until = max(self._pause_until, time.monotonic() + seconds)
+
+    def fetch(self, symbol, start_ms, end_ms, max_retries=5):
+        """One klines request; backs off on 429/418 and when the used weight nears the limit.
+
+        Returns the raw rows ([] if Binance has no candles there) or None on failure.
+        """
+        params = {'symbol': symbol, 'interval': self.interval,
+                  'startTime': int(start_ms), 'endTime': int(end_ms), 'limit': MAX_CANDLES}
+        for attempt in range(max_retries):
+            self._throttle()
+            response = self.session.get(KLINES_URL, params=params, timeout=10)
+            with self._lock:
+                self.requests_made += 1
+            if response.status_code in (418, 429):
+                self._pause(float(response.headers.get('Retry-After', 2 ** attempt)))
+                continue
+            if response.status_code != 200:
+                print(f"Error fetching price data: {response.status_code} - {response.text}")
+                return None
+            used = int(response.headers.get('X-MBX-USED-WEIGHT-1M', 0))
+            if used > 0.8 * self.weight_limit:
+                self._pause(60 - time.time() % 60)   # weight resets at the next minute
+            return response.json()
+        print(f"Giving up on {symbol} {start_ms}-{end_ms} after {max_retries} rate-limited attempts")
+        return None
+
+    def load(self, windows_by_symbol):
+        """Fetch everything needed for ``{symbol: [(start_ms, end_ms), ...]}`` in parallel."""
+        jobs = []
+        for symbol, windows in windows_by_symbol.items():
+            if self.store is not None:
+                windows = self.store.missing(symbol, self.interval, windows)
+            jobs += [(symbol, start, end) for start, end in merge_windows(windows, self.interval_ms)]
+        total = sum(len(w) for w in windows_by_symbol.values())
+        if self.offline and jobs:
+            print(f"Offline: skipping {len(jobs)} kline spans missing from the cache")
+            jobs = []
+        print(f"Fetching {len(jobs)} kline spans for {len(windows_by_symbol)} symbols "
+              f"(instead of {total} per-transfer requests)")
+
+        raw = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.fetch, *job): job for job in jobs}
+            for fut in as_completed(futures):
+                symbol, start, end = futures[fut]
+                try:
+                    rows = fut.result()
+                except Exception as e:
+                    print(f"Exception while fetching price data for {symbol}: {e}")
+                    continue
+                if rows is None:
+                    continue
+                if self.store is not None:
+                    # never mark the still-open candle as covered
+                    last_closed = int(time.time() * 1000) - self.interval_ms
+                    self.store.write(symbol, self.interval, klines_to_array(rows),
+                                     covered=[(start, min(end, last_closed))])
+                else:
+                    raw.setdefault(symbol, []).extend(rows)
+
+        if self.store is not None:
+            for symbol, windows in windows_by_symbol.items():
+                arr = self.store.read(symbol, self.interval,
+                                      min(w[0] for w in windows), max(w[1] for w in windows))
+                if len(arr):
+                    self.add_frame(symbol, array_to_frame(arr))
+        else:
+            for symbol, rows in raw.items():
+                if rows:
+                    self.add_frame(symbol, klines_to_frame(rows))
+        return self.frames
+
+    def add_frame(self, symbol, df):
+        df = df.drop_duplicates('open_time').sort_values('open_time').reset_index(drop=True)
+        self.frames[symbol] = df
+        self._open_ms[symbol] = df['open_time'].values.astype('datetime64[ms]').astype(np.int64)
+
+    def window(self, symbol, start_ms, end_ms):
+        """Candles with start_ms ≤ open_time ≤ end_ms, like a klines request for that range."""
+        if symbol not in self.frames:
+            return None
+        open_ms = self._open_ms[symbol]
+        i0 = np.searchsorted(open_ms, start_ms, 'left')
+        i1 = np.searchsorted(open_ms, end_ms, 'right')
+        return self.frames[symbol].iloc[i0:i1].copy()
+
+    def arrays(self, symbol):
+        """NumPy views of the merged candles for ``symbol`` (open_time in ms), or None."""
+        if symbol not in self.frames:
+            return None
+        df = self.frames[symbol]
+        out = {name: df[name].to_numpy(dtype=float) for name in ('open', 'high', 'low', 'close', 'volume')}
+        out['open_time'] = self._open_ms[symbol]
+        return out
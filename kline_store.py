@@ -0,0 +1,137 @@
+"""Persistent on-disk candle store for the analyzer.
+
+Historical 1m candles never change, so once fetched they are kept under
+``root/<SYMBOL>/<interval>/<YYYY-MM-DD>.npy`` as structured NumPy arrays
+(loaded memory-mapped) together with a ``coverage.json`` of the time ranges
+already requested from Binance, including ranges that returned no candles.
+Only ranges outside the recorded coverage ever need to be fetched.
+"""
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+CANDLE_DTYPE = np.dtype([('open_time', '<i8'), ('open', '<f8'), ('high', '<f8'),
+                         ('low', '<f8'), ('close', '<f8'), ('volume', '<f8')])
+DAY_MS = 86_400_000
+
+
+def merge_ranges(ranges):
+    """Union of inclusive [start, end] ms ranges, sorted, with touching ranges joined."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def subtract_ranges(wanted, covered):
+    """Parts of the inclusive ``wanted`` ranges not inside ``covered`` (both merged lists)."""
+    missing = []
+    for start, end in wanted:
+        for c_start, c_end in covered:
+            if c_end < start or c_start > end:
+                continue
+            if c_start > start:
+                missing.append([start, c_start - 1])
+            start = max(start, c_end + 1)
+            if start > end:
+                break
+        if start <= end:
+            missing.append([start, end])
+    return missing
+
+
+def klines_to_array(rows):
+    """Raw /api/v3/klines rows -> structured candle array."""
+    arr = np.empty(len(rows), dtype=CANDLE_DTYPE)
+    if rows:
+        arr['open_time'] = [r[0] for r in rows]
+        for i, name in enumerate(('open', 'high', 'low', 'close', 'volume'), start=1):
+            arr[name] = [float(r[i]) for r in rows]
+    return arr
+
+
+def array_to_frame(arr):
+    """Structured candle array -> DataFrame in the layout the analyzer expects."""
+    df = pd.DataFrame({name: np.asarray(arr[name]) for name in CANDLE_DTYPE.names})
+    df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
+    return df
+
+
+class KlineStore:
+    """Day-partitioned candle files plus fetched-range coverage per symbol and interval."""
+
+    def __init__(self, root="kline_cache"):
+        self.root = root
+
+    def _dir(self, symbol, interval):
+        return os.path.join(self.root, symbol, interval)
+
+    def _day_path(self, symbol, interval, day_ms):
+        day = pd.Timestamp(day_ms, unit='ms').strftime('%Y-%m-%d')
+        return os.path.join(self._dir(symbol, interval), f"{day}.npy")
+
+    def coverage(self, symbol, interval):
+        path = os.path.join(self._dir(symbol, interval), "coverage.json")
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return json.load(f)
+
+    def missing(self, symbol, interval, windows):
+        """Ranges of ``windows`` (inclusive ms pairs) not yet covered by the store."""
+        return subtract_ranges(merge_ranges(windows), self.coverage(symbol, interval))
+
+    def write(self, symbol, interval, candles, covered=()):
+        """Merge ``candles`` into the day files and record ``covered`` ranges as fetched."""
+        os.makedirs(self._dir(symbol, interval), exist_ok=True)
+        if len(candles):
+            days = candles['open_time'] // DAY_MS
+            for day in np.unique(days):
+                part = candles[days == day]
+                path = self._day_path(symbol, interval, int(day) * DAY_MS)
+                if os.path.exists(path):
+                    part = np.concatenate([np.load(path), part])
+                part = part[np.argsort(part['open_time'], kind='stable')]
+                keep = np.ones(len(part), dtype=bool)
+                keep[:-1] = part['open_time'][1:] != part['open_time'][:-1]   # last write wins
+                self._save(path, part[keep])
+
+        if covered:
+            ranges = merge_ranges(self.coverage(symbol, interval) + [list(r) for r in covered])
+            path = os.path.join(self._dir(symbol, interval), "coverage.json")
+            tmp = path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(ranges, f)
+            os.replace(tmp, path)
+
+    @staticmethod
+    def _save(path, arr):
+        tmp = path + ".tmp.npy"
+        np.save(tmp, arr)
+        os.replace(tmp, path)
+
+    def read(self, symbol, interval, start_ms=None, end_ms=None):
+        """Candles with start_ms ≤ open_time ≤ end_ms as one structured array."""
+        directory = self._dir(symbol, interval)
+        if not os.path.isdir(directory):
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        parts = []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".npy") or name.endswith(".tmp.npy"):
+                continue
+            day_ms = pd.Timestamp(name[:-4]).value // 1_000_000
+            if (start_ms is not None and day_ms + DAY_MS <= start_ms) or \
+               (end_ms is not None and day_ms > end_ms):
+                continue
+            parts.append(np.load(os.path.join(directory, name), mmap_mode='r'))
+        if not parts:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        arr = np.concatenate(parts)
+        lo = 0 if start_ms is None else np.searchsorted(arr['open_time'], start_ms, 'left')
+        hi = len(arr) if end_ms is None else np.searchsorted(arr['open_time'], end_ms, 'right')
+        return arr[lo:hi]
@@ -0,0 +1,165 @@
+"""Pre-computed entry orders for the whale flow bot.
+
+Everything ``short_perp`` needs before sending the entry (leverage, open
+position check, filters, mark price, balance) is known ahead of the signal.
+``HotStandby`` sets leverage once at startup and keeps balance, open positions
+and mark prices fresh from a background thread, so that on a signal the ready
+order payload can go straight to ``new_order``.
+"""
+import math
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def round_step(val, step):
+    return math.floor(val / step) * step
+
+
+def position_qty(cfg, balance, mark_price, step, qty_prec, account_risk):
+    """Contract quantity for a short on ``cfg``, capped by its USD limit and account risk."""
+    notional_cap = min(cfg['usd'], balance * account_risk * cfg['lev'])
+    return round(round_step(notional_cap / mark_price, step), qty_prec)
+
+
+def fit_to_filters(params, qty_prec, price_prec, step, tick):
+    """Copy of an order payload with its quantity and prices re-rounded to the given filters."""
+    out = dict(params)
+    if 'quantity' in out:
+        out['quantity'] = round(round_step(out['quantity'], step), qty_prec)
+    for key in ('price', 'stopPrice'):
+        if key in out:
+            out[key] = round(round(out[key] / tick) * tick, price_prec)
+    return out
+
+
+class StageTimer:
+    """Wall-clock duration per named stage of one order flow, mirrored into a ``tracing.Trace`` if given."""
+
+    def __init__(self, label, trace=None):
+        self.label = label
+        self.trace = trace
+        self.stages = {}
+        self._t0 = time.perf_counter()
+
+    def stage(self, name):
+        timer = self
+
+        class _Stage:
+            def __enter__(self):
+                self.t = time.perf_counter()
+
+            def __exit__(self, *exc):
+                end = time.perf_counter()
+                timer.stages[name] = timer.stages.get(name, 0.0) + (end - self.t) * 1000
+                if timer.trace is not None:
+                    timer.trace.span(name, self.t, end)
+                return False
+
+        return _Stage()
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self._t0) * 1000
+
+    def summary(self):
+        parts = " ".join(f"{k}={v:.1f}ms" for k, v in self.stages.items())
+        return f"{self.label} {parts} total={self.total_ms:.1f}ms"
+
+
+class HotStandby:
+    """Keep one ready-to-send SELL MARKET payload per configured symbol."""
+
+    def __init__(self, client, pair_cfg, symbol_cache, account_risk, refresh_interval=5, max_age=30):
+        self.client = client
+        self.pair_cfg = pair_cfg
+        self.symbol_cache = symbol_cache
+        self.account_risk = account_risk
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.balance = None
+        self.mark_prices = {}
+        self.open_positions = set()
+        self.intents = {}
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def prepare(self):
+        """Once per run: set leverage and clear stale orders on flat symbols."""
+        self.refresh()
+        for symbol, cfg in self.pair_cfg.items():
+            try:
+                self.client.change_leverage(symbol=symbol, leverage=cfg['lev'])
+            except Exception as e:
+                logger.warning(f"Leverage set error on {symbol}: {e}")
+            if symbol not in self.open_positions:
+                try:
+                    self.client.cancel_open_orders(symbol=symbol)
+                except Exception as e:
+                    logger.warning(f"Cancel orders error on {symbol}: {e}")
+
+    def refresh(self):
+        """Two REST calls for everything: account() (balance + positions) and all mark prices."""
+        account = self.client.account()
+        balance = next((float(a['walletBalance']) for a in account['assets'] if a['asset'] == "USDT"), 0.0)
+        open_positions = {p['symbol'] for p in account['positions'] if float(p['positionAmt']) != 0}
+        marks = {m['symbol']: float(m['markPrice']) for m in self.client.mark_price()
+                 if m['symbol'] in self.pair_cfg}
+
+        intents = {}
+        for symbol, cfg in self.pair_cfg.items():
+            if symbol not in marks:
+                continue
+            try:
+                qty_prec, price_prec, step, tick = self.symbol_cache.get(symbol)
+            except ValueError as e:
+                # unlisted symbol: no intent, so a signal on it falls back to the cold path
+                logger.warning(f"No standby intent for {symbol}: {e}")
+                continue
+            qty = position_qty(cfg, balance, marks[symbol], step, qty_prec, self.account_risk)
+            if qty > 0:
+                intents[symbol] = {"symbol": symbol, "side": "SELL", "type": "MARKET", "quantity": qty}
+
+        with self._lock:
+            self.balance = balance
+            self.mark_prices = marks
+            self.open_positions = open_positions
+            self.intents = intents
+            self._refreshed_at = time.monotonic()
+
+    def intent(self, symbol):
+        """Ready payload for ``symbol``, or None if missing or older than ``max_age``."""
+        with self._lock:
+            if time.monotonic() - self._refreshed_at > self.max_age:
+                return None
+            payload = self.intents.get(symbol)
+            return dict(payload) if payload else None
+
+    def is_open(self, symbol):
+        with self._lock:
+            return symbol in self.open_positions
+
+    def mark_open(self, symbol):
+        with self._lock:
+            self.open_positions.add(symbol)
+
+    def start(self):
+        def loop():
+            while not self._stop.wait(self.refresh_interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.warning(f"Hot standby refresh failed: {e}")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name="hot-standby", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
@@ -0,0 +1,209 @@
+"""Parallel TP/SL/leverage/threshold/entry-delay sweep with walk-forward splits.
+
+Every combination in the grid is backtested per symbol with ``backtester``
+(same signal filter, sizing and exit simulation as a single backtest run).
+The candle arrays are written once as plain ``.npy`` files and every worker
+process memory-maps them, so tasks only carry a symbol and a batch of
+parameter combinations.
+
+The signals are cut into ``--folds`` consecutive, equally populated time
+folds.  Each combination's PnL is recorded per fold.  The ranked table orders
+combinations by their PnL over the whole period, which is in-sample: the best
+row there was picked with hindsight.  The out-of-sample estimate is the
+walk-forward table, which shows, for each step, the combination that was best
+on all earlier folds and how it did on the next one, next to the current
+``PAIR_CFG``:
+
+    python param_sweep.py --offline --workers 8
+    python param_sweep.py --offline --tp 0.2:1.0:0.05 --sl 0.1:0.5:0.05 --lev 3 5 --entry-delay 0 10
+"""
+import argparse
+import itertools
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backtester import (MINUTE_MS, MAX_HOLD_MINUTES, SLIPPAGE_BPS, TAKER_FEE, Backtester,
+                        load_candles, load_signals)
+from strategy import MIN_NOTIONAL_USD, PAIR_CFG
+
+PARAMS = ("tp", "sl", "lev", "min_notional", "entry_delay")
+FIELDS = ("open_time", "open", "high", "low", "close")
+
+
+def parse_values(values, kind=float):
+    """'0.1:0.5:0.1' (inclusive range) or plain values."""
+    out = []
+    for value in values:
+        if ":" in value:
+            start, stop, step = (float(v) for v in value.split(":"))
+            out += [kind(round(v, 10)) for v in np.arange(start, stop + step / 2, step)]
+        else:
+            out.append(kind(float(value)))
+    return sorted(set(out))
+
+
+def share_candles(candles, directory):
+    """Write each candle field as its own contiguous .npy for memory-mapping."""
+    for symbol, arrays in candles.items():
+        for field in FIELDS:
+            np.save(os.path.join(directory, f"{symbol}.{field}.npy"), np.ascontiguousarray(arrays[field]))
+
+
+def open_candles(directory, symbols):
+    return {symbol: {field: np.load(os.path.join(directory, f"{symbol}.{field}.npy"), mmap_mode="r")
+                     for field in FIELDS}
+            for symbol in symbols}
+
+
+def fold_edges(tx_ms, folds):
+    """``folds + 1`` time edges splitting ``tx_ms`` into equally populated consecutive folds."""
+    edges = np.quantile(tx_ms, np.linspace(0, 1, folds + 1)).astype(np.int64)
+    edges[-1] = tx_ms.max() + 1
+    return edges
+
+
+_worker = {}
+
+
+def _init_worker(directory, symbols, signals, edges, options):
+    _worker["candles"] = open_candles(directory, symbols)
+    _worker["signals"] = {s: signals[signals["coin"] + "USDT" == s].reset_index(drop=True) for s in symbols}
+    _worker["edges"] = edges
+    _worker["options"] = options
+
+
+def evaluate(task):
+    """Backtest a batch of combinations for one symbol; one result row per combination."""
+    symbol, combos = task
+    signals = _worker["signals"][symbol]
+    edges = _worker["edges"]
+    folds = len(edges) - 1
+    usd = PAIR_CFG.get(symbol, {}).get("usd", 10_000)
+    rows = []
+    for tp, sl, lev, min_notional, delay in combos:
+        bt = Backtester(_worker["candles"], pair_cfg={symbol: {"tp": tp, "sl": sl, "lev": lev, "usd": usd}},
+                        min_notional=min_notional, entry_delay_ms=int(delay * 1000), **_worker["options"])
+        trades = bt.run(signals)
+        fold = np.clip(np.searchsorted(edges, trades["tx_ms"].to_numpy(), "right") - 1, 0, folds - 1)
+        pnl = np.bincount(fold, weights=trades["pnl"].to_numpy(), minlength=folds)
+        count = np.bincount(fold, minlength=folds)
+        row = {"symbol": symbol, "tp": tp, "sl": sl, "lev": lev, "min_notional": min_notional,
+               "entry_delay": delay, "trades": len(trades), "pnl": float(pnl.sum()),
+               "win_rate": float((trades["pnl"] > 0).mean()) if len(trades) else np.nan}
+        for k in range(folds):
+            row[f"pnl_f{k}"] = float(pnl[k])
+            row[f"trades_f{k}"] = int(count[k])
+        rows.append(row)
+    return rows
+
+
+def walk_forward(results, folds, min_trades=1):
+    """Per symbol and step: best combination on folds < step, and its PnL on fold ``step``."""
+    rows = []
+    for symbol, group in results.groupby("symbol"):
+        fold_pnl = group[[f"pnl_f{k}" for k in range(folds)]].to_numpy()
+        fold_trades = group[[f"trades_f{k}" for k in range(folds)]].to_numpy()
+        current = group["is_current"].to_numpy()
+        for step in range(1, folds):
+            train = fold_pnl[:, :step].sum(axis=1)
+            eligible = fold_trades[:, :step].sum(axis=1) >= min_trades
+            if not eligible.any():
+                continue
+            best = np.flatnonzero(eligible)[np.argmax(train[eligible])]
+            row = {"symbol": symbol, "step": step, **group.iloc[best][list(PARAMS)].to_dict(),
+                   "train_pnl": train[best], "test_pnl": fold_pnl[best, step],
+                   "test_trades": fold_trades[best, step]}
+            if current.any():
+                row["current_test_pnl"] = fold_pnl[current][0, step]
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--csv", default="whale_alert_data.csv")
+    ap.add_argument("--cache-dir", default="kline_cache")
+    ap.add_argument("--offline", action="store_true")
+    ap.add_argument("--symbols", nargs="+", default=list(PAIR_CFG))
+    ap.add_argument("--tp", nargs="+", default=["0.2:1.15:0.05"], help="percent; list or start:stop:step")
+    ap.add_argument("--sl", nargs="+", default=["0.1:0.55:0.05"])
+    ap.add_argument("--lev", nargs="+", default=["1", "2", "3", "5", "10"])
+    ap.add_argument("--min-notional", nargs="+", default=["1e6", "5e6", "1e7", "2.5e7", "5e7"])
+    ap.add_argument("--entry-delay", nargs="+", default=["0", "30"], help="seconds")
+    ap.add_argument("--folds", type=int, default=4)
+    ap.add_argument("--min-trades", type=int, default=2, help="in-sample trades for walk-forward picks")
+    ap.add_argument("--max-hold", type=int, default=MAX_HOLD_MINUTES)
+    ap.add_argument("--intrabar", choices=("worst", "best", "path"), default="worst")
+    ap.add_argument("--fee", type=float, default=TAKER_FEE)
+    ap.add_argument("--slippage-bps", type=float, default=SLIPPAGE_BPS)
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--batch", type=int, default=250, help="combinations per task")
+    ap.add_argument("--out", default="sweep_ranked.csv")
+    ap.add_argument("--walk-forward-out", default="sweep_walkforward.csv")
+    args = ap.parse_args()
+
+    grid = list(itertools.product(parse_values(args.tp), parse_values(args.sl), parse_values(args.lev, int),
+                                  parse_values(args.min_notional), parse_values(args.entry_delay)))
+    signals = load_signals(args.csv)
+    tx_ms = signals["tx_ms"].to_numpy()
+    edges = fold_edges(tx_ms, args.folds)
+    max_delay_ms = int(max(parse_values(args.entry_delay)) * 1000)
+    candles = load_candles(args.symbols, int(tx_ms.min()),
+                           int(tx_ms.max()) + max_delay_ms + (args.max_hold + 5) * MINUTE_MS,
+                           args.cache_dir, args.offline)
+    symbols = [s for s in args.symbols if s in candles]
+    options = {"fee": args.fee, "slippage_bps": args.slippage_bps, "intrabar": args.intrabar,
+               "max_hold": args.max_hold}
+
+    tasks = []
+    for symbol in symbols:
+        combos = list(grid)
+        cfg = PAIR_CFG.get(symbol)
+        current = (cfg["tp"], cfg["sl"], cfg["lev"], float(MIN_NOTIONAL_USD), 0.0) if cfg else None
+        if current and current not in grid:
+            combos.append(current)
+        tasks += [(symbol, combos[i:i + args.batch]) for i in range(0, len(combos), args.batch)]
+    total = sum(len(combos) for _, combos in tasks)
+    print(f"{len(grid)} combinations x {len(symbols)} symbols = {total} backtests over "
+          f"{len(signals)} signals, {args.folds} folds, {args.workers} workers")
+
+    t0 = time.perf_counter()
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        share_candles({s: candles[s] for s in symbols}, directory)
+        with ProcessPoolExecutor(args.workers, initializer=_init_worker,
+                                 initargs=(directory, symbols, signals, edges, options)) as pool:
+            for batch in pool.map(evaluate, tasks):
+                rows += batch
+    dt = time.perf_counter() - t0
+    print(f"Swept {total} backtests in {dt:.1f}s ({total / dt:,.0f} backtests/s)")
+
+    results = pd.DataFrame(rows)
+    results["is_current"] = [
+        PAIR_CFG.get(r.symbol) is not None
+        and (r.tp, r.sl, r.lev, r.min_notional, r.entry_delay)
+        == (PAIR_CFG[r.symbol]["tp"], PAIR_CFG[r.symbol]["sl"], PAIR_CFG[r.symbol]["lev"], MIN_NOTIONAL_USD, 0)
+        for r in results.itertuples()]
+    results = results.sort_values(["symbol", "pnl", "win_rate"], ascending=[True, False, False])
+    results["rank"] = results.groupby("symbol").cumcount() + 1
+    results.to_csv(args.out, index=False)
+    print(f"Saved ranked results to {args.out}")
+
+    wf = walk_forward(results, args.folds, args.min_trades)
+    wf.to_csv(args.walk_forward_out, index=False)
+    print("\nTop combination per symbol (in-sample PnL over all folds, picked with hindsight):")
+    print(results.groupby("symbol").head(1)[["symbol", *PARAMS, "trades", "pnl"]].to_string(index=False))
+    if not wf.empty:
+        cols = ["test_pnl"] + (["current_test_pnl"] if "current_test_pnl" in wf else [])
+        print("\nOut-of-sample walk-forward test PnL (re-selected each step) vs current PAIR_CFG:")
+        print(wf.groupby("symbol")[cols].sum())
+        print(f"Saved walk-forward steps to {args.walk_forward_out}")
+
+
+if __name__ == "__main__":
+    main()
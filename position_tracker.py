@@ -0,0 +1,210 @@
+"""In-process position and order book for the whale flow bot.
+
+``PositionTracker`` is fed Binance futures user-data events (ACCOUNT_UPDATE,
+ORDER_TRADE_UPDATE) and only goes back to REST for a periodic reconcile, so
+"is a position open on X" is a dict lookup and the bot's ``OPEN_POS`` follows
+real fills, TP/SL hits and PnL.  Events come from ``UserDataStream`` in
+production or ``ReplayEventSource`` (a JSONL file of recorded events) offline.
+"""
+import json
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+LISTEN_KEY_KEEPALIVE = 30 * 60   # listen keys expire after 60 minutes without a keepalive
+
+
+class PositionTracker:
+    """Positions and open orders keyed by symbol / order id, updated from user-data events."""
+
+    def __init__(self, open_pos=None, on_close=None):
+        self.open_pos = open_pos if open_pos is not None else {}
+        self.on_close = on_close            # called with the symbol when a position goes flat
+        self.positions = {}                 # symbol -> {'amt', 'entry', 'upnl'}
+        self.orders = {}                    # orderId -> {'symbol', 'type', 'side', 'status', 'stop'}
+        self.balances = {}                  # asset -> wallet balance
+        self.closed = {}                    # symbol -> last closed OPEN_POS record
+        self.entered_ms = {}                # symbol -> local time of our last note_entry
+        self.last_event_ms = None
+        self._lock = threading.RLock()
+
+    def is_open(self, symbol):
+        return symbol in self.positions
+
+    def note_entry(self, symbol, qty, entry):
+        """Record our own entry immediately so a second signal can't race the stream event.
+
+        The ``open_pos`` record is created here too, before any TP/SL is sent,
+        so a protection fill arriving on the stream always has a record to
+        book its PnL and exit on.
+        """
+        with self._lock:
+            self.positions.setdefault(symbol, {'amt': -qty, 'entry': entry, 'upnl': 0.0})
+            self.entered_ms[symbol] = int(time.time() * 1000)
+            self.closed.pop(symbol, None)
+            self.open_pos.setdefault(symbol, {}).update(qty=qty, entry=entry, time=time.time())
+
+    def note_orders(self, symbol, **fields):
+        """Add ``fields`` (protection order ids, ...) to the entry's record, open or already closed."""
+        with self._lock:
+            pos = self.open_pos.get(symbol) or self.closed.get(symbol)
+            if pos is not None:
+                pos.update(fields)
+
+    def apply(self, event):
+        """Apply one user-data event (a dict as delivered by the websocket)."""
+        etype = event.get('e')
+        with self._lock:
+            self.last_event_ms = event.get('E', self.last_event_ms)
+            if etype == 'ACCOUNT_UPDATE':
+                data = event['a']
+                for b in data.get('B', []):
+                    self.balances[b['a']] = float(b['wb'])
+                for p in data.get('P', []):
+                    self._set_position(p['s'], float(p['pa']), float(p['ep']), float(p.get('up', 0)))
+            elif etype == 'ORDER_TRADE_UPDATE':
+                self._apply_order(event['o'])
+            elif etype == 'listenKeyExpired':
+                logger.warning("User data listen key expired")
+
+    def _apply_order(self, o):
+        oid, symbol, status = o['i'], o['s'], o['X']
+        if status in ('NEW', 'PARTIALLY_FILLED'):
+            self.orders[oid] = {'symbol': symbol, 'type': o['ot'], 'side': o['S'],
+                                'status': status, 'stop': float(o.get('sp', 0))}
+        else:
+            self.orders.pop(oid, None)
+
+        # the fill can arrive just before or just after the ACCOUNT_UPDATE that flattens the position
+        pos = self.open_pos.get(symbol) or self.closed.get(symbol)
+        if o.get('x') == 'TRADE' and pos is not None:
+            pos['pnl'] = pos.get('pnl', 0.0) + float(o.get('rp', 0)) - float(o.get('n', 0))
+            if status == 'FILLED' and o['ot'] in ('TAKE_PROFIT_MARKET', 'STOP_MARKET'):
+                pos['exit'] = float(o['ap'])
+                pos['exit_reason'] = 'tp' if o['ot'] == 'TAKE_PROFIT_MARKET' else 'sl'
+                logger.info(f"{pos['exit_reason'].upper()} hit on {symbol} at {pos['exit']} "
+                            f"pnl={pos['pnl']:.2f}")
+
+    def _set_position(self, symbol, amt, entry, upnl):
+        if amt != 0:
+            self.positions[symbol] = {'amt': amt, 'entry': entry, 'upnl': upnl}
+            if symbol in self.open_pos:
+                self.open_pos[symbol].update(qty=abs(amt), entry=entry, upnl=upnl)
+            return
+
+        was_open = self.positions.pop(symbol, None) is not None
+        closed = self.open_pos.pop(symbol, None)
+        if closed is not None:
+            self.closed[symbol] = closed
+            logger.info(f"Position closed on {symbol} ({closed.get('exit_reason', 'pending fill')})")
+        if (was_open or closed is not None) and self.on_close:
+            self.on_close(symbol)
+
+    def reconcile(self, client):
+        """Replace local state with positionRisk, open orders and balances from REST, logging any drift.
+
+        /fapi/v3/account positions carry no entry price, so positions come from
+        get_position_risk().  Symbols we entered after the snapshot was requested
+        are left alone: the REST view predates them, and dropping them would
+        cancel the TP/SL that was just placed.
+        """
+        requested_ms = int(time.time() * 1000)
+        risk = client.get_position_risk()
+        orders = client.get_orders()
+        account = client.account()
+        with self._lock:
+            rest_open = {p['symbol'] for p in risk if float(p['positionAmt']) != 0}
+            newer = {s for s in self.positions if self.entered_ms.get(s, 0) >= requested_ms}
+            drift = rest_open.symmetric_difference(self.positions) - newer
+            if drift:
+                logger.warning(f"Position tracker drift on {', '.join(sorted(drift))}; using REST state")
+            for p in risk:
+                symbol = p['symbol']
+                if symbol in newer or (symbol not in rest_open and symbol not in self.positions):
+                    continue
+                entry = p.get('entryPrice') or self.positions.get(symbol, {}).get('entry', 0.0)
+                self._set_position(symbol, float(p['positionAmt']), float(entry),
+                                   float(p.get('unRealizedProfit', 0)))
+            for symbol in set(self.positions) - rest_open - newer - {p['symbol'] for p in risk}:
+                self._set_position(symbol, 0.0, 0.0, 0.0)
+            self.orders = {o['orderId']: {'symbol': o['symbol'], 'type': o['type'], 'side': o['side'],
+                                          'status': o['status'], 'stop': float(o.get('stopPrice', 0))}
+                           for o in orders}
+            for a in account.get('assets', []):
+                self.balances[a['asset']] = float(a['walletBalance'])
+
+
+class UserDataStream:
+    """Binance USDⓈ-M user-data websocket feeding events into ``on_event``."""
+
+    def __init__(self, client, on_event):
+        self.client = client
+        self.on_event = on_event
+        self.listen_key = None
+        self.ws = None
+        self._stop = threading.Event()
+        self._keepalive = None
+
+    def _on_message(self, _, message):
+        try:
+            event = json.loads(message)
+            if isinstance(event, dict) and 'e' in event:
+                self.on_event(event)
+        except Exception as e:
+            logger.error(f"User data event error: {e}")
+
+    def start(self):
+        from binance.websocket.um_futures.websocket_client import UMFuturesWebsocketClient
+        self.listen_key = self.client.new_listen_key()['listenKey']
+        self.ws = UMFuturesWebsocketClient(on_message=self._on_message)
+        self.ws.user_data(listen_key=self.listen_key)
+
+        def keepalive():
+            while not self._stop.wait(LISTEN_KEY_KEEPALIVE):
+                try:
+                    self.client.renew_listen_key(listenKey=self.listen_key)
+                except Exception as e:
+                    logger.warning(f"Listen key keepalive failed: {e}")
+
+        self._keepalive = threading.Thread(target=keepalive, name="listen-key", daemon=True)
+        self._keepalive.start()
+
+    def stop(self):
+        self._stop.set()
+        if self.ws:
+            self.ws.stop()
+        if self.listen_key:
+            try:
+                self.client.close_listen_key(listenKey=self.listen_key)
+            except Exception as e:
+                logger.warning(f"Close listen key failed: {e}")
+
+
+class ReplayEventSource:
+    """Feed recorded user-data events (one JSON object per line) into ``on_event``.
+
+    With ``speed`` set, the gaps between event times ``E`` are replayed,
+    scaled by that factor; otherwise events are delivered back to back.
+    """
+
+    def __init__(self, path, on_event, speed=None):
+        self.path = path
+        self.on_event = on_event
+        self.speed = speed
+
+    def start(self):
+        prev = None
+        with open(self.path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                if self.speed and prev is not None and 'E' in event:
+                    time.sleep(max(0, event['E'] - prev) / 1000 / self.speed)
+                prev = event.get('E', prev)
+                self.on_event(event)
+
+    def stop(self):
+        pass
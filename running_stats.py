@@ -0,0 +1,92 @@
+"""Constant-memory aggregates for streaming analysis.
+
+``RunningStats`` keeps count / sum / min / max of everything added so far
+(NaNs are skipped, like pandas).  ``QuantileSketch`` is a log-bucket sketch in
+the style of DDSketch: values are counted in buckets whose bounds grow by
+``gamma = (1 + a) / (1 - a)``, so any quantile comes back within relative
+error ``a`` of the exact one while memory only grows with the log of the
+value range.  Both accept NumPy arrays, and sketches of separate chunks can be
+merged.
+"""
+import math
+
+import numpy as np
+
+
+class RunningStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy=0.01, min_value=1e-9):
+        self.alpha = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.count = 0
+
+    def _keys(self, magnitudes):
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        small = np.abs(values) < self.min_value
+        self.zero += int(small.sum())
+        for store, part in ((self.positive, values[~small & (values > 0)]),
+                            (self.negative, -values[~small & (values < 0)])):
+            if len(part):
+                keys, counts = np.unique(self._keys(part), return_counts=True)
+                for k, n in zip(keys.tolist(), counts.tolist()):
+                    store[k] = store.get(k, 0) + n
+
+    def merge(self, other):
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for k, n in theirs.items():
+                mine[k] = mine.get(k, 0) + n
+        self.zero += other.zero
+        self.count += other.count
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        """Approximate ``q``-quantile (0 <= q <= 1), NaN if empty."""
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
@@ -0,0 +1,54 @@
+"""Trading rules of the whale flow bot, shared by the live bot and the backtester.
+
+A signal is a transfer alert from an unknown wallet into one of
+``TRADE_EXCHANGES`` worth at least ``MIN_NOTIONAL_USD``, on a coin with a
+``PAIR_CFG`` entry.  The bot shorts the USDT perpetual with TP/SL placed
+``tp``/``sl`` percent from the entry price; sizing is
+``order_intents.position_qty``.
+"""
+from typing import Dict, Any
+
+from entity_registry import REGISTRY
+
+MIN_NOTIONAL_USD = 50_000_000
+ACCOUNT_RISK     = 0.050           # risk ≤50% equity per trade
+
+# canonical names from entity_registry; aliases (Huobi, OKEx, ...) resolve to these.
+# Coinbase Institutional is its own entity but was traded as Coinbase before the registry.
+TRADE_EXCHANGES = {"Binance", "Coinbase", "Coinbase Institutional", "Bybit", "Kraken", "OKX", "HTX"}
+
+PAIR_CFG : Dict[str, Dict[str,Any]] = {
+    # symbol  :  tp%   sl%   lev   max_usd
+    "XRPUSDT":   {"tp":0.35,"sl":0.15,"lev":5,"usd":15_000},
+    "DOGEUSDT":  {"tp":0.60,"sl":0.25,"lev":3,"usd":10_000},
+    "TRUMPUSDT": {"tp":0.60,"sl":0.25,"lev":3,"usd": 5_000},
+    "SOLUSDT":   {"tp":0.35,"sl":0.15,"lev":5,"usd":15_000},
+    "LTCUSDT":   {"tp":0.35,"sl":0.15,"lev":5,"usd":12_000},
+}
+
+
+def signal_info(alert, exchanges=TRADE_EXCHANGES):
+    """``{coin, usd}`` for an unknown-wallet -> exchange transfer (a parse_alert dict), else None."""
+    if not alert or alert['alert_type'] != "transfer":
+        return None
+    if REGISTRY.type_of(alert['from_entity']) != "unknown":
+        return None
+    exchange, etype, _ = REGISTRY.lookup(alert['to_entity'])
+    if etype != "exchange" or exchange not in exchanges:
+        return None
+    return dict(coin=alert['currency'].upper(), usd=alert['usd_value'] or 0)
+
+
+def signal_symbol(info, pair_cfg=PAIR_CFG, min_notional=MIN_NOTIONAL_USD):
+    """``(symbol, cfg)`` to short for a ``signal_info`` result; cfg is None if the pair is not configured."""
+    if not info or info['usd'] < min_notional:
+        return None
+    sym = info['coin'] + "USDT"
+    return sym, pair_cfg.get(sym)
+
+
+def protective_prices(entry, cfg, price_prec):
+    """TP and SL trigger prices of a short entered at ``entry``."""
+    tp_price = round(entry*(1-cfg['tp']/100), price_prec)
+    sl_price = round(entry*(1+cfg['sl']/100), price_prec)
+    return tp_price, sl_price
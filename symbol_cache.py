@@ -0,0 +1,114 @@
+"""In-memory cache of Binance futures symbol filters.
+
+``exchange_info()`` is one of the heaviest REST calls and its contents change a
+few times a year, so the bot keeps the parsed precision/step/tick per symbol
+in a dict, refreshes it from a background thread and only goes back to the
+exchange synchronously on a miss, on expiry, or after a filter rejection.
+"""
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Order rejections that mean our cached filters are out of date
+FILTER_ERROR_CODES = {
+    -1013,   # Filter failure (LOT_SIZE, PRICE_FILTER, MIN_NOTIONAL, ...)
+    -1111,   # Precision is over the maximum defined for this asset
+    -4014,   # Price not increased by tick size
+    -4023,   # Quantity not increased by step size
+}
+
+
+def parse_symbol_info(s):
+    """Return (qty_prec, price_prec, step, tick) from one exchangeInfo symbol entry."""
+    filters = {f['filterType']: f for f in s['filters']}
+    return (int(s['quantityPrecision']),
+            int(s['pricePrecision']),
+            float(filters['LOT_SIZE']['stepSize']),
+            float(filters['PRICE_FILTER']['tickSize']))
+
+
+class SymbolInfoCache:
+    """Symbol -> (qty_prec, price_prec, step, tick), refreshed every ``ttl`` seconds."""
+
+    def __init__(self, client, ttl=3600):
+        self.client = client
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._info = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """Reload every symbol from exchangeInfo in a single request."""
+        info = self.client.exchange_info()
+        parsed = {}
+        for s in info['symbols']:
+            try:
+                parsed[s['symbol']] = parse_symbol_info(s)
+            except (KeyError, ValueError):
+                continue
+        with self._lock:
+            self._info = parsed
+            self._fetched_at = time.monotonic()
+        logger.debug(f"Symbol cache refreshed: {len(parsed)} symbols")
+
+    def warm(self, symbols):
+        """Load the cache at startup and report configured symbols the exchange doesn't list."""
+        self.refresh()
+        missing = [s for s in symbols if s not in self._info]
+        if missing:
+            logger.warning(f"Symbols not found in exchangeInfo: {', '.join(missing)}")
+
+    def get(self, symbol):
+        with self._lock:
+            fresh = time.monotonic() - self._fetched_at < self.ttl
+            entry = self._info.get(symbol) if fresh else None
+            if entry is not None:
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        self.refresh()
+        with self._lock:
+            entry = self._info.get(symbol)
+        if entry is None:
+            raise ValueError(f"Symbol {symbol} not found in exchangeInfo")
+        return entry
+
+    def invalidate(self, symbol=None):
+        """Drop one symbol (or everything) so the next lookup refetches exchangeInfo."""
+        with self._lock:
+            if symbol is None:
+                self._info = {}
+            else:
+                self._info.pop(symbol, None)
+        logger.info(f"Symbol cache invalidated: {symbol or 'all'}")
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'symbols': len(self._info)}
+
+    def start(self, interval=None):
+        """Refresh in a daemon thread every ``interval`` seconds (default: half the TTL)."""
+        interval = interval or self.ttl / 2
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.warning(f"Symbol cache refresh failed: {e}")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name="symbol-cache", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
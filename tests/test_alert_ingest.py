@@ -0,0 +1,84 @@
+import time
+
+from alert_ingest import MultiSourceIngest, alert_key, json_item, tx_ref
+
+TEXT = "🚨 5,000 #BTC (450,000,000 USD) transferred from unknown wallet to #Binance"
+TX_A = "https://whale-alert.io/transaction/bitcoin/" + "a" * 64
+TX_B = "https://whale-alert.io/transaction/bitcoin/" + "b" * 64
+
+
+class Quiet:
+    """A source that is never polled; the tests feed ``receive`` directly."""
+
+    def __init__(self, name):
+        self.name = name
+        self.last_fetch_ms = self.last_parse_ms = None
+
+    def close(self):
+        pass
+
+
+def item(tid, text=TEXT, urls=()):
+    return {"id": str(tid), "text": text, "urls": list(urls), "pinned": False, "retweet": False}
+
+
+def ingest(**kwargs):
+    return MultiSourceIngest([Quiet("a"), Quiet("b"), Quiet("c")], **kwargs)
+
+
+def test_first_copy_wins_and_later_copies_count_as_late():
+    ing = ingest()
+    ing.receive("b", [item(1)])
+    ing.receive("a", [item(2)])
+    ing.receive("c", [item(3, text=TEXT.replace("#Binance", "Binance"))])
+    alerts = ing.poll(timeout=0)
+    assert [a["source"] for a in alerts] == ["b"]
+    stats = ing.source_stats()
+    assert (stats["b"]["wins"], stats["a"]["late"], stats["c"]["late"]) == (1, 1, 1)
+
+
+def test_different_hashes_are_different_alerts():
+    ing = ingest()
+    ing.receive("a", [item(1, urls=[TX_A])])
+    ing.receive("b", [item(2, urls=[TX_B])])
+    ing.receive("c", [item(3, urls=["https://whale-alert.io/transaction/bitcoin/" + "A" * 64])])   # hex case
+    alerts = ing.poll(timeout=0)
+    assert [a["tx"][1] for a in alerts] == ["a" * 64, "b" * 64]
+    assert ing.forwarded == 2
+
+
+def test_copy_without_link_matches_either_way_and_learns_the_hash():
+    ing = ingest()
+    ing.receive("a", [item(1)])
+    ing.receive("b", [item(2, urls=[TX_A])])
+    assert len(ing.poll(timeout=0)) == 1
+    # the entry picked up tx A from b, so a copy carrying tx B is a new alert
+    ing.receive("c", [item(3, urls=[TX_B])])
+    assert len(ing.poll(timeout=0)) == 1
+
+
+def test_copies_outside_the_window_are_forwarded_again():
+    ing = ingest(window=0.05)
+    ing.receive("a", [item(1)])
+    time.sleep(0.1)
+    ing.receive("b", [item(2)])
+    assert len(ing.poll(timeout=0)) == 2
+
+
+def test_json_entries_key_like_the_tweet():
+    entry = {"id": "x1", "blockchain": "bitcoin", "hash": "a" * 64, "symbol": "btc", "amount": 5000,
+             "amount_usd": 450_000_000, "transaction_type": "transfer",
+             "from": {"owner": "unknown"}, "to": {"owner": "binance"}, "timestamp": 1_735_732_800}
+    j = json_item(entry)
+    assert alert_key(j)[0] == alert_key(item(1))[0]
+    assert tx_ref(j) == ("bitcoin", "a" * 64)
+    assert j["posted_ms"] == 1_735_732_800_000
+
+
+def test_seen_ids_persist_per_source(tmp_path):
+    ing = ingest(seen_path=str(tmp_path / "seen.json"))
+    seen = ing._seen("nitter.net/rss")
+    seen.add("42")
+    seen.save()
+    assert (tmp_path / "seen.nitter.net_rss.json").exists()
+    assert "42" in ingest(seen_path=str(tmp_path / "seen.json"))._seen("nitter.net/rss")
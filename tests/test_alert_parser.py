@@ -0,0 +1,84 @@
+import csv
+import os
+import re
+
+import pytest
+
+from alert_parser import parse_alert
+
+CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "whale_alert_data.csv")
+USD_IN_TEXT = re.compile(r"\(([\d,]+(?:\.\d+)?) USD\)")
+
+# phrase on the alert's first line -> (alert type, from, to); None is the entity named after the phrase
+PHRASES = (
+    (" locked in escrow at ", "lock", None, "escrow"),
+    (" unlocked from escrow at ", "unlock", "escrow", None),
+    (" minted at ", "mint", "mint", None),
+    (" burned at ", "burn", None, "burn"),
+    (" has just been frozen", "freeze", "unknown", "unknown"),
+    (" has just been activated", "activate", "unknown", "unknown"),
+    (" has just been paid", "fee", "unknown", "unknown"),
+)
+
+
+def expected_entities(text):
+    """(alert_type, from_entity, to_entity) read off the first line with plain string splits."""
+    line = text.split("\n")[0].strip()
+    if " transferred from " in line:
+        src, dst = line.split(" transferred from ", 1)[1].split(" to ", 1)
+        return "transfer", src.lstrip("#"), dst.lstrip("#")
+    for phrase, alert_type, src, dst in PHRASES:
+        if phrase in line:
+            entity = line.split(phrase, 1)[1].lstrip("#")
+            return alert_type, src or entity, dst or entity
+    return None, "unknown", "unknown"
+
+
+def test_golden_csv():
+    """Every bundled alert parses to its recorded amount/currency, the USD value in its text and
+    the type and entities its first line names."""
+    with open(CSV, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 840
+    for row in rows:
+        p = parse_alert(row["raw_text"])
+        usd = USD_IN_TEXT.search(row["raw_text"])
+        assert p is not None, row["raw_text"]
+        assert (p["amount"], p["currency"]) == (float(row["amount"]), row["currency"]), row["raw_text"]
+        assert p["usd_value"] == (float(usd.group(1).replace(",", "")) if usd else None), row["raw_text"]
+        assert (p["alert_type"], p["from_entity"], p["to_entity"]) == expected_entities(row["raw_text"]), row["raw_text"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("🚨 600 #BTC (58,201,509 USD) transferred from #Binance to #Bitfinex",
+     (600.0, "BTC", 58201509.0, "Binance", "Bitfinex", "transfer")),
+    ("🚨 1,500 #ETH (3,000,000 USD) transferred from unknown wallet to Coinbase Institutional",
+     (1500.0, "ETH", 3000000.0, "unknown wallet", "Coinbase Institutional", "transfer")),
+    ("💵 100,000,000 #USDT (100,012,000 USD) minted at Tether Treasury",
+     (100000000.0, "USDT", 100012000.0, "mint", "Tether Treasury", "mint")),
+    ("🔥 50,000,000 #USDC (49,991,250 USD) burned at USDC Treasury",
+     (50000000.0, "USDC", 49991250.0, "USDC Treasury", "burn", "burn")),
+    ("🔒 200,000,000 #XRP (424,246,040 USD) locked in escrow at #Ripple",
+     (200000000.0, "XRP", 424246040.0, "Ripple", "escrow", "lock")),
+    ("🔓 20,000,000 #XRP (42,424,604 USD) unlocked from escrow at #Ripple",
+     (20000000.0, "XRP", 42424604.0, "escrow", "Ripple", "unlock")),
+    ("An address with a balance of 1,000,000 #USDT (1,000,000 USD) has just been frozen!",
+     (1000000.0, "USDT", 1000000.0, "unknown", "unknown", "freeze")),
+    ("💤 A dormant address containing 1,078 #BTC (102,594,747 USD) has just been activated after 11.8 years!",
+     (1078.0, "BTC", 102594747.0, "unknown", "unknown", "activate")),
+    ("💸  A fee of 58 #ETH (125,858 USD) has just been paid for a single transaction!",
+     (58.0, "ETH", 125858.0, "unknown", "unknown", "fee")),
+    ("🚨 2,000 #ETH (5,000,000 USD) transferred from #Binance to #Crypto.com",
+     (2000.0, "ETH", 5000000.0, "Binance", "Crypto.com", "transfer")),
+    ("🚨 1,000 #BTC (90,000,000 USD) transferred from Mt. Gox to unknown wallet\n\nwhale-alert.io/transaction/b…",
+     (1000.0, "BTC", 90000000.0, "Mt. Gox", "unknown wallet", "transfer")),
+    ("🚨 1,000 #BTC (90,000,000 USD) transferred from unknown wallet to Mt. Gox.",
+     (1000.0, "BTC", 90000000.0, "unknown wallet", "Mt. Gox", "transfer")),
+])
+def test_alert_types(text, expected):
+    p = parse_alert(text)
+    assert (p["amount"], p["currency"], p["usd_value"], p["from_entity"], p["to_entity"], p["alert_type"]) == expected
+
+
+def test_text_without_amount_is_not_an_alert():
+    assert parse_alert("Follow us for more whale alerts") is None
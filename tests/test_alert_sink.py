@@ -0,0 +1,54 @@
+import csv
+import os
+
+from alert_sink import CSV_COLUMNS, CsvAlertSink
+
+
+def record(tid, **extra):
+    row = {"amount": 100.0, "currency": "BTC", "raw_text": f"alert {tid}",
+           "tweet_link": f"https://nitter.net/whale_alert/status/{tid}#m"}
+    row.update(extra)
+    return row
+
+
+def read(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, list(reader)
+
+
+def test_pages_are_deduplicated_on_tweet_id(tmp_path):
+    path = str(tmp_path / "alerts.csv")
+    with CsvAlertSink(path) as sink:
+        assert sink.write_page([record(1), record(2)], cursor="?cursor=a") == 2
+        assert sink.write_page([record(2), record(3)]) == 1
+    with CsvAlertSink(path) as sink:
+        assert sink.rows == 3 and sink.cursor == "?cursor=a"
+        assert sink.write_page([record(3)]) == 0
+    columns, rows = read(path)
+    assert columns == CSV_COLUMNS
+    assert [r["raw_text"] for r in rows] == ["alert 1", "alert 2", "alert 3"]
+
+
+def test_older_header_is_extended_instead_of_dropping_fields(tmp_path):
+    path = str(tmp_path / "alerts.csv")
+    old = CSV_COLUMNS[:9]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=old, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerow(record(1))
+    with CsvAlertSink(path) as sink:
+        sink.write_page([record(2, alert_type="transfer", from_type="U", to_type="X")])
+    columns, rows = read(path)
+    assert columns == CSV_COLUMNS
+    assert rows[0]["raw_text"] == "alert 1" and rows[0]["alert_type"] == ""
+    assert (rows[1]["alert_type"], rows[1]["from_type"], rows[1]["to_type"]) == ("transfer", "U", "X")
+
+
+def test_clear_cursor_removes_the_resume_point(tmp_path):
+    path = str(tmp_path / "alerts.csv")
+    with CsvAlertSink(path) as sink:
+        sink.write_page([record(1)], cursor="?cursor=deep")
+        assert os.path.exists(sink.cursor_path)
+        sink.clear_cursor()
+    assert CsvAlertSink(path).cursor is None
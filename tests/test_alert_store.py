@@ -0,0 +1,79 @@
+import os
+
+import pandas as pd
+import pytest
+
+from alert_store import AlertStore, migrate
+from entity_registry import ENTITIES, TYPE_CODE, EntityRegistry
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "alerts.csv")
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "alerts.db")
+    assert migrate([FIXTURE], path, chunksize=4) == 10
+    return path
+
+
+def test_migrate_skips_rows_already_stored(db):
+    assert migrate([FIXTURE], db) == 0
+    with AlertStore(db) as store:
+        assert len(store) == 10
+        assert store.stats()["coins"] == 4                    # BTC, USDC, LTC, XRP
+        assert 1920053562488262656 in store
+
+
+def test_missing_fields_are_parsed_from_raw_text(db):
+    with AlertStore(db) as store:
+        xrp = store.query(currency="XRP", columns=["usd_value", "from_entity", "to_entity", "alert_type", "timestamp"])
+    row = xrp.iloc[0]
+    assert (row["usd_value"], row["from_entity"], row["to_entity"], row["alert_type"]) == \
+        (64429964.0, "unknown wallet", "Coinbase", "transfer")
+    assert row["timestamp"] == pd.Timestamp("2025-05-03 17:24", tz="UTC")
+
+
+def test_unknown_to_exchange_query(db):
+    with AlertStore(db) as store:
+        signals = store.query(from_type="unknown", to_type="exchange", min_usd=50e6)
+        assert signals["currency"].astype(str).tolist() == ["XRP", "BTC", "USDC"]       # by time
+        assert signals["to_entity"].astype(str).tolist() == ["Coinbase", "Coinbase Institutional", "Coinbase"]
+        assert (signals["from_type"] == TYPE_CODE["unknown"]).all()
+        assert (signals["to_type"] == TYPE_CODE["exchange"]).all()
+
+        assert len(store.query(from_type="unknown", to_type="exchange")) == 4        # + LTC below 50M
+        btc = store.query(currency="btc", from_type="unknown", to_type=["exchange"], min_usd=50e6,
+                          columns=["usd_value", "raw_text"])
+        assert btc["usd_value"].tolist() == [121357854.0]
+        assert "Coinbase Institutional" in btc["raw_text"].iloc[0]
+        # start is inclusive, end exclusive
+        window = store.query(from_type="unknown", to_type="exchange", min_usd=50e6,
+                             start="2025-05-06 21:16", end="2025-05-06 22:58")
+        assert window["currency"].astype(str).tolist() == ["BTC"]
+        assert store.query(to_entity="Kraken").empty
+
+
+def test_reclassify_after_a_registry_change(db):
+    registry = EntityRegistry({**ENTITIES, "Ceffu": ("exchange", {})})
+    with AlertStore(db) as store:
+        assert len(store.query(from_type="custodian", to_type="exchange")) == 1
+        assert store.reclassify(registry) == 1
+        assert store.reclassify(registry) == 0
+        moved = store.query(from_type="exchange", to_type="exchange", columns=["from_entity", "to_entity"])
+        assert ("Ceffu", "Binance") in set(zip(moved["from_entity"].astype(str), moved["to_entity"].astype(str)))
+        assert store.query(from_type="custodian").empty
+
+
+def test_store_as_scraper_sink_keeps_pages_and_cursor(tmp_path):
+    records = pd.read_csv(FIXTURE).to_dict("records")
+    path = str(tmp_path / "sink.db")
+    with AlertStore(path) as store:
+        assert store.cursor is None
+        assert store.write_page(records[:6], cursor="?cursor=page2") == 6
+        assert store.write_page(records[4:], cursor="?cursor=page3") == 4
+    with AlertStore(path) as store:
+        assert store.cursor == "?cursor=page3" and len(store) == 10
+        assert store.write_page(records[:2]) == 0
+        store.clear_cursor()
+    with AlertStore(path) as store:
+        assert store.cursor is None and store.get_meta("cursor") is None
@@ -0,0 +1,57 @@
+import os
+
+import pandas as pd
+
+from backfill import backfill, read_snapshots
+from entity_registry import EXCHANGE, UNKNOWN
+
+SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "timeline_snapshot.html")
+
+
+def test_read_snapshots():
+    rows = read_snapshots([SNAPSHOT])
+    assert list(rows.columns) == ["raw_text", "timestamp_text", "tweet_link"]
+    assert len(rows) == 3 and rows["raw_text"][0].startswith("🚨 🚨 1,200 #BTC")
+
+
+def test_snapshot_is_reparsed_with_exact_timestamps(tmp_path):
+    out = str(tmp_path / "out.csv")
+    backfill([SNAPSHOT], out, chunksize=2, workers=2)
+    df = pd.read_csv(out)
+    assert df["currency"].tolist() == ["BTC", "USDT", "USDC"]
+    assert df["alert_type"].tolist() == ["transfer", "mint", "burn"]
+    assert df["usd_value"].tolist() == [113_640_000.0, 100_012_000.0, 49_991_250.0]
+    assert (df["from_type"][0], df["to_type"][0]) == (UNKNOWN, EXCHANGE)
+    # the tweet id's snowflake time beats the minute-resolution timestamp_text
+    assert df["timestamp"][0] == "2025-01-01 12:44:31.285+00:00"
+
+
+def test_stale_csv_reports_changed_cells(tmp_path):
+    stale = read_snapshots([SNAPSHOT])
+    stale["amount"] = [1200.0, 100000000.0, 1.0]
+    stale["currency"] = ["BTC", "USDT", "USDC"]
+    stale["usd_value"] = None                       # the old scraper never filled it
+    stale["from_entity"] = ["unknown", "mint", "USDC Treasury"]
+    stale["to_entity"] = ["Coinbase", "Tether Treasury", "burn"]
+    path, out, diff = str(tmp_path / "old.csv"), str(tmp_path / "new.csv"), str(tmp_path / "diff.csv")
+    stale.to_csv(path, index=False)
+
+    totals = backfill([path], out, chunksize=1, workers=2, diff_file=diff)
+    assert totals["usd_value"] == 3
+    assert totals["amount"] == 1
+    assert totals["from_entity"] == 1                # 'unknown' -> 'unknown wallet'
+    assert totals["currency"] == 0 and totals["to_entity"] == 0
+    changes = pd.read_csv(diff)
+    assert set(changes["column"]) >= {"usd_value", "amount", "from_entity"}
+    assert len(pd.read_csv(out)) == 3
+
+
+def test_csv_without_timestamp_text_uses_the_snowflake_time(tmp_path):
+    rows = read_snapshots([SNAPSHOT]).drop(columns=["timestamp_text"])
+    path, out = str(tmp_path / "old.csv"), str(tmp_path / "new.csv")
+    rows.to_csv(path, index=False)
+    backfill([path], out, chunksize=2, workers=1)
+    df = pd.read_csv(out)
+    assert "timestamp_text" not in df.columns
+    assert df["timestamp"][0] == "2025-01-01 12:44:31.285+00:00"
+    assert df["timestamp"].notna().all()
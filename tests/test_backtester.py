@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester import MINUTE_MS, Backtester, simulate_short
+
+T0 = 1_700_000_040_000
+
+
+def bars(ohlc):
+    """Candle arrays from (open, high, low, close) rows, one minute apart from T0."""
+    o, h, l, c = np.array(ohlc, dtype=float).T
+    return {'open_time': T0 + np.arange(len(o), dtype=np.int64) * MINUTE_MS,
+            'open': o, 'high': h, 'low': l, 'close': c, 'volume': np.ones(len(o))}
+
+
+FLAT = (2.0, 2.001, 1.999, 2.0)
+
+
+@pytest.mark.parametrize("intrabar, reason, price", [("worst", "sl", 2.003), ("best", "tp", 1.993)])
+def test_bar_touching_both_levels(intrabar, reason, price):
+    candles = bars([FLAT, (2.0, 2.01, 1.99, 2.0), FLAT])
+    assert simulate_short(candles, 0, 1.993, 2.003, 10, intrabar) == (1, price, reason)
+
+
+def test_path_mode_takes_the_level_nearer_the_open():
+    candles = bars([FLAT, (2.002, 2.004, 1.99, 2.0)])       # open next to the high: O-H-L-C
+    assert simulate_short(candles, 0, 1.993, 2.003, 10, "path")[2] == "sl"
+    candles = bars([FLAT, (1.994, 2.004, 1.99, 2.0)])       # open next to the low: O-L-H-C
+    assert simulate_short(candles, 0, 1.993, 2.003, 10, "path")[2] == "tp"
+
+
+def test_gap_through_the_stop_fills_at_the_open():
+    candles = bars([FLAT, (2.05, 2.06, 2.04, 2.05)])
+    j, price, reason = simulate_short(candles, 0, 1.993, 2.003, 10, slippage=0.001)
+    assert (j, reason) == (1, "sl")
+    assert price == pytest.approx(2.05 * 1.001)
+
+
+def test_gap_through_the_target_fills_at_the_open():
+    candles = bars([FLAT, (1.95, 1.96, 1.94, 1.95)])
+    assert simulate_short(candles, 0, 1.993, 2.003, 10) == (1, 1.95, "tp")
+
+
+def test_timeout_and_end_of_data_close_at_the_close():
+    candles = bars([FLAT] * 4 + [(2.0, 2.001, 1.999, 1.998)] + [FLAT] * 5)
+    assert simulate_short(candles, 0, 1.993, 2.003, 5) == (4, 1.998, "timeout")
+    assert simulate_short(candles, 6, 1.993, 2.003, 5) == (9, 2.0, "end_of_data")
+
+
+def test_signals_on_an_open_symbol_are_skipped():
+    rows = [FLAT] * 60
+    rows[10] = (2.0, 2.01, 1.999, 2.0)                        # stops out the first trade
+    bt = Backtester({"XRPUSDT": bars(rows)}, fee=0.0, slippage_bps=0.0, max_hold=30)
+    signals = pd.DataFrame({'tx_ms': [T0, T0 + 3 * MINUTE_MS, T0 + 20 * MINUTE_MS],
+                            'coin': ["XRP"] * 3, 'usd': [60_000_000] * 3})
+    trades = bt.run(signals)
+
+    assert bt.skipped == {"position_open": 1}
+    assert trades['reason'].tolist() == ["sl", "timeout"]
+    first, second = trades.iloc[0], trades.iloc[1]
+    assert (first['qty'], first['sl'], first['exit']) == (1250.0, 2.003, 2.003)
+    assert first['exit_ms'] == T0 + 11 * MINUTE_MS
+    assert first['pnl'] == pytest.approx(1250.0 * (2.0 - 2.003))
+    # the second trade is sized off the equity left after the first one's loss
+    assert second['equity_before'] == pytest.approx(10_000 + first['pnl'])
+    assert (second['entry_ms'], second['qty']) == (T0 + 20 * MINUTE_MS, 1249.5)
@@ -0,0 +1,66 @@
+import time
+
+from alert_sink import CsvAlertSink
+from bench_timeline_source import timeline_page_html
+from history_backfill import AdaptivePacer, HistoryBackfill, date_chains
+
+
+def test_pacer_is_additive_increase_multiplicative_decrease():
+    pacer = AdaptivePacer(interval=1.0, min_interval=0.2, max_interval=3.0, step=0.25)
+    pacer.success()
+    assert pacer.interval == 0.75
+    for _ in range(10):
+        pacer.success()
+    assert pacer.interval == 0.2
+    pacer.throttled()
+    pacer.throttled()
+    assert pacer.interval == 0.8
+    for _ in range(5):
+        pacer.throttled()
+    assert pacer.interval == 3.0 and pacer.throttled_count == 7
+
+
+def test_pacer_spaces_requests_and_honours_retry_after():
+    pacer = AdaptivePacer(interval=0.05, min_interval=0.05)
+    t0 = time.monotonic()
+    for _ in range(3):
+        pacer.wait()
+    assert time.monotonic() - t0 >= 0.1
+    pacer.throttled(retry_after=0.2)
+    t0 = time.monotonic()
+    pacer.wait()
+    assert time.monotonic() - t0 >= 0.15
+
+
+def test_date_chains_cover_the_range_newest_first():
+    from datetime import date
+    chains = date_chains("https://nitter.net", "whale_alert", date(2025, 1, 1), date(2025, 1, 16), 7)
+    assert list(chains) == ["2025-01-09_2025-01-16", "2025-01-02_2025-01-09", "2025-01-01_2025-01-02"]
+
+
+def rows(start, count):
+    return [{"raw_text": f"🚨 {n},000 #BTC (1 USD) transferred from unknown wallet to #Binance",
+             "timestamp_text": "Jan 1, 2025 · 12:00 PM UTC",
+             "tweet_link": f"https://nitter.net/whale_alert/status/{1_900_000 + n}#m"}
+            for n in range(start, start + count)]
+
+
+def test_interrupted_backfill_resumes_without_duplicates(tmp_path, monkeypatch):
+    pages = {"http://x/a": timeline_page_html(rows(0, 3), "a1"),
+             "http://x/a?cursor=a1": timeline_page_html(rows(3, 3), "a2"),
+             "http://x/a?cursor=a2": timeline_page_html(rows(6, 2)),
+             "http://x/b": timeline_page_html(rows(100, 2), "b1"),
+             "http://x/b?cursor=b1": timeline_page_html(rows(102, 2))}
+    monkeypatch.setattr(HistoryBackfill, "fetch", lambda self, url: pages[url])
+    chains = {"a": "http://x/a", "b": "http://x/b"}
+    csv_path, state = str(tmp_path / "history.csv"), str(tmp_path / "state.json")
+
+    first = HistoryBackfill(chains, CsvAlertSink(csv_path), state, workers=2)
+    first.run(max_pages_per_chain=1)
+    assert not any(c["done"] for c in first.state.values())
+
+    second = HistoryBackfill(chains, CsvAlertSink(csv_path), state, workers=2)
+    second.run()
+    assert all(c["done"] for c in second.state.values())
+    assert second.pages == 3
+    assert second.sink.rows == 12 and len(second.sink.ids) == 12
@@ -0,0 +1,100 @@
+import numpy as np
+
+from impact_engine import CandleIndex, SparseTable, compute_impact, multi_horizon_impact, window_bounds
+
+MINUTE = 60_000
+T0 = 1_700_000_040_000
+
+
+def candles(lows):
+    open_time = T0 + np.arange(len(lows), dtype=np.int64) * MINUTE
+    open_ = np.full(len(lows), 100.0)
+    return open_time, open_, np.asarray(lows, dtype=float)
+
+
+def test_window_bounds_include_both_ends():
+    open_time, _, _ = candles([99] * 10)
+    i0, i1 = window_bounds(open_time, np.array([T0, T0 + 30_000, T0 + 2 * MINUTE]), 3 * MINUTE)
+    # tx <= open_time <= tx + window
+    assert i0.tolist() == [0, 1, 2]
+    assert i1.tolist() == [4, 4, 6]
+
+
+def test_ties_on_the_low_go_to_the_earliest_candle():
+    open_time, open_, low = candles([99.5, 98.0, 99.0, 98.0, 98.0])
+    impact = compute_impact(open_time, open_, low, np.array([T0]), 4 * MINUTE)
+    assert impact['lowest_price'][0] == 98.0
+    assert impact['lowest_time'][0] == T0 + MINUTE
+    assert impact['minutes_until_lowest'][0] == 1.0
+    assert np.isclose(impact['price_drop_pct'][0], -2.0)
+
+
+def test_sparse_table_argmin_prefers_the_first_index():
+    table = SparseTable(np.array([3.0, 1.0, 2.0, 1.0, 1.0]))
+    assert table.query(np.array([0, 2]), np.array([5, 5])).tolist() == [1, 3]
+
+
+def test_empty_windows_are_invalid_and_nan():
+    open_time, open_, low = candles([99.0, 98.0])
+    tx = np.array([T0 - 10 * MINUTE, T0 + 5 * MINUTE, T0])
+    impact = compute_impact(open_time, open_, low, tx, 2 * MINUTE)
+    assert impact['valid'].tolist() == [False, False, True]
+    for key in ('price_at_tx', 'lowest_price', 'minutes_until_lowest', 'price_drop_pct'):
+        assert np.isnan(impact[key][:2]).all()
+    assert impact['price_at_tx'][2] == 100.0
+
+
+def test_unaligned_transfer_uses_the_next_candle_open():
+    open_time, _, low = candles([99.0, 97.0, 98.0])
+    open_ = np.array([100.0, 101.0, 102.0])
+    impact = compute_impact(open_time, open_, low, np.array([T0 + 20_000]), 2 * MINUTE)
+    assert impact['price_at_tx'][0] == 101.0
+    assert impact['lowest_price'][0] == 97.0
+    assert np.isclose(impact['minutes_until_lowest'][0], 40 / 60)
+
+
+def horizon_index():
+    open_time = T0 + np.arange(8, dtype=np.int64) * MINUTE
+    return CandleIndex(open_time,
+                       [100, 100, 101, 99, 98, 102, 103, 100],
+                       [101, 102, 101.5, 99.5, 102.5, 104, 103.5, 101],
+                       [99, 99.5, 98.5, 97, 97.5, 101, 99.5, 99],
+                       [100, 101, 99, 98, 102, 103, 100, 100],
+                       [10, 10, 40, 20, 10, 10, 10, 10])
+
+
+def test_multi_horizon_metrics_per_horizon():
+    table = multi_horizon_impact(horizon_index(), [T0 + 2 * MINUTE], horizons=(1, 3),
+                                 transfer_ids=[7], baseline_candles=2)
+    assert (table['transfer_id'] == 7).all()
+    got = table.set_index(['horizon_min', 'metric'])['value']
+    # 1 minute: candles 2-3, priced off open 101 and the previous close 101
+    assert np.isclose(got[1, 'max_drop_pct'], (97 - 101) / 101 * 100)
+    assert np.isclose(got[1, 'max_runup_pct'], (101.5 - 101) / 101 * 100)
+    assert np.isclose(got[1, 'return_pct'], (98 - 101) / 101 * 100)
+    assert got[1, 'volume_spike'] == 3.0
+    assert (got[1, 'minutes_to_low'], got[1, 'minutes_to_high']) == (1.0, 0.0)
+    # 3 minutes: candles 2-5, the high comes after the low
+    assert np.isclose(got[3, 'max_drop_pct'], (97 - 101) / 101 * 100)
+    assert np.isclose(got[3, 'max_runup_pct'], (104 - 101) / 101 * 100)
+    assert np.isclose(got[3, 'return_pct'], (103 - 101) / 101 * 100)
+    assert got[3, 'volume_spike'] == 2.0
+    assert (got[3, 'minutes_to_low'], got[3, 'minutes_to_high']) == (1.0, 3.0)
+
+
+def test_multi_horizon_edges_of_the_candle_range():
+    tx = [T0 - 30_000, T0 + 20 * MINUTE]
+    table = multi_horizon_impact(horizon_index(), tx, horizons=(1,), baseline_candles=2)
+    # nothing after the second transfer; the first has no previous close or baseline,
+    # so its return is taken from the open of candle 0
+    assert set(table['transfer_id']) == {0}
+    got = table.set_index('metric')['value']
+    assert got['return_pct'] == 0.0
+    assert np.isnan(got['volume_spike'])
+    assert got['minutes_to_low'] == 0.5
+
+
+def test_multi_horizon_without_data_is_an_empty_table():
+    table = multi_horizon_impact(horizon_index(), [T0 + 30 * MINUTE], horizons=(5,))
+    assert table.empty
+    assert list(table.columns) == ['transfer_id', 'horizon_min', 'metric', 'value']
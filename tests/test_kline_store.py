@@ -0,0 +1,117 @@
+import numpy as np
+
+from kline_loader import KlineLoader, merge_windows
+from kline_store import CANDLE_DTYPE, DAY_MS, KlineStore, merge_ranges, subtract_ranges
+
+MINUTE = 60_000
+DAY0 = 1_700_006_400_000 // DAY_MS * DAY_MS
+
+
+def candles(start_ms, count):
+    arr = np.zeros(count, dtype=CANDLE_DTYPE)
+    arr['open_time'] = start_ms + np.arange(count, dtype=np.int64) * MINUTE
+    for name in ('open', 'high', 'low', 'close'):
+        arr[name] = 100.0 + np.arange(count)
+    arr['volume'] = 1.0
+    return arr
+
+
+def test_merge_ranges_joins_overlapping_and_touching():
+    assert merge_ranges([[10, 20], [0, 5], [21, 30], [15, 18], [40, 50]]) == [[0, 5], [10, 30], [40, 50]]
+
+
+def test_subtract_ranges_returns_the_gaps():
+    covered = [[10, 20], [30, 40]]
+    assert subtract_ranges([[0, 50]], covered) == [[0, 9], [21, 29], [41, 50]]
+    assert subtract_ranges([[12, 18], [32, 35]], covered) == []
+    assert subtract_ranges([[15, 25]], covered) == [[21, 25]]
+
+
+def test_merge_windows_splits_at_max_candles():
+    spans = merge_windows([(0, 10 * MINUTE), (5 * MINUTE, 20 * MINUTE), (100 * MINUTE, 101 * MINUTE)],
+                          MINUTE, max_candles=8)
+    assert spans == [(0, 8 * MINUTE - 1), (8 * MINUTE, 16 * MINUTE - 1), (16 * MINUTE, 20 * MINUTE),
+                     (100 * MINUTE, 101 * MINUTE)]
+
+
+def test_merge_windows_packs_nearby_windows_across_gaps():
+    # ten 16-candle windows an hour apart: one 1000-candle request reaches all of them
+    windows = [(i * 60 * MINUTE, (i * 60 + 15) * MINUTE) for i in range(10)]
+    assert merge_windows(windows, MINUTE) == [(0, (9 * 60 + 15) * MINUTE)]
+    # with room for 100 candles a request takes two windows and the next starts at the third
+    assert merge_windows(windows, MINUTE, max_candles=100) == [
+        (i * 60 * MINUTE, (i * 60 + 75) * MINUTE) for i in range(0, 10, 2)]
+    # a window crossing the limit continues where the previous span stopped
+    assert merge_windows([(0, MINUTE), (90 * MINUTE, 120 * MINUTE)], MINUTE, max_candles=100) == \
+        [(0, 100 * MINUTE - 1), (100 * MINUTE, 120 * MINUTE)]
+
+
+def test_store_round_trips_across_days_and_records_coverage(tmp_path):
+    store = KlineStore(str(tmp_path))
+    start = DAY0 + DAY_MS - 30 * MINUTE              # spans midnight
+    store.write("BTCUSDT", "1m", candles(start, 60), covered=[(start, start + 60 * MINUTE - 1)])
+    assert len(list((tmp_path / "BTCUSDT" / "1m").glob("*.npy"))) == 2
+
+    arr = store.read("BTCUSDT", "1m", start + 10 * MINUTE, start + 40 * MINUTE)
+    assert arr['open_time'][0] == start + 10 * MINUTE and len(arr) == 31
+    assert store.missing("BTCUSDT", "1m", [(start, start + 30 * MINUTE)]) == []
+    assert store.missing("BTCUSDT", "1m", [(start - 5 * MINUTE, start + 90 * MINUTE)]) == \
+        [[start - 5 * MINUTE, start - 1], [start + 60 * MINUTE, start + 90 * MINUTE]]
+
+
+def test_overlapping_writes_keep_one_candle_per_open_time(tmp_path):
+    store = KlineStore(str(tmp_path))
+    store.write("ETHUSDT", "1m", candles(DAY0, 10), covered=[(DAY0, DAY0 + 10 * MINUTE - 1)])
+    newer = candles(DAY0 + 5 * MINUTE, 10)
+    newer['close'] = -1.0
+    store.write("ETHUSDT", "1m", newer, covered=[(DAY0 + 5 * MINUTE, DAY0 + 15 * MINUTE - 1)])
+    arr = store.read("ETHUSDT", "1m")
+    assert len(arr) == 15 and np.all(np.diff(arr['open_time']) == MINUTE)
+    assert np.all(arr['close'][5:] == -1.0)                  # last write wins
+    assert store.coverage("ETHUSDT", "1m") == [[DAY0, DAY0 + 15 * MINUTE - 1]]
+
+
+class FakeSession:
+    """klines endpoint over a fixed candle series, recording every request."""
+
+    def __init__(self, series):
+        self.series = series
+        self.requests = []
+
+    def mount(self, *args):
+        pass
+
+    def get(self, url, params, timeout):
+        self.requests.append((params['startTime'], params['endTime']))
+        sel = self.series[(self.series['open_time'] >= params['startTime'])
+                          & (self.series['open_time'] <= params['endTime'])]
+        rows = [[int(c['open_time']), str(c['open']), str(c['high']), str(c['low']), str(c['close']),
+                 str(c['volume']), int(c['open_time']) + MINUTE - 1, "0", 0, "0", "0", "0"] for c in sel]
+        return type("Response", (), {"status_code": 200, "headers": {}, "json": lambda self: rows})()
+
+
+def test_loader_only_fetches_what_the_store_is_missing(tmp_path):
+    store = KlineStore(str(tmp_path))
+    series = candles(DAY0, 120)
+    store.write("XRPUSDT", "1m", series[:60], covered=[(DAY0, DAY0 + 60 * MINUTE - 1)])
+    session = FakeSession(series)
+    loader = KlineLoader(session=session, store=store, max_workers=1)
+    loader.load({"XRPUSDT": [(DAY0 + 30 * MINUTE, DAY0 + 90 * MINUTE)]})
+    assert session.requests == [(DAY0 + 60 * MINUTE, DAY0 + 90 * MINUTE)]
+    assert len(loader.arrays("XRPUSDT")['open_time']) == 61
+
+    offline = KlineLoader(session=FakeSession(series), store=store, offline=True)
+    offline.load({"XRPUSDT": [(DAY0, DAY0 + 119 * MINUTE)]})
+    assert offline.session.requests == []
+    assert len(offline.arrays("XRPUSDT")['open_time']) == 91
+
+
+def test_loader_fetches_nearby_windows_in_one_request():
+    series = candles(DAY0, 600)
+    session = FakeSession(series)
+    loader = KlineLoader(session=session, max_workers=1)
+    windows = [(DAY0 + i * 60 * MINUTE, DAY0 + (i * 60 + 15) * MINUTE) for i in range(10)]
+    loader.load({"XRPUSDT": windows})
+    assert loader.requests_made == 1 and len(session.requests) == 1
+    w = loader.window("XRPUSDT", *windows[3])
+    assert len(w) == 16 and w['open'].iloc[0] == 100.0 + 180
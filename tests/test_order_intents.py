@@ -0,0 +1,24 @@
+from order_intents import HotStandby
+
+
+class FakeClient:
+    def account(self):
+        return {'assets': [{'asset': 'USDT', 'walletBalance': '1000'}], 'positions': []}
+
+    def mark_price(self):
+        return [{'symbol': 'BTCUSDT', 'markPrice': '60000'}, {'symbol': 'GONEUSDT', 'markPrice': '1'}]
+
+
+class FakeSymbolCache:
+    def get(self, symbol):
+        if symbol != 'BTCUSDT':
+            raise ValueError(f"Symbol {symbol} not found in exchangeInfo")
+        return 3, 1, 0.001, 0.1
+
+
+def test_refresh_skips_symbols_missing_from_exchange_info():
+    cfg = {'BTCUSDT': {'usd': 600, 'lev': 5}, 'GONEUSDT': {'usd': 100, 'lev': 5}}
+    standby = HotStandby(FakeClient(), cfg, FakeSymbolCache(), account_risk=0.2)
+    standby.refresh()
+    assert standby.intents == {'BTCUSDT': {'symbol': 'BTCUSDT', 'side': 'SELL', 'type': 'MARKET',
+                                           'quantity': 0.01}}
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from param_sweep import PARAMS, fold_edges, walk_forward
+
+FOLDS = 4
+
+
+def results(fold_pnl, symbol="XRPUSDT", current=None):
+    """A sweep result table with one row per combination and the given per-fold PnL."""
+    rows = []
+    for i, pnl in enumerate(fold_pnl):
+        row = {"symbol": symbol, "tp": 0.1 * (i + 1), "sl": 0.1, "lev": 5, "min_notional": 5e7,
+               "entry_delay": 0.0, "pnl": float(sum(pnl)), "is_current": i == current}
+        for k in range(FOLDS):
+            row[f"pnl_f{k}"] = float(pnl[k])
+            row[f"trades_f{k}"] = 3
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def test_fold_edges_split_signals_into_disjoint_equal_folds():
+    tx_ms = np.sort(np.random.default_rng(0).integers(0, 10**9, 100))
+    edges = fold_edges(tx_ms, FOLDS)
+    assert np.all(np.diff(edges) > 0) and edges[-1] > tx_ms.max()
+    fold = np.searchsorted(edges, tx_ms, "right") - 1
+    assert fold.min() == 0 and fold.max() == FOLDS - 1
+    assert np.bincount(fold).tolist() == [25, 25, 25, 25]
+    assert np.all(np.diff(fold) >= 0)                        # consecutive in time, never interleaved
+
+
+def test_each_step_selects_on_earlier_folds_and_scores_the_next():
+    table = results([[10, -5, -5, -5],      # best on fold 0 only
+                     [1, 8, 1, 1],          # best on folds 0-1
+                     [0, 0, 20, 30]],       # best over the whole period: the hindsight pick
+                    current=1)
+    wf = walk_forward(table, FOLDS)
+    assert wf["step"].tolist() == [1, 2, 3]
+    assert wf["tp"].round(1).tolist() == [0.1, 0.2, 0.3]
+    assert wf["train_pnl"].tolist() == [10, 9, 20]
+    assert wf["test_pnl"].tolist() == [-5, 1, 30]
+    assert wf["current_test_pnl"].tolist() == [8, 1, 1]
+
+
+def test_selection_ignores_the_test_fold_and_later():
+    rng = np.random.default_rng(1)
+    base = rng.normal(size=(12, FOLDS))
+    picks = walk_forward(results(base), FOLDS)
+    for step in range(1, FOLDS):
+        future = base.copy()
+        future[:, step:] = rng.normal(scale=100, size=(12, FOLDS - step))
+        again = walk_forward(results(future), FOLDS)
+        row, other = picks[picks["step"] == step].iloc[0], again[again["step"] == step].iloc[0]
+        assert row[list(PARAMS)].tolist() == other[list(PARAMS)].tolist()
+        assert row["train_pnl"] == other["train_pnl"]
+        best = int(round(other["tp"] / 0.1)) - 1
+        assert other["test_pnl"] == future[best, step]
@@ -0,0 +1,54 @@
+import time
+
+from position_tracker import PositionTracker
+
+
+class FakeClient:
+    """positionRisk / openOrders / v3 account shaped responses."""
+
+    def __init__(self, risk, on_request=None):
+        self.risk = risk
+        self.on_request = on_request
+
+    def get_position_risk(self):
+        if self.on_request:
+            self.on_request()
+        return self.risk
+
+    def get_orders(self):
+        return []
+
+    def account(self):
+        # /fapi/v3/account: positions have no entryPrice
+        return {'assets': [{'asset': 'USDT', 'walletBalance': '100.0'}],
+                'positions': [{'symbol': p['symbol'], 'positionAmt': p['positionAmt']} for p in self.risk]}
+
+
+def test_reconcile_takes_entry_from_position_risk():
+    tracker = PositionTracker({})
+    tracker.reconcile(FakeClient([{'symbol': 'BTCUSDT', 'positionAmt': '-0.01', 'entryPrice': '65000.0',
+                                   'unRealizedProfit': '1.5'}]))
+    assert tracker.positions['BTCUSDT'] == {'amt': -0.01, 'entry': 65000.0, 'upnl': 1.5}
+    assert tracker.balances['USDT'] == 100.0
+
+
+def test_reconcile_closes_positions_missing_from_rest():
+    closed = []
+    tracker = PositionTracker({'ETHUSDT': {'qty': 1}}, on_close=closed.append)
+    tracker.positions['ETHUSDT'] = {'amt': -1.0, 'entry': 3000.0, 'upnl': 0.0}
+    tracker.reconcile(FakeClient([]))
+    assert not tracker.is_open('ETHUSDT')
+    assert closed == ['ETHUSDT']
+
+
+def test_reconcile_keeps_entry_made_after_snapshot():
+    closed = []
+    tracker = PositionTracker({}, on_close=closed.append)
+
+    def enter_during_request():
+        time.sleep(0.002)
+        tracker.note_entry('SOLUSDT', 2.0, 150.0)
+
+    tracker.reconcile(FakeClient([], on_request=enter_during_request))
+    assert tracker.is_open('SOLUSDT')
+    assert closed == []
@@ -0,0 +1,162 @@
+import importlib
+import threading
+import time
+
+import pytest
+from binance.error import ClientError
+
+from position_tracker import PositionTracker
+from symbol_cache import SymbolInfoCache
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)          # the bot opens whale_flow_bot.log on import
+    bot = importlib.import_module("whale_bot_binance01")
+    monkeypatch.setattr(bot, "PROTECT_RETRY_DELAY", 0.01)
+    return bot
+
+
+class FakeClient:
+    """new_order that takes ``delay`` seconds and rejects the first ``fail`` attempts per order type."""
+
+    def __init__(self, delay=0.1, fail=None):
+        self.delay = delay
+        self.fail = dict(fail or {})
+        self.orders = []
+        self._lock = threading.Lock()
+
+    def new_order(self, **params):
+        start = time.perf_counter()
+        time.sleep(self.delay)
+        with self._lock:
+            self.orders.append((params["type"], start, time.perf_counter()))
+            if self.fail.get(params["type"], 0) > 0:
+                self.fail[params["type"]] -= 1
+                raise ConnectionError("simulated")
+            return {"orderId": len(self.orders), "updateTime": int(time.time() * 1000)}
+
+
+def test_legs_are_sent_concurrently(bot, monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(bot, "client", client)
+    monkeypatch.setattr(bot, "PARALLEL_PROTECTION", True)
+    tp, sl, unprotected_ms = bot.place_protection("XRPUSDT", 1.9, 2.1, time.perf_counter())
+    assert tp and sl
+    (_, tp_start, tp_end), (_, sl_start, sl_end) = sorted(client.orders)[::-1]
+    assert tp_start < sl_end and sl_start < tp_end          # the two legs overlap
+    assert unprotected_ms < 1.5 * client.delay * 1000
+
+
+def test_sequential_mode_sends_tp_first(bot, monkeypatch):
+    client = FakeClient(delay=0.01)
+    monkeypatch.setattr(bot, "client", client)
+    monkeypatch.setattr(bot, "PARALLEL_PROTECTION", False)
+    bot.place_protection("XRPUSDT", 1.9, 2.1, time.perf_counter())
+    assert [o[0] for o in client.orders] == ["TAKE_PROFIT_MARKET", "STOP_MARKET"]
+
+
+def test_failed_leg_is_retried_on_its_own(bot, monkeypatch):
+    client = FakeClient(delay=0.01, fail={"STOP_MARKET": 2})
+    monkeypatch.setattr(bot, "client", client)
+    monkeypatch.setattr(bot, "PARALLEL_PROTECTION", True)
+    tp, sl, _ = bot.place_protection("XRPUSDT", 1.9, 2.1, time.perf_counter())
+    assert tp and sl
+    assert [o[0] for o in client.orders].count("TAKE_PROFIT_MARKET") == 1
+    assert [o[0] for o in client.orders].count("STOP_MARKET") == 3
+
+
+def test_unplaced_stop_loss_is_reported(bot, monkeypatch):
+    client = FakeClient(delay=0.0, fail={"STOP_MARKET": 99})
+    monkeypatch.setattr(bot, "client", client)
+    monkeypatch.setattr(bot, "PROTECT_RETRIES", 2)
+    tp, sl, _ = bot.place_protection("XRPUSDT", 1.9, 2.1, time.perf_counter())
+    assert tp and sl is None
+
+
+class FilterClient:
+    """Exchange whose LOT_SIZE step is now 0.1: finer quantities are rejected with -4023."""
+
+    def __init__(self, symbols=("XRPUSDT",)):
+        self.symbols = symbols
+        self.sent = []
+
+    def exchange_info(self):
+        return {'symbols': [{'symbol': s, 'quantityPrecision': 1, 'pricePrecision': 4,
+                             'filters': [{'filterType': 'LOT_SIZE', 'stepSize': '0.1'},
+                                         {'filterType': 'PRICE_FILTER', 'tickSize': '0.0001'}]}
+                            for s in self.symbols]}
+
+    def new_order(self, **params):
+        self.sent.append(params["quantity"])
+        if round(params["quantity"] * 10, 6) % 1:
+            raise ClientError(400, -4023, "Quantity not increased by step size", {})
+        return {"orderId": 1}
+
+
+def test_filter_rejection_retries_with_refitted_quantity(bot, monkeypatch):
+    client = FilterClient()
+    monkeypatch.setattr(bot, "client", client)
+    monkeypatch.setattr(bot, "symbol_cache", SymbolInfoCache(client))
+    params = {"symbol": "XRPUSDT", "side": "SELL", "type": "MARKET", "quantity": 123.45}
+    assert bot.place_with_retry(params, max_retries=3, base_delay=0.01) == {"orderId": 1}
+    assert client.sent == [123.45, 123.4]
+    assert params["quantity"] == 123.4                     # the caller sees what was filled
+
+
+def test_filter_rejection_for_a_delisted_symbol_is_not_retried(bot, monkeypatch):
+    client = FilterClient(symbols=())
+    monkeypatch.setattr(bot, "client", client)
+    monkeypatch.setattr(bot, "symbol_cache", SymbolInfoCache(client))
+    params = {"symbol": "XRPUSDT", "side": "SELL", "type": "MARKET", "quantity": 123.45}
+    assert bot.place_with_retry(params, max_retries=3, base_delay=0.01) is None
+    assert client.sent == [123.45]
+
+
+class StreamingClient:
+    """The stop fills, and the stream reports it, before new_order for the SL has even returned."""
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self.next_id = 0
+
+    def new_order(self, **params):
+        self.next_id += 1
+        if params["type"] == "STOP_MARKET":
+            self.tracker.apply({'e': 'ORDER_TRADE_UPDATE', 'o': {
+                'i': self.next_id, 's': params["symbol"], 'X': 'FILLED', 'x': 'TRADE', 'ot': 'STOP_MARKET',
+                'S': 'BUY', 'sp': '2.003', 'ap': '2.003', 'rp': '-0.3', 'n': '0.01'}})
+            self.tracker.apply({'e': 'ACCOUNT_UPDATE', 'a': {'B': [], 'P': [
+                {'s': params["symbol"], 'pa': '0', 'ep': '0', 'up': '0'}]}})
+        return {"orderId": self.next_id, "avgPrice": "2.0"}
+
+
+class ReadyStandby:
+    mark_prices = {"XRPUSDT": 2.0}
+
+    def intent(self, symbol):
+        return {"symbol": symbol, "side": "SELL", "type": "MARKET", "quantity": 100.0}
+
+    def mark_open(self, symbol):
+        pass
+
+    def is_open(self, symbol):
+        return False
+
+
+def test_protection_fill_before_the_order_returns_keeps_its_pnl(bot, monkeypatch):
+    open_pos = {}
+    tracker = PositionTracker(open_pos)
+    monkeypatch.setattr(bot, "OPEN_POS", open_pos)
+    monkeypatch.setattr(bot, "tracker", tracker)
+    monkeypatch.setattr(bot, "standby", ReadyStandby())
+    monkeypatch.setattr(bot, "client", StreamingClient(tracker))
+    monkeypatch.setattr(bot, "symbol_cache", type("Cache", (), {"get": lambda self, s: (1, 4, 0.1, 0.0001)})())
+    monkeypatch.setattr(bot, "PARALLEL_PROTECTION", False)
+
+    assert bot.short_perp("XRPUSDT", {"tp": 0.35, "sl": 0.15, "lev": 5, "usd": 15_000})
+    assert "XRPUSDT" not in open_pos
+    closed = tracker.closed["XRPUSDT"]
+    assert (closed["qty"], closed["entry"], closed["exit"], closed["exit_reason"]) == (100.0, 2.0, 2.003, "sl")
+    assert abs(closed["pnl"] + 0.31) < 1e-9
+    assert (closed["tp_id"], closed["sl_id"]) == (2, 3)
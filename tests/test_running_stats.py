@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+
+from running_stats import QuantileSketch, RunningStats
+
+
+def test_running_stats_skip_nans_across_chunks():
+    stats = RunningStats()
+    stats.add([1.0, np.nan, -3.0])
+    stats.add([])
+    stats.add(np.array([np.nan]))
+    stats.add([6.0])
+    assert stats.count == 3
+    assert (stats.min, stats.max) == (-3.0, 6.0)
+    assert stats.mean == np.nanmean([1.0, np.nan, -3.0, 6.0])
+
+
+def test_empty_running_stats_have_nan_mean():
+    assert math.isnan(RunningStats().mean)
+    assert math.isnan(QuantileSketch().quantile(0.5))
+
+
+def test_sketch_quantiles_are_within_the_relative_accuracy():
+    values = np.random.default_rng(0).lognormal(0, 2, 10_000)
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    sketch.add(values)
+    for q in (0.0, 0.1, 0.5, 0.9, 0.99, 1.0):
+        exact = np.quantile(values, q, method='lower')
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact
+
+
+def test_negative_values_come_before_zero_and_positives():
+    sketch = QuantileSketch()
+    sketch.add([-10.0, -0.5, 0.0, 0.2, 3.0])
+    got = [sketch.quantile(q) for q in (0.0, 0.25, 0.5, 0.75, 1.0)]
+    assert np.allclose(got, [-10.0, -0.5, 0.0, 0.2, 3.0], rtol=0.01)
+    # the biggest drop is the 0-quantile
+    assert got == sorted(got)
+
+
+def test_all_negative_drops_order_like_numpy():
+    values = -np.random.default_rng(1).uniform(0.01, 20, 2_001)
+    sketch = QuantileSketch()
+    sketch.add(values)
+    for q in (0.0, 0.05, 0.5, 0.95, 1.0):
+        exact = np.quantile(values, q, method='lower')
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * abs(exact)
+
+
+def test_merged_chunks_equal_one_sketch():
+    values = np.random.default_rng(2).normal(0, 5, 5_000)
+    whole = QuantileSketch()
+    whole.add(values)
+    merged = QuantileSketch()
+    for chunk in np.array_split(values, 7):
+        part = QuantileSketch()
+        part.add(chunk)
+        merged.merge(part)
+    assert merged.count == whole.count == len(values)
+    assert (merged.positive, merged.negative, merged.zero) == (whole.positive, whole.negative, whole.zero)
+    for q in (0.0, 0.01, 0.5, 0.99, 1.0):
+        assert merged.quantile(q) == whole.quantile(q)
@@ -0,0 +1,23 @@
+import pytest
+
+from strategy import signal_info
+
+
+def transfer(to_entity, from_entity="unknown wallet"):
+    return dict(alert_type="transfer", currency="xrp", usd_value=60_000_000,
+                from_entity=from_entity, to_entity=to_entity)
+
+
+@pytest.mark.parametrize("to_entity", ["Binance", "Coinbase", "Coinbase Institutional", "Coinbase Prime",
+                                       "Huobi", "OKEx"])
+def test_transfers_into_traded_exchanges_signal(to_entity):
+    assert signal_info(transfer(to_entity)) == dict(coin="XRP", usd=60_000_000)
+
+
+@pytest.mark.parametrize("to_entity", ["Bitfinex", "unknown wallet"])
+def test_other_destinations_do_not_signal(to_entity):
+    assert signal_info(transfer(to_entity)) is None
+
+
+def test_exchange_to_exchange_does_not_signal():
+    assert signal_info(transfer("Coinbase", from_entity="Binance")) is None
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench_parallel_analysis import synthetic_store, synthetic_transfers
+from impact_engine import DEFAULT_HORIZONS
+from whalealerts_csv_analyser01 import analyze_chunk, analyze_whale_transfers, stream_whale_transfers
+
+CURRENCIES = ["AAA", "BBB", "CCC"]
+
+
+@pytest.fixture
+def alerts_csv(tmp_path, monkeypatch):
+    # both modes write their CSVs and the plot into the working directory
+    monkeypatch.chdir(tmp_path)
+    synthetic_store(tmp_path / "klines", [f"{c}USDT" for c in CURRENCIES], days=2)
+    df = synthetic_transfers(CURRENCIES, days=2, count=60)
+    df['from_entity'] = np.where(np.arange(len(df)) % 5 == 0, "Kraken", "unknown wallet")
+    df['timestamp'] = df['timestamp'].dt.strftime("%Y-%m-%d %H:%M:%S")
+    df.to_csv("alerts.csv", index=False)
+    return tmp_path
+
+
+def test_small_chunks_reproduce_the_batch_run(alerts_csv):
+    cache = str(alerts_csv / "klines")
+    batch = analyze_whale_transfers("alerts.csv", cache_dir=cache, offline=True)
+    summary = stream_whale_transfers("alerts.csv", chunksize=7, cache_dir=cache, offline=True,
+                                     out="streamed.csv", horizons_out="streamed_horizons.csv")
+    assert len(batch) == summary['overall']['rows'] == 48
+
+    pd.testing.assert_frame_equal(pd.read_csv("streamed.csv"), pd.read_csv("whale_price_impact.csv"))
+    # horizon rows are grouped by symbol within each chunk, so only the order differs
+    key = ['transfer_id', 'horizon_min', 'metric']
+    pd.testing.assert_frame_equal(pd.read_csv("streamed_horizons.csv").sort_values(key, ignore_index=True),
+                                  pd.read_csv("whale_price_impact_horizons.csv").sort_values(key, ignore_index=True))
+
+    expected = batch.groupby('currency').agg({
+        'price_drop_pct': ['mean', 'min', 'count'],
+        'minutes_until_lowest': 'mean'
+    })
+    pd.testing.assert_frame_equal(summary['currency_stats'], expected, check_dtype=False)
+
+    overall = summary['overall']
+    assert np.isclose(overall['mean_drop'], batch['price_drop_pct'].mean())
+    exact_median = np.quantile(batch['price_drop_pct'], 0.5, method='lower')
+    assert abs(overall['median_drop_approx'] - exact_median) <= 0.01 * abs(exact_median)
+    pd.testing.assert_frame_equal(summary['top_drops'],
+                                  batch.nsmallest(5, 'price_drop_pct').reset_index(drop=True))
+
+
+def test_two_workers_match_one(tmp_path):
+    synthetic_store(tmp_path, [f"{c}USDT" for c in CURRENCIES], days=1)
+    transfers = synthetic_transfers(CURRENCIES, days=1, count=40)
+
+    def run(workers):
+        results, horizon_tables = analyze_chunk(transfers, str(tmp_path), offline=True, max_workers=4,
+                                                window_minutes=15, horizons=DEFAULT_HORIZONS,
+                                                verbose=False, workers=workers)
+        return (pd.concat(results).sort_values('transaction_id').reset_index(drop=True),
+                pd.concat(horizon_tables, ignore_index=True))
+
+    serial, parallel = run(1), run(2)
+    assert len(serial[0]) > 0
+    pd.testing.assert_frame_equal(parallel[0], serial[0])
+    pd.testing.assert_frame_equal(parallel[1], serial[1])
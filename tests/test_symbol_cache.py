@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+from symbol_cache import SymbolInfoCache, parse_symbol_info
+
+
+def symbol(name, step="0.001", tick="0.10"):
+    return {'symbol': name, 'quantityPrecision': 3, 'pricePrecision': 1,
+            'filters': [{'filterType': 'LOT_SIZE', 'stepSize': step},
+                        {'filterType': 'PRICE_FILTER', 'tickSize': tick}]}
+
+
+class FakeClient:
+    def __init__(self, symbols):
+        self.symbols = symbols
+        self.calls = 0
+
+    def exchange_info(self):
+        self.calls += 1
+        return {'symbols': self.symbols}
+
+
+def test_parse_symbol_info():
+    assert parse_symbol_info(symbol('BTCUSDT')) == (3, 1, 0.001, 0.1)
+
+
+def test_hits_are_served_without_a_request():
+    client = FakeClient([symbol('BTCUSDT'), symbol('ETHUSDT', step='0.01')])
+    cache = SymbolInfoCache(client)
+    cache.warm(['BTCUSDT', 'ETHUSDT'])
+    for _ in range(5):
+        assert cache.get('BTCUSDT') == (3, 1, 0.001, 0.1)
+    assert cache.get('ETHUSDT')[2] == 0.01
+    assert client.calls == 1
+    assert cache.stats() == {'hits': 6, 'misses': 0, 'symbols': 2}
+
+
+def test_expired_or_invalidated_entries_refetch():
+    client = FakeClient([symbol('BTCUSDT')])
+    cache = SymbolInfoCache(client, ttl=0)
+    cache.get('BTCUSDT')
+    assert (cache.misses, client.calls) == (1, 1)
+
+    cache = SymbolInfoCache(client)
+    cache.refresh()
+    client.symbols = [symbol('BTCUSDT', step='0.01')]
+    cache.invalidate('BTCUSDT')
+    assert cache.get('BTCUSDT')[2] == 0.01
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_unknown_symbol_raises_after_one_refetch():
+    client = FakeClient([symbol('BTCUSDT')])
+    cache = SymbolInfoCache(client)
+    cache.refresh()
+    with pytest.raises(ValueError):
+        cache.get('NOPEUSDT')
+    assert client.calls == 2
+
+
+def test_counters_are_exact_under_concurrent_lookups():
+    cache = SymbolInfoCache(FakeClient([symbol('BTCUSDT')]))
+    cache.warm(['BTCUSDT'])
+    threads = [threading.Thread(target=lambda: [cache.get('BTCUSDT') for _ in range(2000)]) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.stats()['hits'] == 16000
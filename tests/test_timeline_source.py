@@ -0,0 +1,74 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bench_timeline_source import timeline_page_html
+from timeline_source import HttpTimelineSource, SeenIds, TimelineCursor, parse_timeline_page
+
+ROWS = [{"raw_text": f"🚨 {n},000 #BTC (1 USD) transferred from unknown wallet to #Binance",
+         "timestamp_text": "Jan 1, 2025 · 12:00 PM UTC",
+         "tweet_link": f"https://nitter.net/whale_alert/status/{1900 - n}#m"} for n in range(1, 4)]
+
+
+@pytest.fixture
+def stub():
+    """Stub nitter serving one page with an ETag and answering matching conditional requests with 304."""
+    state = {"page": timeline_page_html(ROWS), "etag": '"v1"', "requests": []}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["requests"].append(dict(self.headers))
+            if self.headers.get("If-None-Match") == state["etag"]:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = state["page"].encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("ETag", state["etag"])
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state["url"] = f"http://127.0.0.1:{server.server_port}/whale_alert"
+    yield state
+    server.shutdown()
+
+
+def test_parse_timeline_page():
+    items, cursor = parse_timeline_page(timeline_page_html(ROWS, next_cursor="abc"))
+    assert [i["id"] for i in items] == ["1899", "1898", "1897"]
+    assert items[0]["text"].startswith("🚨 1,000 #BTC")
+    assert cursor == "?cursor=abc"
+
+
+def test_unchanged_feed_comes_back_304_and_empty(stub):
+    source = HttpTimelineSource(stub["url"])
+    assert len(source.fetch()) == 3
+    assert source.etag == '"v1"'
+    assert source.fetch() == []
+    assert stub["requests"][1]["If-None-Match"] == '"v1"'
+
+    stub["page"] = timeline_page_html(ROWS[:1])
+    stub["etag"] = '"v2"'
+    assert [i["id"] for i in source.fetch()] == ["1899"]
+    assert source.etag == '"v2"'
+    source.close()
+
+
+def test_cursor_primes_on_cold_start_then_returns_new_items_oldest_first(stub):
+    source = HttpTimelineSource(stub["url"])
+    cursor = TimelineCursor(source, SeenIds())
+    stub["page"] = timeline_page_html(ROWS[2:])
+    assert cursor.poll() == []
+
+    stub["page"], stub["etag"] = timeline_page_html(ROWS), '"v2"'
+    assert [i["id"] for i in cursor.poll()] == ["1898", "1899"]
+    assert cursor.poll() == []          # 304
+    source.close()
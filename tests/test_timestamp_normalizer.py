@@ -0,0 +1,23 @@
+import pandas as pd
+
+from timestamp_normalizer import TimestampNormalizer, normalize_timestamp
+
+
+def test_shared_normalizer_keeps_the_detected_format():
+    normalizer = TimestampNormalizer(now="2025-05-07 12:00:00")
+    first = normalize_timestamp("May 7, 2025 · 9:50 AM UTC", normalizer=normalizer)
+    assert first == pd.Timestamp("2025-05-07 09:50", tz="UTC")
+    assert normalizer.format == "%b %d, %Y · %I:%M %p UTC"
+    assert normalize_timestamp("May 7, 2025 · 9:51 AM UTC", normalizer=normalizer) \
+        == pd.Timestamp("2025-05-07 09:51", tz="UTC")
+
+
+def test_relative_text_is_anchored_to_the_normalizers_now():
+    normalizer = TimestampNormalizer(now="2025-05-07 12:00:00")
+    assert normalize_timestamp("5m", normalizer=normalizer) == pd.Timestamp("2025-05-07 11:55", tz="UTC")
+
+
+def test_status_id_wins_over_the_text():
+    link = "https://nitter.net/whale_alert/status/1874436540612350000#m"
+    ts = normalize_timestamp("garbage", link, normalizer=TimestampNormalizer())
+    assert ts is not None and ts.year == 2025
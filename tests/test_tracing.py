@@ -0,0 +1,106 @@
+import importlib
+import json
+import time
+
+import pytest
+
+from tracing import Trace, Tracer
+from timestamp_normalizer import snowflake_ms
+
+TWEET_ID = "1874436540612350000"
+ALERT = "🚨 30,000,000 #XRP (60,000,000 USD) transferred from unknown wallet to #Binance"
+
+
+class OrderClient:
+    def __init__(self):
+        self.orders = []
+
+    def new_order(self, **params):
+        time.sleep(0.002)
+        self.orders.append(params["type"])
+        return {"orderId": len(self.orders), "avgPrice": "2.0", "updateTime": int(time.time() * 1000)}
+
+
+class ReadyStandby:
+    mark_prices = {"XRPUSDT": 2.0}
+
+    def intent(self, symbol):
+        return {"symbol": symbol, "side": "SELL", "type": "MARKET", "quantity": 100.0}
+
+    def mark_open(self, symbol):
+        pass
+
+    def is_open(self, symbol):
+        return False
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)          # the bot opens whale_flow_bot.log on import
+    bot = importlib.import_module("whale_bot_binance01")
+    monkeypatch.setattr(bot, "OPEN_POS", {})
+    monkeypatch.setattr(bot, "tracker", None)
+    monkeypatch.setattr(bot, "standby", ReadyStandby())
+    monkeypatch.setattr(bot, "client", OrderClient())
+    monkeypatch.setattr(bot, "symbol_cache", type("Cache", (), {"get": lambda self, s: (1, 4, 0.1, 0.0001)})())
+    return bot
+
+
+def test_alert_is_traced_from_parse_to_protective_orders(bot, monkeypatch, tmp_path):
+    tracer = Tracer(str(tmp_path / "traces.jsonl"))
+    monkeypatch.setattr(bot, "tracer", tracer)
+    posted = snowflake_ms(TWEET_ID)
+    trace = tracer.start(TWEET_ID, seen_ms=posted + 1500)
+
+    sig = bot.evaluate_signal((ALERT, trace))
+    assert sig[:2] == ("XRPUSDT", bot.PAIR_CFG["XRPUSDT"])
+    assert bot.execute_signal(sig)
+    tracer.close()
+
+    [record] = [json.loads(line) for line in open(tmp_path / "traces.jsonl")]
+    assert record["outcome"] == "ordered" and record["symbol"] == "XRPUSDT" and record["usd"] == 60_000_000
+    lat = record["latency"]
+    assert lat["post_to_seen_ms"] == 1500
+    # stamps are monotonic along the pipeline
+    assert 0 <= lat["seen_to_parsed_ms"] <= lat["seen_to_dispatched_ms"] <= lat["seen_to_entry_ack_ms"]
+    assert lat["seen_to_entry_ack_ms"] < min(lat["seen_to_tp_ack_ms"], lat["seen_to_sl_ack_ms"])
+    assert lat["entry_ms"] >= 2 and lat["protect_ms"] >= 2
+    assert set(record["exchange"]) == {"entry", "tp", "sl"}
+    assert tracer.histograms["entry_ms"].count == 1
+
+
+def test_alert_without_signal_is_counted_and_not_ordered(bot, monkeypatch):
+    tracer = Tracer()
+    monkeypatch.setattr(bot, "tracer", tracer)
+    assert bot.evaluate_signal(("Follow us for more alerts", tracer.start(TWEET_ID))) is None
+    assert tracer.outcomes == {"no_signal": 1}
+    assert bot.client.orders == []
+
+
+def test_prometheus_exposition():
+    tracer = Tracer()
+    for duration_ms in (3, 40, 40):
+        trace = Trace(TWEET_ID)
+        trace.span("entry", trace._t0, trace._t0 + duration_ms / 1000)
+        tracer.finish(trace, "ordered")
+    tracer.finish(Trace(), "no_signal")
+    text = tracer.prometheus()
+    lines = text.splitlines()
+
+    assert text.endswith("\n")
+    assert lines[0] == "# TYPE whale_bot_latency_ms histogram"
+    buckets = [line for line in lines if line.startswith('whale_bot_latency_ms_bucket{stage="entry"')]
+    assert buckets[:6] == [
+        'whale_bot_latency_ms_bucket{stage="entry",le="1"} 0',
+        'whale_bot_latency_ms_bucket{stage="entry",le="2"} 0',
+        'whale_bot_latency_ms_bucket{stage="entry",le="5"} 1',
+        'whale_bot_latency_ms_bucket{stage="entry",le="10"} 1',
+        'whale_bot_latency_ms_bucket{stage="entry",le="20"} 1',
+        'whale_bot_latency_ms_bucket{stage="entry",le="50"} 3',
+    ]
+    assert buckets[-1] == 'whale_bot_latency_ms_bucket{stage="entry",le="+Inf"} 3'
+    assert 'whale_bot_latency_ms_sum{stage="entry"} 83.000' in lines
+    assert 'whale_bot_latency_ms_count{stage="entry"} 3' in lines
+    assert lines.index("# TYPE whale_bot_alerts_total counter") > lines.index(buckets[-1])
+    assert 'whale_bot_alerts_total{outcome="ordered"} 3' in lines
+    assert 'whale_bot_alerts_total{outcome="no_signal"} 1' in lines
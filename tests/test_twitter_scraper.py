@@ -0,0 +1,87 @@
+import importlib
+
+import pytest
+
+from alert_sink import CsvAlertSink
+from bench_timeline_source import timeline_page_html
+
+BASE = "https://nitter.net/whale_alert"
+FIRST_ID = 1874422700000000000
+ID_STEP = 1000 << 22                  # a second apart
+
+
+def row(n):
+    return {"raw_text": f"🚨 {n},000 #BTC ({n},000,000 USD) transferred from unknown wallet to #Binance",
+            "timestamp_text": "Jan 1, 2025 · 12:00 PM UTC",
+            "tweet_link": f"/whale_alert/status/{FIRST_ID + n * ID_STEP}#m"}
+
+
+def timeline(newest, per_page=2):
+    """Pages of the timeline holding tweets ``newest..1``, newest first, keyed by URL."""
+    numbers = list(range(newest, 0, -1))
+    pages = {}
+    for p, i in enumerate(range(0, len(numbers), per_page)):
+        more = f"p{p + 2}" if i + per_page < len(numbers) else None
+        pages[BASE if p == 0 else f"{BASE}?cursor=p{p + 1}"] = timeline_page_html(
+            [row(n) for n in numbers[i:i + per_page]], more)
+    return pages
+
+
+class StubDriver:
+    def __init__(self, pages):
+        self.pages = pages
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+        self.page_source = self.pages[url]
+
+    def find_element(self, *locator):
+        return object()
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def scraper_module(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    module = importlib.import_module("twitter_scraper01")
+    monkeypatch.setattr(module.time, "sleep", lambda s: None)
+    return module
+
+
+def scrape(module, pages, sink):
+    scraper = module.WhaleAlertScraper(extraction="page_source")
+    scraper.driver = StubDriver(pages)
+    return scraper.scrape_tweets(count=100, max_pages=10, sink=sink), scraper.driver.visited
+
+
+def test_second_run_stops_at_stored_history(scraper_module, tmp_path):
+    path = str(tmp_path / "alerts.csv")
+    with CsvAlertSink(path) as sink:
+        stored, visited = scrape(scraper_module, timeline(5), sink)
+    assert stored == 5 and len(visited) == 3
+    assert sink.cursor is None
+
+    # one new alert: page 1 holds it, page 2 is all stored, page 3 is never fetched
+    with CsvAlertSink(path) as sink:
+        stored, visited = scrape(scraper_module, timeline(6), sink)
+    assert stored == 1
+    assert visited == [BASE, f"{BASE}?cursor=p2"]
+    assert sink.rows == 6 and sink.cursor is None
+
+
+def test_page_source_items_skip_pinned_tweets_and_retweets(scraper_module):
+    html = timeline_page_html([row(3), row(2), row(1)])
+    items = html.split('<div class="tweet-body">')
+    html = (items[0] + '<div class="pinned"><span>Pinned Tweet</span></div><div class="tweet-body">' + items[1]
+            + '<div class="retweet-header"><span>whale_alert retweeted</span></div><div class="tweet-body">'
+            + items[2] + '<div class="tweet-body">' + items[3])
+    scraper = scraper_module.WhaleAlertScraper(extraction="page_source")
+    scraper.driver = StubDriver({BASE: html})
+    scraper.driver.get(BASE)
+    page, _ = scraper.extract_page(BASE)
+    records = [scraper.process_item(item) for item in page]
+    assert [r is not None for r in records] == [False, False, True]
+    assert records[2]["amount"] == 1000.0
@@ -0,0 +1,358 @@
+"""Timeline sources for the whale_alert nitter feed.
+
+A timeline source returns the items currently on the feed as a list of dicts
+(``id``, ``text``, ``timestamp_text``, ``link``, ``urls``, ``pinned``,
+``retweet``), newest first; ``urls`` are the hrefs linked from the tweet
+text, which nitter only shows truncated.  ``HttpTimelineSource`` talks plain HTTP to nitter (HTML page or
+RSS) over a keep-alive session with conditional requests; the Selenium source
+is kept as a fallback for when nitter only serves the page to a real browser.
+``TimelineCursor`` sits on top of any source and yields only unseen items.
+"""
+import os
+import re
+import json
+import time
+import logging
+from collections import OrderedDict
+import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+STATUS_ID_RE = re.compile(r'/status/(\d+)')
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0"
+
+
+def status_id(link):
+    """Return the tweet id contained in a nitter status link, or None."""
+    m = STATUS_ID_RE.search(link or "")
+    return m.group(1) if m else None
+
+
+class TimelineHTMLParser(HTMLParser):
+    """Single pass over a nitter timeline page collecting ``.timeline-item`` entries."""
+
+    def __init__(self):
+        super().__init__()
+        self.items = []
+        self._item = None          # item being built
+        self._item_depth = 0       # div depth of the open .timeline-item
+        self._content_depth = 0    # div depth of the open .tweet-content
+        self._depth = 0
+        self._in_date = False
+        self._text = []
+        self.next_cursor = None    # href of the "Load more" link (``?cursor=...``)
+        self._show_more_depth = 0
+        self._more_href = None
+        self._more_text = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+        if tag == "div":
+            self._depth += 1
+            if self._item is None and "show-more" in classes:
+                self._show_more_depth = self._depth
+            elif self._item is None and "timeline-item" in classes:
+                self._item = {"id": attrs.get("data-id"), "text": "", "timestamp_text": None,
+                              "link": None, "urls": [], "pinned": False, "retweet": False}
+                self._item_depth = self._depth
+            elif self._item is not None:
+                if "tweet-content" in classes:
+                    self._content_depth = self._depth
+                    self._text = []
+                elif "pinned" in classes:
+                    self._item["pinned"] = True
+                elif "retweet-header" in classes:
+                    self._item["retweet"] = True
+        elif self._item is not None:
+            if "tweet-date" in classes:
+                self._in_date = True
+            elif tag == "a":
+                if self._content_depth and attrs.get("href"):
+                    self._item["urls"].append(attrs["href"])
+                elif "tweet-link" in classes and not self._item["link"]:
+                    self._item["link"] = attrs.get("href")
+                elif self._in_date and self._item["timestamp_text"] is None:
+                    # .tweet-date a carries the absolute timestamp in its title
+                    self._item["timestamp_text"] = attrs.get("title")
+            elif tag == "br" and self._content_depth:
+                self._text.append("\n")
+        elif self._show_more_depth and tag == "a":
+            self._more_href = attrs.get("href")
+            self._more_text = []
+
+    def handle_endtag(self, tag):
+        if tag == "span":
+            self._in_date = False
+        elif tag == "a" and self._more_href is not None:
+            # "Load newest" also lives in a .show-more div; only "Load more" pages backwards
+            if "".join(self._more_text).strip() == "Load more":
+                self.next_cursor = self._more_href
+            self._more_href = None
+        if tag != "div":
+            return
+        if self._content_depth and self._depth == self._content_depth:
+            self._item["text"] = "".join(self._text).strip()
+            self._content_depth = 0
+        if self._item is not None and self._depth == self._item_depth:
+            item = self._item
+            if not item["id"]:
+                item["id"] = status_id(item["link"])
+            self.items.append(item)
+            self._item = None
+        if self._show_more_depth == self._depth:
+            self._show_more_depth = 0
+        self._depth -= 1
+
+    def handle_data(self, data):
+        if self._content_depth:
+            self._text.append(data)
+        elif self._more_href is not None:
+            self._more_text.append(data)
+
+
+def parse_timeline_html(html):
+    """Parse a nitter timeline page into a list of item dicts, newest first."""
+    return parse_timeline_page(html)[0]
+
+
+def parse_timeline_page(html):
+    """Parse a nitter timeline page into ``(items, next_cursor)``.
+
+    ``next_cursor`` is the raw href of the "Load more" link (usually
+    ``?cursor=...``, relative to the page) or None on the last page.
+    """
+    parser = TimelineHTMLParser()
+    parser.feed(html)
+    parser.close()
+    return parser.items, parser.next_cursor
+
+
+HREF_RE = re.compile(r'href="([^"]+)"')
+
+
+def parse_timeline_rss(xml_text):
+    """Parse a nitter RSS feed into the same item dicts as ``parse_timeline_html``."""
+    root = ET.fromstring(xml_text)
+    items = []
+    for node in root.iter("item"):
+        link = node.findtext("link") or node.findtext("guid")
+        title = node.findtext("title") or ""
+        items.append({
+            "id": status_id(node.findtext("guid")) or status_id(link),
+            "text": title.strip(),
+            "timestamp_text": node.findtext("pubDate"),
+            "link": link,
+            "urls": HREF_RE.findall(node.findtext("description") or ""),
+            "pinned": False,
+            "retweet": title.startswith("RT by "),
+        })
+    return items
+
+
+class HttpTimelineSource:
+    """Poll a nitter timeline (HTML or RSS) with a persistent, conditional HTTP session."""
+
+    name = "http"
+
+    def __init__(self, url, timeout=10, session=None):
+        self.url = url
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers.setdefault("User-Agent", USER_AGENT)
+        self.etag = None
+        self.last_modified = None
+        self.last_fetch_ms = None
+        self.last_parse_ms = None
+
+    def fetch(self):
+        """Return the current timeline items, or [] when the feed is unchanged (HTTP 304)."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        t0 = time.perf_counter()
+        resp = self.session.get(self.url, headers=headers, timeout=self.timeout)
+        t1 = time.perf_counter()
+        self.last_fetch_ms = (t1 - t0) * 1000
+        if resp.status_code == 304:
+            self.last_parse_ms = 0.0
+            return []
+        resp.raise_for_status()
+        self.etag = resp.headers.get("ETag") or self.etag
+        self.last_modified = resp.headers.get("Last-Modified") or self.last_modified
+
+        body = resp.text
+        if "xml" in resp.headers.get("Content-Type", "") or body.lstrip().startswith("<?xml"):
+            items = parse_timeline_rss(body)
+        else:
+            items = parse_timeline_html(body)
+        self.last_parse_ms = (time.perf_counter() - t1) * 1000
+        if not items:
+            # nitter answers rate limits and captchas with a 200 page that has no timeline
+            raise ValueError(f"No timeline items in response from {self.url}")
+        return items
+
+    def close(self):
+        self.session.close()
+
+
+class SeleniumTimelineSource:
+    """Load the timeline in headless Firefox and parse the rendered page source."""
+
+    name = "selenium"
+
+    def __init__(self, url, headless=True, page_load_timeout=30):
+        self.url = url
+        self.headless = headless
+        self.page_load_timeout = page_load_timeout
+        self.driver = None
+        self.last_fetch_ms = None
+        self.last_parse_ms = None
+
+    def start_driver(self):
+        from selenium import webdriver
+        from selenium.webdriver.firefox.options import Options
+        opt = Options()
+        if self.headless:
+            opt.add_argument("--headless")
+        self.driver = webdriver.Firefox(options=opt)
+        self.driver.set_page_load_timeout(self.page_load_timeout)
+
+    def fetch(self):
+        if not self.driver:
+            self.start_driver()
+        t0 = time.perf_counter()
+        self.driver.get(self.url)
+        html = self.driver.page_source
+        t1 = time.perf_counter()
+        items = parse_timeline_html(html)
+        self.last_fetch_ms = (t1 - t0) * 1000
+        self.last_parse_ms = (time.perf_counter() - t1) * 1000
+        return items
+
+    def close(self):
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+
+
+class FallbackTimelineSource:
+    """Use ``primary`` and fall back to ``fallback`` for any poll where it fails."""
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+        self.active = primary
+
+    @property
+    def name(self):
+        return self.active.name
+
+    @property
+    def last_fetch_ms(self):
+        return self.active.last_fetch_ms
+
+    @property
+    def last_parse_ms(self):
+        return self.active.last_parse_ms
+
+    def fetch(self):
+        try:
+            self.active = self.primary
+            return self.primary.fetch()
+        except Exception as e:
+            logger.warning(f"{self.primary.name} timeline fetch failed: {e}. Falling back to {self.fallback.name}")
+            self.active = self.fallback
+            return self.fallback.fetch()
+
+    def close(self):
+        self.primary.close()
+        self.fallback.close()
+
+
+class SeenIds:
+    """Bounded LRU set of tweet ids, optionally persisted to a JSON file."""
+
+    def __init__(self, path=None, maxlen=5000):
+        self.path = path
+        self.maxlen = maxlen
+        self._ids = OrderedDict()
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    for tid in json.load(f)[-maxlen:]:
+                        self._ids[tid] = None
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not load seen ids from {path}: {e}")
+
+    def __contains__(self, tid):
+        return tid in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, tid):
+        self._ids[tid] = None
+        self._ids.move_to_end(tid)
+        while len(self._ids) > self.maxlen:
+            self._ids.popitem(last=False)
+
+    def save(self):
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(list(self._ids), f)
+        os.replace(tmp, self.path)
+
+
+class TimelineCursor:
+    """Walk a timeline source down to the last seen id and return every new item.
+
+    Items come back oldest first so alerts are handled in the order they were
+    posted.  Pinned tweets never act as the stop marker, and on a cold start
+    (no persisted ids) the current page is only recorded, not replayed.
+    """
+
+    def __init__(self, source, seen=None):
+        self.source = source
+        self.seen = seen if seen is not None else SeenIds()
+        self.last_id = None
+
+    def poll(self):
+        items = self.source.fetch()
+        if not items:
+            return []
+
+        cold_start = len(self.seen) == 0
+        new = []
+        for item in items:
+            tid = item["id"]
+            if not tid:
+                continue
+            if tid == self.last_id and not item["pinned"]:
+                break
+            if tid in self.seen:
+                self.seen.add(tid)     # refresh so items still on the page are not evicted
+            else:
+                new.append(item)
+
+        newest = next((i["id"] for i in items if i["id"] and not i["pinned"]), None)
+        self.last_id = newest or self.last_id
+        if not new:
+            return []
+
+        new.reverse()
+        for item in new:
+            self.seen.add(item["id"])
+        self.seen.save()
+        if cold_start:
+            logger.info(f"Timeline cursor primed with {len(new)} existing items")
+            return []
+        return new
@@ -0,0 +1,160 @@
+"""Timestamp normalization for scraped alerts.
+
+Everything comes out timezone-aware in UTC.  When the tweet link is known
+its status id is a Twitter snowflake, whose top bits are the post time in ms
+since the Twitter epoch, so that is used as the exact timestamp.  Otherwise
+the text is parsed: the format that matched last is tried first (a page or
+a CSV column uses one format almost throughout), whole columns are parsed
+with one vectorized ``pd.to_datetime`` per format, and only texts matching
+no absolute format are treated as relative ("5m", "2 hours ago", "May 7").
+"""
+import re
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from timeline_source import STATUS_ID_RE
+
+TWITTER_EPOCH_MS = 1288834974657
+MIN_SNOWFLAKE = 1 << 32         # older ids are sequential, not snowflakes
+
+FORMATS = (
+    "%b %d, %Y · %I:%M %p UTC",      # nitter title: 'May 7, 2025 · 9:50 AM UTC'
+    "%Y-%m-%d %H:%M:%S",             # our own CSV column
+    "%a, %d %b %Y %H:%M:%S GMT",     # nitter RSS pubDate
+    "%d %b %Y, %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%Y-%m-%d %H:%M:%S%z",
+)
+
+RELATIVE_RE = re.compile(
+    r"^\s*(\d+)\s*(s|m|h|d|sec|secs|seconds?|min|mins|minutes?|hours?|days?)(?:\s+ago)?\s*$", re.I)
+RELATIVE_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+
+def snowflake_ms(tweet_id):
+    """Post time (ms since the Unix epoch) encoded in a tweet id, or None."""
+    try:
+        tid = int(tweet_id)
+    except (TypeError, ValueError):
+        return None
+    if tid < MIN_SNOWFLAKE:
+        return None
+    return (tid >> 22) + TWITTER_EPOCH_MS
+
+
+def snowflake_times(links):
+    """UTC timestamps from the status ids in a Series of tweet links (NaT where there is none)."""
+    ids = pd.Series(links, dtype=object).str.extract(STATUS_ID_RE, expand=False)
+    ms = np.full(len(ids), np.iinfo(np.int64).min, dtype=np.int64)      # NaT
+    has_id = ids.notna().to_numpy()
+    # parse as uint64: ids are above 2**53 and would not survive float64
+    tid = np.array([int(x) for x in ids[has_id]], dtype=np.uint64)
+    ok = tid >= MIN_SNOWFLAKE
+    sel = np.flatnonzero(has_id)[ok]
+    ms[sel] = (tid[ok] >> np.uint64(22)).astype(np.int64) + TWITTER_EPOCH_MS
+    return pd.Series(pd.to_datetime(ms, unit="ms", utc=True), index=ids.index)
+
+
+class TimestampNormalizer:
+    """Parse timestamp texts to UTC, remembering the last format that matched.
+
+    ``now`` anchors relative texts; it defaults to the current UTC time at
+    construction, so one normalizer should cover one page or one batch.
+    """
+
+    def __init__(self, now=None, formats=FORMATS):
+        self.now = pd.Timestamp(now or datetime.now(timezone.utc))
+        if self.now.tzinfo is None:
+            self.now = self.now.tz_localize("UTC")
+        self.formats = list(formats)
+        self.format = None
+
+    def detect(self, text):
+        """The first known format that parses ``text``; cached for the next call."""
+        candidates = [self.format] + self.formats if self.format else self.formats
+        for fmt in candidates:
+            try:
+                datetime.strptime(text.strip(), fmt)
+            except ValueError:
+                continue
+            self.format = fmt
+            return fmt
+        return None
+
+    def relative(self, text):
+        """'5m', '2 hours ago', or a year-less 'May 7' relative to ``now``; None otherwise."""
+        m = RELATIVE_RE.match(text)
+        if m:
+            unit = RELATIVE_UNITS[m.group(2)[0].lower()]
+            return self.now - timedelta(**{unit: int(m.group(1))})
+        try:
+            day = datetime.strptime(text.strip(), "%b %d").replace(year=self.now.year, tzinfo=timezone.utc)
+        except ValueError:
+            return None
+        day = pd.Timestamp(day)
+        return day if day <= self.now else day.replace(year=self.now.year - 1)
+
+    def parse(self, text):
+        """One timestamp text to a UTC ``pd.Timestamp``, or None."""
+        if not isinstance(text, str) or not text.strip():
+            return None
+        fmt = self.detect(text)
+        if fmt is None:
+            return self.relative(text)
+        ts = pd.Timestamp(datetime.strptime(text.strip(), fmt))
+        return ts.tz_convert("UTC") if ts.tzinfo else ts.tz_localize("UTC")
+
+    def parse_series(self, texts):
+        """Vectorized ``parse`` over a Series; unparsable texts become NaT."""
+        texts = pd.Series(texts, dtype=object).str.strip()
+        out = pd.Series(pd.NaT, index=texts.index, dtype="datetime64[ns, UTC]")
+        todo = texts.notna() & (texts != "")
+        while todo.any():
+            fmt = self.detect(texts[todo].iloc[0])
+            if fmt is None:
+                break
+            parsed = pd.to_datetime(texts[todo], format=fmt, errors="coerce", utc=True)
+            out[parsed.index] = parsed
+            todo &= out.isna()
+            if parsed.isna().all():
+                break
+        # rare leftovers: other formats mixed in, or relative texts
+        for idx in texts.index[todo]:
+            ts = self.parse(texts[idx])
+            if ts is not None:
+                out[idx] = ts
+        return out
+
+
+def normalize_timestamps(texts, links=None, now=None):
+    """UTC timestamps for a column of texts, exact from the tweet id where a link is given."""
+    parsed = TimestampNormalizer(now).parse_series(texts)
+    if links is None:
+        return parsed
+    exact = snowflake_times(pd.Series(links, index=parsed.index, dtype=object))
+    return exact.fillna(parsed)
+
+
+def normalize_timestamp(text, link=None, now=None, normalizer=None):
+    """Single-value ``normalize_timestamps``; returns a UTC ``pd.Timestamp`` or None.
+
+    Pass the page's ``normalizer`` when calling this per tweet, so the
+    detected format is reused instead of re-detected for every text.
+    """
+    m = STATUS_ID_RE.search(link or "")
+    ms = snowflake_ms(m.group(1)) if m else None
+    if ms is not None:
+        return pd.Timestamp(ms, unit="ms", tz="UTC")
+    return (normalizer or TimestampNormalizer(now)).parse(text)
+
+
+def to_utc(values):
+    """Parse an already normalized column (ISO strings, naive = UTC) to UTC timestamps."""
+    return pd.to_datetime(values, utc=True, format="ISO8601")
+
+
+def format_utc(ts):
+    """How normalized timestamps are written to CSV: '2025-05-07 09:50:16.824+00:00'."""
+    return None if ts is None or pd.isna(ts) else ts.isoformat(sep=" ", timespec="milliseconds")
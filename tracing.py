@@ -0,0 +1,259 @@
+"""Per-signal latency traces for the whale flow bot.
+
+A ``Trace`` follows one alert from the moment the poller sees it to the
+protective orders.  Stages are stamped with ``time.perf_counter`` (monotonic)
+relative to the moment the alert was seen; the wall clock is read once, at
+that moment, to line the trace up with the two clocks we do not control:
+
+    posted_ms    tweet post time from the status-id snowflake
+    exchange     ``updateTime`` of each order ack from Binance
+
+``Tracer.finish`` turns a trace into a flat dict of latencies (ms), appends it
+to a JSONL file and folds it into fixed-bucket histograms plus a bounded
+window for percentiles.  A trace costs a few perf_counter calls and one
+buffered line write, cheap enough to leave on.  ``Tracer.serve(port)`` exposes
+the histograms in the Prometheus text format; the CLI summarises a JSONL file:
+
+    python tracing.py whale_flow_traces.jsonl
+"""
+import json
+import time
+import argparse
+import logging
+import threading
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from timestamp_normalizer import snowflake_ms
+
+logger = logging.getLogger(__name__)
+
+# upper bucket bounds (ms); the tweet -> bot leg is seconds to minutes
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1_000, 2_000, 5_000, 10_000,
+              30_000, 60_000, 120_000, 300_000, 600_000)
+PERCENTILES = (50, 90, 99)
+
+
+class Trace:
+    """Stage stamps of one alert; all offsets are ms after the alert was seen."""
+
+    __slots__ = ("id", "posted_ms", "seen_ms", "_t0", "marks", "spans", "exchange", "attrs", "outcome")
+
+    def __init__(self, tweet_id=None, seen_ms=None):
+        self._t0 = time.perf_counter()
+        self.id = tweet_id
+        self.posted_ms = snowflake_ms(tweet_id)
+        self.seen_ms = seen_ms if seen_ms is not None else time.time() * 1000
+        self.marks = {}
+        self.spans = {}
+        self.exchange = {}
+        self.attrs = {}
+        self.outcome = None
+
+    def now(self):
+        return (time.perf_counter() - self._t0) * 1000
+
+    def mark(self, name):
+        """Stamp a point in the pipeline (first stamp wins)."""
+        self.marks.setdefault(name, self.now())
+
+    def span(self, name, start, end):
+        """Record a stage that ran from perf_counter ``start`` to ``end``."""
+        self.spans[name] = ((start - self._t0) * 1000, (end - start) * 1000)
+
+    def ack(self, name, response):
+        """Stamp an order ack and keep the exchange's own time of it."""
+        self.mark(f"{name}_ack")
+        if response and response.get("updateTime"):
+            self.exchange[name] = int(response["updateTime"])
+
+    def latencies(self):
+        """Flat ``{metric: ms}`` view of the trace."""
+        out = {f"{name}_ms": dur for name, (_, dur) in self.spans.items()}
+        marks = self.marks
+        for name, at in marks.items():
+            out[f"seen_to_{name}_ms"] = at
+        if self.posted_ms is not None:
+            out["post_to_seen_ms"] = self.seen_ms - self.posted_ms
+            for name, at in marks.items():
+                if name.endswith("_ack"):
+                    out[f"post_to_{name}_ms"] = self.seen_ms - self.posted_ms + at
+            for name, at in self.exchange.items():
+                out[f"post_to_{name}_exchange_ms"] = at - self.posted_ms
+        if "parsed" in marks and "dispatched" in marks:
+            out["queue_ms"] = marks["dispatched"] - marks["parsed"]
+        return out
+
+    def to_dict(self):
+        return {"id": self.id, "posted_ms": self.posted_ms, "seen_ms": round(self.seen_ms, 3),
+                "outcome": self.outcome, **self.attrs,
+                "marks": {k: round(v, 3) for k, v in self.marks.items()},
+                "spans": {k: [round(s, 3), round(d, 3)] for k, (s, d) in self.spans.items()},
+                "exchange": self.exchange,
+                "latency": {k: round(v, 3) for k, v in self.latencies().items()}}
+
+
+class Histogram:
+    """Fixed-bucket counts plus a bounded window of raw values for percentiles."""
+
+    def __init__(self, buckets=BUCKETS_MS, window=4096):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)     # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def add(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def percentiles(self, qs=PERCENTILES):
+        if not self.recent:
+            return {q: None for q in qs}
+        return dict(zip(qs, np.percentile(np.fromiter(self.recent, float), qs)))
+
+
+class Tracer:
+    """Collect finished traces: JSONL export, histograms and a Prometheus endpoint."""
+
+    def __init__(self, path=None, window=4096):
+        self.path = path
+        self.window = window
+        self.histograms = {}
+        self.outcomes = {}
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8") if path else None
+        self._server = None
+
+    def start(self, tweet_id=None, seen_ms=None):
+        return Trace(tweet_id, seen_ms)
+
+    def finish(self, trace, outcome=None):
+        if outcome is not None:
+            trace.outcome = outcome
+        record = trace.to_dict()
+        with self._lock:
+            self.outcomes[trace.outcome] = self.outcomes.get(trace.outcome, 0) + 1
+            for name, value in record["latency"].items():
+                hist = self.histograms.get(name)
+                if hist is None:
+                    hist = self.histograms[name] = Histogram(window=self.window)
+                hist.add(value)
+            if self._file:
+                self._file.write(json.dumps(record) + "\n")
+                self._file.flush()
+        return record
+
+    def summary(self):
+        """``{metric: {count, mean, p50, p90, p99, max}}`` over the recent window."""
+        with self._lock:
+            return {name: summarize(list(h.recent), h.count) for name, h in sorted(self.histograms.items())}
+
+    def prometheus(self, prefix="whale_bot"):
+        """Histograms and outcome counters in the Prometheus text exposition format."""
+        lines = [f"# TYPE {prefix}_latency_ms histogram"]
+        with self._lock:
+            for name, h in sorted(self.histograms.items()):
+                metric = name[:-3] if name.endswith("_ms") else name
+                cumulative = 0
+                for bound, n in zip(h.buckets, h.counts):
+                    cumulative += n
+                    lines.append(f'{prefix}_latency_ms_bucket{{stage="{metric}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_latency_ms_bucket{{stage="{metric}",le="+Inf"}} {h.count}')
+                lines.append(f'{prefix}_latency_ms_sum{{stage="{metric}"}} {h.sum:.3f}')
+                lines.append(f'{prefix}_latency_ms_count{{stage="{metric}"}} {h.count}')
+            lines.append(f"# TYPE {prefix}_alerts_total counter")
+            for outcome, n in sorted(self.outcomes.items(), key=lambda kv: str(kv[0])):
+                lines.append(f'{prefix}_alerts_total{{outcome="{outcome}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve ``prometheus()`` on http://host:port/metrics from a daemon thread."""
+        tracer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = tracer.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+        logger.info(f"Trace metrics on http://{host}:{self._server.server_port}/metrics")
+        return self._server.server_port
+
+    def close(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+def summarize(values, count=None):
+    values = np.asarray(values, dtype=float)
+    if not len(values):
+        return {"count": count or 0}
+    pct = np.percentile(values, PERCENTILES)
+    return {"count": count if count is not None else len(values), "mean": values.mean(),
+            **{f"p{q}": v for q, v in zip(PERCENTILES, pct)}, "max": values.max()}
+
+
+def load_traces(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("path", nargs="?", default="whale_flow_traces.jsonl")
+    ap.add_argument("--outcome", help="only traces with this outcome (e.g. ordered)")
+    ap.add_argument("--histogram", metavar="METRIC", help="print bucket counts for one metric")
+    args = ap.parse_args()
+
+    traces = load_traces(args.path)
+    if args.outcome:
+        traces = [t for t in traces if t.get("outcome") == args.outcome]
+    outcomes = {}
+    for t in traces:
+        outcomes[t.get("outcome")] = outcomes.get(t.get("outcome"), 0) + 1
+    print(f"{len(traces)} traces: " + ", ".join(f"{k}={v}" for k, v in outcomes.items()))
+
+    metrics = {}
+    for t in traces:
+        for name, value in t["latency"].items():
+            metrics.setdefault(name, []).append(value)
+    print(f"{'metric':<34}{'count':>7}{'mean':>11}{'p50':>11}{'p90':>11}{'p99':>11}{'max':>11}")
+    for name in sorted(metrics):
+        s = summarize(metrics[name])
+        print(f"{name:<34}{s['count']:>7}" + "".join(f"{s[k]:>11.1f}" for k in ("mean", "p50", "p90", "p99", "max")))
+
+    if args.histogram:
+        hist = Histogram()
+        for value in metrics.get(args.histogram, []):
+            hist.add(value)
+        print(f"\n{args.histogram}")
+        bounds = [f"<= {b}" for b in hist.buckets] + ["> " + str(hist.buckets[-1])]
+        peak = max(hist.counts) or 1
+        for label, n in zip(bounds, hist.counts):
+            print(f"{label:>12} {n:>6} {'#' * round(40 * n / peak)}")
+
+
+if __name__ == "__main__":
+    main()
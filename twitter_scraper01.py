@@ -1,15 +1,21 @@
 import time
-import re
 import logging
 import pandas as pd
 import os
-from datetime import datetime
+import json
+from urllib.parse import urljoin
 from selenium import webdriver
 from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+
+from alert_parser import parse_alert
+from alert_sink import CsvAlertSink
+from entity_registry import REGISTRY
+from timeline_source import parse_timeline_page
+from timestamp_normalizer import TimestampNormalizer, format_utc, normalize_timestamp
 
 # Set up logging
 logging.basicConfig(
@@ -22,8 +28,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger()
 
+TRANSACTION_INDICATORS = ["🚨", "🔓", "🔒", "🔥", "#BTC", "#ETH", "#USDT", "#USDC", "#XRP"]
+
+# Everything scrape_tweets needs from a page in one WebDriver round trip
+EXTRACT_PAGE_JS = """
+const items = [];
+for (const el of document.querySelectorAll('.timeline-item')) {
+    const content = el.querySelector('.tweet-content');
+    const date = el.querySelector('.tweet-date a');
+    const link = el.querySelector('.tweet-link');
+    items.push({
+        id: el.getAttribute('data-id'),
+        pinned: el.querySelector('div.pinned') !== null,
+        retweet: el.querySelector('div.retweet-header') !== null,
+        text: content ? content.innerText : null,
+        timestamp_text: date ? (date.getAttribute('title') || date.innerText) : null,
+        link: link ? link.href : null,
+    });
+}
+let next = null;
+for (const a of document.querySelectorAll('.show-more a')) {
+    if (a.innerText.trim() === 'Load more') { next = a.href; break; }
+}
+return JSON.stringify({items: items, next: next});
+"""
+
 class WhaleAlertScraper:
-    def __init__(self, headless=True, wait_time=10):
+    def __init__(self, headless=True, wait_time=10, extraction="script"):
         self.options = Options()
         if headless:
             self.options.add_argument("--headless")
@@ -32,6 +63,11 @@ class WhaleAlertScraper:
         self.driver = None
         self.base_url = "https://nitter.net/whale_alert"
         self.wait_time = wait_time  # Default wait time in seconds
+        # "script": one execute_script per page, "page_source": parse the HTML,
+        # "elements": the old per-element WebDriver calls
+        self.extraction = extraction
+        # reset per page in scrape_tweets so the detected timestamp format is reused page-wide
+        self.normalizer = TimestampNormalizer()
         
     def start_driver(self):
         """Start the Firefox driver with geckodriver."""
@@ -45,108 +81,17 @@ class WhaleAlertScraper:
             
     def parse_tweet_text(self, text):
         """Parse the tweet text to extract transaction details."""
-        # Regular expression patterns to extract information
-        amount_pattern = r'([\d,]+(?:\.\d+)?)\s+#([A-Za-z0-9]+)'
-        usd_pattern = r'$$([\d,]+(?:\.\d+)?)\s+USD$$'
-        from_to_pattern = r'from\s+#([A-Za-z0-9]+)\s+to\s+#([A-Za-z0-9]+)'
-        unknown_wallet_pattern = r'(from|to)\s+(unknown wallet)'
-        from_pattern = r'from\s+([A-Za-z0-9 ]+)\s+to'
-        to_pattern = r'to\s+([A-Za-z0-9 ]+)'
-        
-        # Extract the cryptocurrency amount and symbol
-        amount_matches = re.findall(amount_pattern, text)
-        if not amount_matches:
+        parsed = parse_alert(text)
+        if not parsed:
             logger.warning(f"Could not extract amount from tweet: {text[:100]}...")
-            return None
-            
-        amount, currency = amount_matches[0]
-        amount = float(amount.replace(',', ''))
-        
-        # Extract USD value
-        usd_match = re.search(usd_pattern, text)
-        usd_value = float(usd_match.group(1).replace(',', '')) if usd_match else None
-        
-        # Extract from/to information
-        from_entity = "unknown"
-        to_entity = "unknown"
-        
-        # Check for exchange to exchange transfers
-        from_to_match = re.search(from_to_pattern, text)
-        if from_to_match:
-            from_entity = from_to_match.group(1)
-            to_entity = from_to_match.group(2)
-        else:
-            # Check for unknown wallet transfers
-            unknown_match = re.search(unknown_wallet_pattern, text)
-            if unknown_match:
-                direction = unknown_match.group(1)
-                if direction == "from":
-                    from_entity = "unknown wallet"
-                    # Try to find the destination
-                    to_match = re.search(r'to\s+#([A-Za-z0-9]+)', text)
-                    if to_match:
-                        to_entity = to_match.group(1)
-                else:  # direction == "to"
-                    to_entity = "unknown wallet"
-                    # Try to find the source
-                    from_match = re.search(r'from\s+#([A-Za-z0-9]+)', text)
-                    if from_match:
-                        from_entity = from_match.group(1)
-            else:
-                from_match = re.search(from_pattern, text)
-                if from_match:
-                    from_entity = from_match.group(1).strip()
-                    if from_entity.endswith('#'):
-                        from_entity = from_entity[:-1].strip()
-                
-                to_match = re.search(to_pattern, text)
-                if to_match:
-                    to_entity = to_match.group(1).strip()
-                    if to_entity.endswith('#'):
-                        to_entity = to_entity[:-1].strip()
-        
-        return {
-            "amount": amount,
-            "currency": currency,
-            "usd_value": usd_value,
-            "from_entity": from_entity,
-            "to_entity": to_entity,
-            "raw_text": text
-        }
+        return parsed
     
-    def format_timestamp(self, timestamp_text):
-        try:
-            return datetime.strptime(timestamp_text, "%d %b %Y, %H:%M:%S")
-        except ValueError:
-            try:
-                if "·" in timestamp_text:
-                    parts = timestamp_text.split("·")
-                    date_part = parts[0].strip()
-                    time_part = parts[1].strip().replace(" UTC", "")
-                    
-                    combined = f"{date_part} {time_part}"
-                    return pd.to_datetime(combined)
-                
-                # Try to parse relative timestamps like "2 hours ago"
-                elif "ago" in timestamp_text or "m" in timestamp_text or "h" in timestamp_text:
-                    # Rough estimate based on the text
-                    now = datetime.now()
-                    if "minute" in timestamp_text or "m" in timestamp_text:
-                        minutes = int(re.search(r'(\d+)', timestamp_text).group(1))
-                        return now - pd.Timedelta(minutes=minutes)
-                    elif "hour" in timestamp_text or "h" in timestamp_text:
-                        hours = int(re.search(r'(\d+)', timestamp_text).group(1))
-                        return now - pd.Timedelta(hours=hours)
-                    elif "day" in timestamp_text:
-                        days = int(re.search(r'(\d+)', timestamp_text).group(1))
-                        return now - pd.Timedelta(days=days)
-                    else:
-                        return now
-                else:
-                    return pd.to_datetime(timestamp_text)
-            except Exception as e:
-                logger.warning(f"Could not parse timestamp: {timestamp_text}. Error: {e}")
-                return None
+    def format_timestamp(self, timestamp_text, tweet_link=None):
+        """UTC timestamp of a tweet: exact from the id in ``tweet_link`` if given, else parsed."""
+        ts = normalize_timestamp(timestamp_text, tweet_link, normalizer=self.normalizer)
+        if ts is None:
+            logger.warning(f"Could not parse timestamp: {timestamp_text}")
+        return ts
     
     def get_tweet_timestamp(self, tweet_element):
         try:
@@ -183,7 +128,7 @@ class WhaleAlertScraper:
                 logger.warning("Tweet content not found, skipping")
                 return None
             
-            timestamp_text, formatted_timestamp = self.get_tweet_timestamp(tweet)
+            timestamp_text, _ = self.get_tweet_timestamp(tweet)
             
             try:
                 tweet_link_element = tweet.find_element(By.CSS_SELECTOR, ".tweet-link")
@@ -192,37 +137,84 @@ class WhaleAlertScraper:
                 tweet_link = None
                 logger.warning("Tweet link not found")
             
-            transaction_indicators = ["🚨", "🔓", "🔒", "🔥", "#BTC", "#ETH", "#USDT", "#USDC", "#XRP"]
-            is_transaction = any(indicator in tweet_text for indicator in transaction_indicators)
-            
-            if not is_transaction:
-                logger.info(f"Skipping non-transaction tweet: {tweet_text[:50]}...")
-                return None
-            
-            parsed_data = self.parse_tweet_text(tweet_text)
-            
-            if parsed_data:
-                # Add the timestamp and URL
-                parsed_data["timestamp_text"] = timestamp_text
-                parsed_data["timestamp"] = formatted_timestamp
-                parsed_data["tweet_link"] = tweet_link
-                
-                return parsed_data
+            return self.build_record(tweet_text, timestamp_text, tweet_link)
             
+        except Exception as e:
+            logger.error(f"Error processing tweet: {e}")
+            return None
+    
+    def build_record(self, tweet_text, timestamp_text, tweet_link):
+        """Parse an alert and attach its timestamp and link; None for non-transaction tweets."""
+        is_transaction = any(indicator in tweet_text for indicator in TRANSACTION_INDICATORS)
+        
+        if not is_transaction:
+            logger.info(f"Skipping non-transaction tweet: {tweet_text[:50]}...")
             return None
+        
+        parsed_data = self.parse_tweet_text(tweet_text)
+        
+        if parsed_data:
+            # Add the timestamp and URL
+            parsed_data["timestamp_text"] = timestamp_text
+            parsed_data["timestamp"] = format_utc(self.format_timestamp(timestamp_text, tweet_link))
+            parsed_data["tweet_link"] = tweet_link
+            # entity type codes (entity_registry.ENTITY_TYPES) so filters are integer compares
+            parsed_data["from_type"] = REGISTRY.type_code(parsed_data["from_entity"])
+            parsed_data["to_type"] = REGISTRY.type_code(parsed_data["to_entity"])
             
+            return parsed_data
+        
+        return None
+    
+    def process_item(self, item):
+        """Like process_tweet, for an item dict from extract_page (no WebDriver calls)."""
+        try:
+            # both extract_page paths flag these, like timeline_source.TimelineHTMLParser
+            if item.get("pinned") or item.get("retweet"):
+                return None
+            if not item.get("text"):
+                logger.warning("Tweet content not found, skipping")
+                return None
+            if not item.get("link"):
+                logger.warning("Tweet link not found")
+            return self.build_record(item["text"], item.get("timestamp_text"), item.get("link"))
         except Exception as e:
             logger.error(f"Error processing tweet: {e}")
             return None
     
-    def scrape_tweets(self, count=100, max_pages=10):
-       
+    def extract_page(self, page_url):
+        """Return ``(items, next_url)`` for the loaded page in a single WebDriver round trip."""
+        if self.extraction == "script":
+            try:
+                page = json.loads(self.driver.execute_script(EXTRACT_PAGE_JS))
+                return page["items"], page["next"]
+            except Exception as e:
+                logger.warning(f"Bulk extraction script failed ({e}), parsing page source instead")
+        items, next_href = parse_timeline_page(self.driver.page_source)
+        for item in items:
+            if item["link"]:
+                item["link"] = urljoin(page_url, item["link"])
+        return items, urljoin(page_url, next_href) if next_href else None
+    
+    def scrape_tweets(self, count=100, max_pages=10, sink=None):
+        """Scrape up to ``count`` alerts.
+
+        Without a ``sink`` the alerts are collected and returned.  With one
+        (see alert_sink.CsvAlertSink) every page is handed to it as soon as it
+        is processed, scraping resumes from the sink's saved cursor, and only
+        the number of newly stored alerts is returned.  Pagination stops at
+        the first page whose alerts are all stored already.  The cursor is
+        only kept when the run is interrupted; a run that reaches ``count``,
+        ``max_pages``, stored history or the end of the timeline clears it.
+        """
         if not self.driver:
             self.start_driver()
             
         tweets_data = []
+        collected = 0
         current_page = 1
-        current_url = self.base_url
+        current_url = sink.cursor if sink is not None and sink.cursor else self.base_url
+        finished = False
         
         try:
             logger.info(f"Starting to scrape up to {count} tweets...")
@@ -234,59 +226,79 @@ class WhaleAlertScraper:
             wait = WebDriverWait(self.driver, self.wait_time)
             wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".timeline-item")))
             
-            while len(tweets_data) < count and current_page <= max_pages:
+            while collected < count and current_page <= max_pages:
                 logger.info(f"Processing page {current_page}...")
+                # one normalizer per page: the format detected on its first tweet is reused for the rest
+                self.normalizer = TimestampNormalizer()
                 
-                tweets = self.driver.find_elements(By.CSS_SELECTOR, ".timeline-item")
-                
-                valid_tweets = []
-                for t in tweets:
-                    try:
-                        class_attr = t.get_attribute("class")
-                        if class_attr == "timeline-item ":
-                            valid_tweets.append(t)
-                    except:
-                        continue
+                if self.extraction == "elements":
+                    tweets = self.driver.find_elements(By.CSS_SELECTOR, ".timeline-item")
+                    
+                    valid_tweets = []
+                    for t in tweets:
+                        try:
+                            class_attr = t.get_attribute("class")
+                            if class_attr == "timeline-item ":
+                                valid_tweets.append(t)
+                        except:
+                            continue
+                    process = self.process_tweet
+                else:
+                    valid_tweets, next_url = self.extract_page(current_url)
+                    process = self.process_item
                 
                 logger.info(f"Found {len(valid_tweets)} tweets on page {current_page}")
                 
                 # Process tweets on this page
+                page_data = []
+                page_complete = True
                 for i, tweet in enumerate(valid_tweets):
-                    if len(tweets_data) >= count:
+                    if collected + len(page_data) >= count:
+                        page_complete = False
                         break
                         
                     try:
                         # Process the tweet
-                        parsed_data = self.process_tweet(tweet)
+                        parsed_data = process(tweet)
                         
                         if parsed_data:
-                            tweets_data.append(parsed_data)
-                            logger.info(f"Processed tweet {len(tweets_data)}/{count}: {parsed_data['raw_text'][:50]}...")
+                            page_data.append(parsed_data)
+                            logger.info(f"Processed tweet {collected + len(page_data)}/{count}: {parsed_data['raw_text'][:50]}...")
                     except Exception as e:
                         logger.error(f"Error processing tweet on page {current_page}: {e}")
                 
+                if self.extraction == "elements":
+                    next_url = self.find_next_page_url()
+                if sink is not None:
+                    # a page cut short by ``count`` must be revisited on resume
+                    written = sink.write_page(page_data, next_url if page_complete else None)
+                    collected += written
+                    logger.info(f"Stored {written} new tweets from page {current_page} ({sink.rows} total)")
+                    if page_data and not written:
+                        # everything from here on is already stored
+                        logger.info(f"Page {current_page} had no new tweets, caught up with {sink.path}")
+                        finished = True
+                        break
+                else:
+                    tweets_data.extend(page_data)
+                    collected += len(page_data)
+                
                 # Check if we have enough tweets
-                if len(tweets_data) >= count:
+                if collected >= count:
                     logger.info(f"Reached the requested count of {count} tweets")
+                    finished = True
+                    break
+                
+                if not next_url:
+                    logger.warning("No 'Load more' button found, ending pagination")
+                    finished = True
+                    break
+                
+                if current_page == max_pages:
+                    finished = True
                     break
                 
-                # Look for the "Load more" button
                 try:
-                    load_more_elements = self.driver.find_elements(By.CSS_SELECTOR, ".show-more a")
-                    
-                    load_more_link = None
-                    for element in load_more_elements:
-                        if element.text == "Load more":
-                            load_more_link = element
-                            break
-                    
-                    if not load_more_link:
-                        logger.warning("No 'Load more' button found, ending pagination")
-                        break
-                    
-                    next_url = load_more_link.get_attribute("href")
-                    logger.info(f"Found 'Load more' button linking to: {next_url}")
-                    
                     # Navigate to the next page
                     self.driver.get(next_url)
                     current_url = next_url
@@ -296,9 +308,6 @@ class WhaleAlertScraper:
                     time.sleep(3)
                     wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".timeline-item")))
                     
-                except NoSuchElementException:
-                    logger.warning("No 'Load more' button found, ending pagination")
-                    break
                 except Exception as e:
                     logger.error(f"Error while navigating to next page: {e}")
                     break
@@ -306,7 +315,21 @@ class WhaleAlertScraper:
         except Exception as e:
             logger.error(f"Error during scraping: {e}")
         
-        return tweets_data
+        if finished and sink is not None:
+            sink.clear_cursor()
+        return tweets_data if sink is None else collected
+
+    def find_next_page_url(self):
+        """Return the href of the "Load more" link on the current page, or None."""
+        try:
+            for element in self.driver.find_elements(By.CSS_SELECTOR, ".show-more a"):
+                if element.text == "Load more":
+                    next_url = element.get_attribute("href")
+                    logger.info(f"Found 'Load more' button linking to: {next_url}")
+                    return next_url
+        except Exception as e:
+            logger.error(f"Error looking for the 'Load more' button: {e}")
+        return None
         
     def save_to_csv(self, tweets_data, filename="whale_alert_data.csv"):
         """Save the scraped data to a CSV file."""
@@ -341,21 +364,22 @@ class WhaleAlertScraper:
 def main():
     # Create the scraper
     scraper = WhaleAlertScraper(headless=False, wait_time=15)  # Set to True for headless mode
+    sink = CsvAlertSink("whale_alert_data.csv")
     
     try:
-        # Scrape 100 tweets
-        tweets_data = scraper.scrape_tweets(count=2000, max_pages=100)
+        # Scrape up to 2000 new tweets, appending each page to the CSV as it is done
+        stored = scraper.scrape_tweets(count=2000, max_pages=100, sink=sink)
+        sink.close()
         
-        # Save the data
-        if tweets_data:
-            df = scraper.save_to_csv(tweets_data)
+        if stored:
+            df = pd.read_csv(sink.path)
             
             try:
-                scraper.save_to_excel(tweets_data)
+                scraper.save_to_excel(df.to_dict("records"))
             except Exception as e:
                 logger.error(f"Error saving to Excel: {e}")
             
-            logger.info(f"Successfully scraped {len(tweets_data)} tweets")
+            logger.info(f"Successfully scraped {stored} new tweets ({len(df)} stored)")
             
             # Display some basic analysis
             print("\nCurrencies mentioned:")
@@ -375,6 +399,7 @@ def main():
     
     finally:
         # Clean up
+        sink.close()
         scraper.close_driver()
 
 
@@ -1,34 +1,41 @@
-import os, re, time, math, logging
-from datetime import datetime, timezone
-from decimal import Decimal
-from typing import Dict, Any
-
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.common.by import By
+import time, asyncio, logging, threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 from binance.um_futures import UMFutures
 from binance.error       import ClientError
 
+from alert_ingest   import MultiSourceIngest, JsonFeedSource, WebhookSource, mirror_sources
+from alert_parser   import parse_alert
+from async_core     import WhaleBotCore
+from order_intents  import HotStandby, StageTimer, fit_to_filters, position_qty
+from position_tracker import PositionTracker, UserDataStream
+from strategy       import (PAIR_CFG, MIN_NOTIONAL_USD, ACCOUNT_RISK, TRADE_EXCHANGES,
+                            signal_info, signal_symbol, protective_prices)
+from symbol_cache   import SymbolInfoCache, FILTER_ERROR_CODES
+from timeline_source import (HttpTimelineSource, SeleniumTimelineSource, FallbackTimelineSource,
+                             TimelineCursor, SeenIds)
+from tracing        import Tracer
+
 API_KEY    = "YOUR_BINANCE_API_KEY"
 API_SECRET = "YOUR_BINANCE_SECRET"
 
-MIN_NOTIONAL_USD = 50_000_000      
-ACCOUNT_RISK     = 0.050           # risk ≤50% equity per trade
 CHECK_INTERVAL   = 10             
+SYMBOL_CACHE_TTL = 3600            # exchangeInfo refresh period (s)
+HOT_STANDBY      = True            # pre-set leverage, keep order payloads ready
+STANDBY_REFRESH  = 5               # balance / mark price refresh period (s)
+PARALLEL_PROTECTION = True         # submit TP and SL legs concurrently
+PROTECT_RETRIES     = 5            # per protective leg
+PROTECT_RETRY_DELAY = 0.1          # first backoff (s) for protective legs, doubles per attempt
+RECONCILE_INTERVAL  = 300          # REST reconcile of the user-data position book (s)
 WH_ALERT_URL     = "https://nitter.net/whale_alert"
-
-PAIR_CFG : Dict[str, Dict[str,Any]] = {
-    # symbol  :  tp%   sl%   lev   max_usd
-    "XRPUSDT":   {"tp":0.35,"sl":0.15,"lev":5,"usd":15_000},
-    "DOGEUSDT":  {"tp":0.60,"sl":0.25,"lev":3,"usd":10_000},
-    "TRUMPUSDT": {"tp":0.60,"sl":0.25,"lev":3,"usd": 5_000},
-    "SOLUSDT":   {"tp":0.35,"sl":0.15,"lev":5,"usd":15_000},
-    "LTCUSDT":   {"tp":0.35,"sl":0.15,"lev":5,"usd":12_000},
-}
-
-VALID_EXCHANGES = r"#(Binance|Coinbase|Bybit|Kraken|OKX|HTX)"
+TIMELINE_BACKEND = "http"          # "http" (selenium fallback) | "selenium" | "multi"
+INGEST_MIRRORS   = [WH_ALERT_URL, WH_ALERT_URL + "/rss"]   # nitter pages / RSS polled by "multi"
+INGEST_JSON_FEEDS = []             # JSON alert feeds polled by "multi"
+INGEST_WEBHOOK_PORT = None         # accept POSTed alerts on this port with "multi"
+SEEN_IDS_FILE    = "whale_flow_seen.json"
+TRACE_FILE       = "whale_flow_traces.jsonl"   # per-alert latency traces (None = off)
+METRICS_PORT     = None            # serve Prometheus text on this port
 
 logging.basicConfig(level=logging.INFO,
         format="%(asctime)s - %(levelname)s: %(message)s",
@@ -38,32 +45,37 @@ log = logging.getLogger("WhaleFlowBot")
 
 client = UMFutures(key=API_KEY, secret=API_SECRET)
 
+symbol_cache = SymbolInfoCache(client, ttl=SYMBOL_CACHE_TTL)
+
 def get_precision(symbol:str):
-    info = client.exchange_info()
-    for s in info['symbols']:
-        if s['symbol'] == symbol:
-            qty_prec   = int(s['quantityPrecision'])
-            price_prec = int(s['pricePrecision'])
-            step       = float([f for f in s['filters'] if f['filterType']=="LOT_SIZE"][0]['stepSize'])
-            tick       = float([f for f in s['filters'] if f['filterType']=="PRICE_FILTER"][0]['tickSize'])
-            return qty_prec, price_prec, step, tick
-    raise ValueError(f"Symbol {symbol} not found in exchangeInfo")
-
-def round_step(val, step):
-    return math.floor(val / step) * step
-
-def place_with_retry(params, max_retries=3):
+    return symbol_cache.get(symbol)
+
+def place_with_retry(params, max_retries=3, base_delay=1.0):
+    """Send ``params``, retrying with backoff; a filter rejection re-rounds them in place first."""
     for attempt in range(max_retries):
         try:
             return client.new_order(**params)
         except Exception as e:
-            backoff = 2 ** attempt
+            if isinstance(e, ClientError) and e.error_code in FILTER_ERROR_CODES:
+                # rounded with stale step/tick: refit from fresh exchangeInfo or the retry fails the same way
+                symbol_cache.invalidate(params['symbol'])
+                try:
+                    params.update(fit_to_filters(params, *symbol_cache.get(params['symbol'])))
+                except ValueError as ve:
+                    log.error(f"Not retrying order: {ve}")
+                    return None
+                if params.get('quantity') == 0:
+                    log.error(f"Qty rounds to 0 under the new filters, not retrying: {params}")
+                    return None
+            backoff = base_delay * 2 ** attempt
             log.warning(f"Order attempt {attempt+1} failed: {e}. Retry in {backoff}s")
             time.sleep(backoff)
     log.error(f"All retries failed for order: {params}")
     return None
 
 def position_open(symbol):
+    if tracker: return tracker.is_open(symbol)
+    if standby: return standby.is_open(symbol)
     try:
         for p in client.account()['positions']:
             if p['symbol']==symbol and float(p['positionAmt'])!=0:
@@ -76,107 +88,229 @@ def cancel_open_orders(symbol):
     try: client.cancel_open_orders(symbol=symbol)
     except ClientError as e: log.warning(f"Cancel orders error: {e}")
 
-OPEN_POS = {}   # symbol → {qty, entry, tp_id, sl_id}
-
-def short_perp(symbol, cfg):
-    if position_open(symbol):
-        log.info(f"Position already open on {symbol}")
-        return
-    cancel_open_orders(symbol)
-
-    # leverage
-    try: client.change_leverage(symbol=symbol, leverage=cfg['lev'])
-    except ClientError as e: log.warning(f"Leverage set error: {e}")
-
-    qty_prec, price_prec, step, tick = get_precision(symbol)
-    mark_price = float(client.mark_price(symbol=symbol)['markPrice'])
-    bal        = float(client.balance(asset="USDT")[0]['balance'])
-
-    notional_cap = min(cfg['usd'], bal*ACCOUNT_RISK*cfg['lev'])
-    qty = round_step(notional_cap / mark_price, step)
-    if qty==0:
-        log.warning(f"Qty rounds to 0 for {symbol}. Skip.")
-        return
-
-    res = place_with_retry({
-        "symbol": symbol,
-        "side":   "SELL",
-        "type":   "MARKET",
-        "quantity": qty
-    })
-    if not res: return
-    entry = float(res.get('avgPrice') or mark_price)
-
-    tp_price = round(entry*(1-cfg['tp']/100), price_prec)
-    sl_price = round(entry*(1+cfg['sl']/100), price_prec)
+OPEN_POS = {}   # symbol → {qty, entry, tp_id, sl_id, pnl, ...}, kept current by the tracker
+tracker  = None
+protect_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="protect")
+standby  = None
 
-    place_with_retry({
+def place_protection(symbol, tp_price, sl_price, acked_at, trace=None):
+    """Submit TP and SL legs (concurrently unless disabled), each with its own retries."""
+    legs = [{
         "symbol": symbol,
         "side":   "BUY",
         "type":   "TAKE_PROFIT_MARKET",
         "stopPrice": tp_price,
         "closePosition": True,
         "workingType": "CONTRACT_PRICE"   # to avoid dual trigger rules
-    })
-
-    place_with_retry({
+    }, {
         "symbol": symbol,
         "side":   "BUY",
         "type":   "STOP_MARKET",
         "stopPrice": sl_price,
         "closePosition": True,
         "workingType": "CONTRACT_PRICE"
-    })
+    }]
+    def place_leg(params, name):
+        res = place_with_retry(params, PROTECT_RETRIES, PROTECT_RETRY_DELAY)
+        if trace: trace.ack(name, res)
+        return res
+    if PARALLEL_PROTECTION:
+        futs = [protect_pool.submit(place_leg, p, n) for p, n in zip(legs, ("tp", "sl"))]
+        tp_res, sl_res = [f.result() for f in futs]
+    else:
+        tp_res, sl_res = [place_leg(p, n) for p, n in zip(legs, ("tp", "sl"))]
+    unprotected_ms = (time.perf_counter() - acked_at) * 1000
+    if not sl_res:
+        log.error(f"STOP LOSS NOT PLACED for {symbol} – position is unprotected")
+    return tp_res, sl_res, unprotected_ms
+
+def cold_entry(symbol, cfg, timer):
+    """Build the entry order from live REST calls (no hot standby available)."""
+    with timer.stage("position"):
+        if position_open(symbol):
+            log.info(f"Position already open on {symbol}")
+            return None, None
+    with timer.stage("cancel"):
+        cancel_open_orders(symbol)
+
+    # leverage
+    with timer.stage("leverage"):
+        try: client.change_leverage(symbol=symbol, leverage=cfg['lev'])
+        except ClientError as e: log.warning(f"Leverage set error: {e}")
+
+    with timer.stage("precision"):
+        qty_prec, price_prec, step, tick = get_precision(symbol)
+    with timer.stage("mark_price"):
+        mark_price = float(client.mark_price(symbol=symbol)['markPrice'])
+    with timer.stage("balance"):
+        bal = next(float(b['balance']) for b in client.balance() if b['asset']=="USDT")
 
-    OPEN_POS[symbol] = {'qty':qty,'time':time.time()}
+    qty = position_qty(cfg, bal, mark_price, step, qty_prec, ACCOUNT_RISK)
+    return {"symbol": symbol, "side": "SELL", "type": "MARKET", "quantity": qty}, mark_price
+
+def short_perp(symbol, cfg, trace=None):
+    timer = StageTimer(symbol, trace)
+    params = standby.intent(symbol) if standby else None
+    if params:
+        with timer.stage("position"):
+            if position_open(symbol):
+                log.info(f"Position already open on {symbol}")
+                return
+        mark_price = standby.mark_prices[symbol]
+    else:
+        params, mark_price = cold_entry(symbol, cfg, timer)
+        if params is None: return
+    if params['quantity']==0:
+        log.warning(f"Qty rounds to 0 for {symbol}. Skip.")
+        return
+
+    with timer.stage("entry"):
+        res = place_with_retry(params)
+    if not res: return
+    acked_at = time.perf_counter()
+    if trace: trace.ack("entry", res)
+    qty   = params['quantity']
+    entry = float(res.get('avgPrice') or 0) or mark_price
+    if standby: standby.mark_open(symbol)
+    if tracker: tracker.note_entry(symbol, qty, entry)
+    qty_prec, price_prec, step, tick = get_precision(symbol)
+
+    tp_price, sl_price = protective_prices(entry, cfg, price_prec)
+
+    with timer.stage("protect"):
+        tp_res, sl_res, unprotected_ms = place_protection(symbol, tp_price, sl_price, acked_at, trace)
+
+    orders = dict(tp_id=(tp_res or {}).get('orderId'), sl_id=(sl_res or {}).get('orderId'),
+                  unprotected_ms=unprotected_ms)
+    if tracker: tracker.note_orders(symbol, **orders)
+    else: OPEN_POS.setdefault(symbol, {}).update(qty=qty, entry=entry, time=time.time(), **orders)
     log.info(f"Opened SHORT {symbol} qty={qty} entry={entry}, TP={tp_price}, SL={sl_price}")
+    log.info(f"{symbol} unprotected for {unprotected_ms:.1f}ms after entry ack")
+    log.info(f"Latency {timer.summary()}")
+    return timer
+
+#  TIMELINE SOURCE
+def make_timeline_source(backend=TIMELINE_BACKEND, url=WH_ALERT_URL):
+    if backend == "selenium":
+        return SeleniumTimelineSource(url)
+    return FallbackTimelineSource(HttpTimelineSource(url), SeleniumTimelineSource(url))
+
+def make_ingest():
+    """All configured feeds polled concurrently; first copy of each alert wins.
+
+    Seen ids are kept per source next to SEEN_IDS_FILE, so alerts posted while
+    the bot was down are picked up after a restart, as with a single source.
+    """
+    sources = mirror_sources(INGEST_MIRRORS) + [JsonFeedSource(u) for u in INGEST_JSON_FEEDS]
+    if INGEST_WEBHOOK_PORT: sources.append(WebhookSource(INGEST_WEBHOOK_PORT))
+    return MultiSourceIngest(sources, interval=CHECK_INTERVAL, seen_path=SEEN_IDS_FILE)
 
-#  SELENIUM TWEET SCRAPER
-opt = Options(); opt.add_argument("--headless")
-driver = webdriver.Firefox(options=opt)
-driver.set_page_load_timeout(30)
-
-last_id = None
-amount_re = re.compile(r'([\d,]+(?:\.\d+)?)\s+#([A-Z0-9]+)')
-usd_re    = re.compile(r'\$([\d,]+(?:\.\d+)?)\s+USD', re.I)
-wallet_to_cex = re.compile(r'unknown wallet.*?to\s+' + VALID_EXCHANGES, re.I)
-
-def fetch_latest_tweet():
-    global last_id
-    driver.get(WH_ALERT_URL)
-    first = driver.find_elements(By.CSS_SELECTOR, ".timeline-item")[0]
-    tid   = first.get_attribute("data-id")
-    if tid==last_id: return None
-    last_id = tid
-    return first.text
+source = None
+cursor = None
+tracer = None
+
+def fetch_new_tweets():
+    """New alert texts, or (text, trace) pairs while tracing."""
+    items = cursor.poll()
+    log.debug(f"{source.name} fetch={source.last_fetch_ms:.0f}ms parse={source.last_parse_ms:.1f}ms")
+    for it in items:
+        log.info(f"New tweet {it['id']} via {it.get('source', source.name)} (fetch {source.last_fetch_ms:.0f}ms, parse {source.last_parse_ms:.1f}ms)")
+    if tracer is None:
+        return [it['text'] for it in items]
+    alerts = []
+    for it in items:
+        trace = tracer.start(it['id'], it.get('arrived_ms'))
+        trace.attrs.update(source=it.get('source', source.name), fetch_ms=round(source.last_fetch_ms, 1))
+        alerts.append((it['text'], trace))
+    return alerts
 
 def parse_tweet(txt):
-    if not wallet_to_cex.search(txt): return None
-    amt_m = amount_re.search(txt); usd_m = usd_re.search(txt)
-    if not amt_m: return None
-    amount, coin = amt_m.groups()
-    usd_val = float(usd_m.group(1).replace(',','')) if usd_m else 0
-    return dict(coin=coin.upper(), usd=usd_val)
-
-log.info("Whale flow bot started.")
-try:
-    while True:
-        try:
-            t = fetch_latest_tweet()
-            if t:
-                info = parse_tweet(t)
-                if info and info['usd']>=MIN_NOTIONAL_USD:
-                    sym = info['coin'] + "USDT"
-                    if sym in PAIR_CFG:
-                        log.info(f"Signal: {info['coin']} → CEX  (${info['usd']:,})")
-                        short_perp(sym, PAIR_CFG[sym])
-                    else:
-                        log.info(f"{sym} not in config list.")
-        except Exception as e:
-            log.error(f"Loop err: {e}")
-        time.sleep(CHECK_INTERVAL)
-except KeyboardInterrupt:
-    pass
-finally:
-    driver.quit()
-    log.info("Bot stopped.")
\ No newline at end of file
+    return signal_info(parse_alert(txt), TRADE_EXCHANGES)
+
+def evaluate_signal(alert):
+    """Return (symbol, cfg[, trace]) for a tradeable unknown-wallet → CEX alert, else None."""
+    txt, trace = alert if isinstance(alert, tuple) else (alert, None)
+    info = parse_tweet(txt)
+    if trace: trace.mark("parsed")
+    sig = signal_symbol(info, PAIR_CFG, MIN_NOTIONAL_USD)
+    if sig:
+        sym, cfg = sig
+        if cfg:
+            log.info(f"Signal: {info['coin']} → CEX  (${info['usd']:,})")
+            if trace:
+                trace.attrs.update(symbol=sym, usd=info['usd'])
+                return sym, cfg, trace
+            return sym, cfg
+        log.info(f"{sym} not in config list.")
+    if trace: tracer.finish(trace, "not_configured" if sig else "no_signal")
+    return None
+
+_symbol_locks = defaultdict(threading.Lock)
+
+def execute_signal(sig):
+    symbol, cfg, *rest = sig
+    trace = rest[0] if rest else None
+    if trace: trace.mark("dispatched")
+    timer = None
+    try:
+        with _symbol_locks[symbol]:   # one order flow per symbol at a time
+            timer = short_perp(symbol, cfg, trace)
+        return timer
+    finally:
+        if trace:
+            record = tracer.finish(trace, "ordered" if timer else "skipped")
+            if timer and trace.posted_ms:
+                lat = record['latency']
+                log.info(f"{symbol} tweet→seen {lat['post_to_seen_ms']:.0f}ms, "
+                         f"seen→entry ack {lat.get('seen_to_entry_ack_ms', float('nan')):.1f}ms")
+
+def main():
+    global source, cursor, standby, tracker, tracer
+    multi = TIMELINE_BACKEND == "multi"
+    if TRACE_FILE:
+        tracer = Tracer(TRACE_FILE)
+        if METRICS_PORT: tracer.serve(METRICS_PORT)
+    if multi:
+        # the ingest threads poll the feeds; the core blocks on its queue instead of sleeping
+        source = cursor = make_ingest()
+        cursor.start()
+    else:
+        source = make_timeline_source()
+        cursor = TimelineCursor(source, SeenIds(SEEN_IDS_FILE))
+    tracker = PositionTracker(OPEN_POS, on_close=cancel_open_orders)
+    tracker.reconcile(client)
+    user_stream = UserDataStream(client, tracker.apply)
+    user_stream.start()
+    symbol_cache.warm(PAIR_CFG)
+    symbol_cache.start()
+    if HOT_STANDBY:
+        standby = HotStandby(client, PAIR_CFG, symbol_cache, ACCOUNT_RISK, refresh_interval=STANDBY_REFRESH)
+        standby.prepare()
+        standby.start()
+    core = WhaleBotCore(poll=fetch_new_tweets,
+                        evaluate=evaluate_signal,
+                        execute=execute_signal,
+                        monitor=lambda: tracker.reconcile(client),
+                        poll_interval=0 if multi else CHECK_INTERVAL,
+                        monitor_interval=RECONCILE_INTERVAL)
+    log.info("Whale flow bot started.")
+    try:
+        asyncio.run(core.run())
+    finally:
+        source.close()
+        symbol_cache.stop()
+        user_stream.stop()
+        if standby: standby.stop()
+        if multi:
+            for name, st in source.source_stats().items():
+                log.info(f"Ingest {name}: {st}")
+        if tracer:
+            for name in ("post_to_seen_ms", "seen_to_entry_ack_ms", "post_to_entry_exchange_ms"):
+                if name in tracer.histograms:
+                    log.info(f"Latency {name}: {tracer.summary()[name]}")
+            tracer.close()
+        log.info(f"Symbol cache stats: {symbol_cache.stats()}")
+        log.info("Bot stopped.")
+
+if __name__ == "__main__":
+    main()
@@ -1,206 +1,373 @@
 import pandas as pd
 import numpy as np
-import requests
-import time
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import io
 import matplotlib.pyplot as plt
 
-def analyze_whale_transfers(csv_file="whale_alert_data.csv"):
-    
-    print(f"Loading data from {csv_file}...")
+from kline_loader import KlineLoader, WEIGHT_LIMIT
+from kline_store import KlineStore
+from impact_engine import compute_impact, multi_horizon_impact, CandleIndex, DEFAULT_HORIZONS, BASELINE_CANDLES
+from timestamp_normalizer import to_utc
+from entity_registry import annotate, UNKNOWN, EXCHANGE
+from alert_store import AlertStore
+from running_stats import RunningStats, QuantileSketch
+
+SYMBOL_MAP = {
+    'BTC': 'BTCUSDT',
+    'ETH': 'ETHUSDT',
+    'XRP': 'XRPUSDT',
+    'SOL': 'SOLUSDT',
+    'USDT': 'BTCUSDT',  # For stablecoins, check BTC as a proxy
+    'USDC': 'BTCUSDT'
+}
+
+STORE_COLUMNS = ['currency', 'amount', 'usd_value', 'timestamp', 'to_entity']
+QUANTILES = (0.1, 0.5, 0.9)
+
+def get_binance_symbol(currency):
+    if currency in SYMBOL_MAP:
+        return SYMBOL_MAP[currency]
+    else:
+        return f"{currency}USDT"
+
+def filter_transfers(df):
+    """Unknown wallet -> exchange transfers from a chunk in the CSV layout."""
+    if 'timestamp' in df.columns and len(df) and not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+        # naive (older scrapes) and +00:00 values are both UTC
+        df['timestamp'] = to_utc(df['timestamp'])
     
-    df = pd.read_csv(csv_file)
-    print(f"Loaded {len(df)} transactions")
+    # entity type codes are stored by the scraper/backfill; older CSVs get them here
+    if 'from_type' not in df.columns or 'to_type' not in df.columns:
+        annotate(df)
     
-    if 'timestamp' in df.columns and isinstance(df['timestamp'].iloc[0], str):
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
+    unknown_to_exchange = (df['from_type'] == UNKNOWN) & (df['to_type'] == EXCHANGE)
+    return df[unknown_to_exchange].copy()
+
+def transfer_ms(df):
+    return df['timestamp'].values.astype('datetime64[ms]').astype(np.int64)
+
+def symbol_windows(tx_ms, window_minutes, horizons):
+    """``[(start_ms, end_ms), ...]`` covering the main window, every horizon and the volume baseline."""
+    lookback = (BASELINE_CANDLES if horizons else 0) * 60_000
+    lookahead = max([window_minutes, *horizons]) * 60_000
+    return [(t - lookback, t + lookahead) for t in tx_ms.tolist()]
+
+def transfer_windows(filtered_df, window_minutes, horizons):
+    """``{symbol: [(start_ms, end_ms), ...]}`` for every symbol in the transfers."""
+    symbols = filtered_df['currency'].map(get_binance_symbol)
+    return {symbol: symbol_windows(transfer_ms(group), window_minutes, horizons)
+            for symbol, group in filtered_df.groupby(symbols, sort=False)}
+
+def impact_arrays(candles, tx_ms, window_ms, horizons):
+    """Compact NumPy impact results for one symbol: compute_impact's arrays plus the
+    horizon table as position / horizon / metric-code / value columns."""
+    index = CandleIndex.from_arrays(candles)
+    result = compute_impact(candles['open_time'], candles['open'], candles['low'], tx_ms, window_ms,
+                            low_table=index.low_table)
+    if horizons:
+        table = multi_horizon_impact(index, tx_ms, horizons)
+        codes, names = pd.factorize(table['metric'])
+        result['horizon'] = (table['transfer_id'].to_numpy(np.int32), table['horizon_min'].to_numpy(np.int16),
+                             codes.astype(np.int8), list(names), table['value'].to_numpy(float))
+    return result
+
+def symbol_task(task):
+    """Process-pool worker: load one symbol's candles once; returns (impact_arrays or None, requests made)."""
+    symbol, tx_ms, cache_dir, offline, weight_limit, window_minutes, horizons = task
+    store = KlineStore(cache_dir) if cache_dir else None
+    loader = KlineLoader(max_workers=1, store=store, offline=offline, weight_limit=weight_limit)
+    with contextlib.redirect_stdout(io.StringIO()):   # per-worker fetch chatter would interleave
+        loader.load({symbol: symbol_windows(tx_ms, window_minutes, horizons)})
+    candles = loader.arrays(symbol)
+    if candles is None:
+        return None, loader.requests_made
+    return impact_arrays(candles, tx_ms, window_minutes * 60_000, horizons), loader.requests_made
+
+def symbol_impact(symbol, group, impact, verbose=True):
+    """Impact rows and the horizon table for one symbol's transfers from its impact_arrays."""
+    horizon_table = None
+    if 'horizon' in impact:
+        pos, horizon_min, codes, names, values = impact['horizon']
+        horizon_table = pd.DataFrame({'transfer_id': group.index.values[pos], 'horizon_min': horizon_min.astype(np.int64),
+                                      'metric': np.asarray(names, dtype=object)[codes], 'value': values})
+    valid = impact['valid']
+    if verbose:
+        print(f"{symbol}: {valid.sum()}/{len(group)} transfers with price data")
+    if not valid.any():
+        return None, horizon_table
     
-    exchanges = [
-        'Binance', 'Coinbase', 'Kraken', 'Bitfinex', 'HTX', 'Aave', 'OKX',
-        'Bybit', 'KuCoin', 'Coinbase Institutional', 'Bitstamp', 'Crypto.com'
-    ]
+    rows = group[valid]
+    price_at_tx = impact['price_at_tx'][valid]
+    lowest_price = impact['lowest_price'][valid]
+    return pd.DataFrame({
+        'transaction_id': rows.index,
+        'currency': rows['currency'].values,
+        'amount': rows['amount'].values,
+        'usd_value': rows['usd_value'].values,
+        'timestamp': rows['timestamp'].values,
+        'to_exchange': rows['to_entity'].values,
+        'price_at_tx': price_at_tx,
+        'lowest_price': lowest_price,
+        'minutes_until_lowest': impact['minutes_until_lowest'][valid],
+        'price_drop_pct': impact['price_drop_pct'][valid],
+        'price_drop_usd': price_at_tx - lowest_price
+    }), horizon_table
+
+def analyze_chunk(filtered_df, cache_dir, offline, max_workers, window_minutes, horizons, verbose=True, workers=1):
+    """Fetch/read the candles one set of transfers needs and compute their impact, one pass per symbol.
     
-    unknown_sources = df['from_entity'].str.contains('unknown', case=False, na=False)
+    With ``workers > 1`` the symbols are spread over a process pool; each worker
+    loads only its symbol's candles and sends back compact arrays.
+    """
+    filtered_df = filtered_df[filtered_df['timestamp'].notna()]
+    symbols = filtered_df['currency'].map(get_binance_symbol)
+    groups = dict(list(filtered_df.groupby(symbols, sort=False)))
+    window_ms = window_minutes * 60_000
+    impacts = {}
+    if workers > 1 and len(groups) > 1:
+        # biggest symbols first so no worker is left with a long tail; each gets a share of the weight budget
+        order = sorted(groups, key=lambda symbol: len(groups[symbol]), reverse=True)
+        weight_limit = WEIGHT_LIMIT // min(workers, len(groups))
+        with ProcessPoolExecutor(max_workers=min(workers, len(groups))) as pool:
+            futures = {symbol: pool.submit(symbol_task, (symbol, transfer_ms(groups[symbol]), cache_dir, offline,
+                                                         weight_limit, window_minutes, horizons))
+                       for symbol in order}
+            done = {symbol: futures[symbol].result() for symbol in groups}
+        impacts = {symbol: impact for symbol, (impact, _) in done.items()}
+        if verbose:
+            print(f"Made {sum(n for _, n in done.values())} kline requests in {len(futures)} worker tasks")
+    else:
+        # One merged, pooled fetch per symbol instead of one request per transfer
+        store = KlineStore(cache_dir) if cache_dir else None
+        loader = KlineLoader(max_workers=max_workers, store=store, offline=offline)
+        loader.load(transfer_windows(filtered_df, window_minutes, horizons))
+        if verbose:
+            print(f"Made {loader.requests_made} kline requests")
+        for symbol, group in groups.items():
+            candles = loader.arrays(symbol)
+            impacts[symbol] = None if candles is None else impact_arrays(candles, transfer_ms(group), window_ms, horizons)
     
-    exchange_destinations = df['to_entity'].apply(
-        lambda x: any(exchange.lower() in str(x).lower() for exchange in exchanges)
-    )
+    results = []
+    horizon_tables = []
+    for symbol, group in groups.items():
+        if impacts[symbol] is None:
+            if verbose:
+                print(f"No price data available for {symbol}")
+            continue
+        rows, horizon_table = symbol_impact(symbol, group, impacts[symbol], verbose)
+        if horizon_table is not None:
+            horizon_tables.append(horizon_table)
+        if rows is not None:
+            results.append(rows)
+    return results, horizon_tables
+
+def plot_price_drops(currency_stats, window_minutes):
+    plt.figure(figsize=(10, 6))
+    avg_drops = currency_stats['price_drop_pct']['mean'].sort_values()
+    avg_drops.plot(kind='barh', color='darkred')
+    plt.axvline(x=0, color='black', linestyle='-', alpha=0.3)
+    plt.title(f'Average Price Drop Within {window_minutes} Minutes After Whale Transfer', fontsize=14)
+    plt.xlabel('Price Drop (%)', fontsize=12)
+    plt.ylabel('Currency', fontsize=12)
+    plt.grid(axis='x', linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.savefig('price_drop_by_currency.png')
+
+def analyze_whale_transfers(csv_file="whale_alert_data.csv", max_workers=4,
+                            cache_dir="kline_cache", offline=False,
+                            window_minutes=15, horizons=DEFAULT_HORIZONS, workers=1):
     
-    unknown_to_exchange = unknown_sources & exchange_destinations
+    print(f"Loading data from {csv_file}...")
     
-    filtered_df = df[unknown_to_exchange].copy()
+    if csv_file.endswith(".db"):
+        # alert_store: the type filter runs in SQLite and only the needed columns are read
+        with AlertStore(csv_file) as store:
+            print(f"Store holds {len(store)} transactions")
+            filtered_df = store.query(from_type=UNKNOWN, to_type=EXCHANGE, columns=STORE_COLUMNS)
+        filtered_df['currency'] = filtered_df['currency'].astype(str)
+    else:
+        df = pd.read_csv(csv_file)
+        print(f"Loaded {len(df)} transactions")
+        filtered_df = filter_transfers(df)
     print(f"Found {len(filtered_df)} transactions from unknown wallets to exchanges")
     
     if len(filtered_df) == 0:
         print("No transactions match the criteria")
         return pd.DataFrame()
     
-    symbol_map = {
-        'BTC': 'BTCUSDT',
-        'ETH': 'ETHUSDT',
-        'XRP': 'XRPUSDT',
-        'SOL': 'SOLUSDT',
-        'USDT': 'BTCUSDT',  # For stablecoins, check BTC as a proxy
-        'USDC': 'BTCUSDT'
-    }
-    
-    def get_binance_symbol(currency):
-        if currency in symbol_map:
-            return symbol_map[currency]
-        else:
-            return f"{currency}USDT"
-    
-    def fetch_price_data(symbol, start_time, end_time, interval="1m"):
-        try:
-            endpoint = "https://api.binance.com/api/v3/klines"
-            params = {
-                'symbol': symbol,
-                'interval': interval,
-                'startTime': int(start_time),
-                'endTime': int(end_time),
-                'limit': 1000
-            }
-            
-            response = requests.get(endpoint, params=params)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if not data:
-                    print(f"No data returned for {symbol}")
-                    return None
-                
-                df = pd.DataFrame(data, columns=[
-                    'open_time', 'open', 'high', 'low', 'close', 'volume',
-                    'close_time', 'quote_asset_volume', 'number_of_trades',
-                    'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-                ])
-                
-                df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
-                df['close_time'] = pd.to_datetime(df['close_time'], unit='ms')
-                
-                for col in ['open', 'high', 'low', 'close', 'volume']:
-                    df[col] = df[col].astype(float)
-                
-                return df
-            
-            else:
-                print(f"Error fetching price data: {response.status_code} - {response.text}")
-                return None
-                
-        except Exception as e:
-            print(f"Exception while fetching price data: {e}")
-            return None
-    
-    # Analyze price impact
-    results = []
-    
+    # Analyze price impact: one vectorized pass per symbol
     print("Analyzing price impact after whale transfers...")
-    for i, row in filtered_df.iterrows():
-        try:
-            # Get transaction details
-            currency = row['currency']
-            timestamp = row['timestamp']
-            amount = row['amount']
-            usd_value = row['usd_value']
-            to_entity = row['to_entity']
-            
-            symbol = get_binance_symbol(currency)
-            
-            print(f"Analyzing {amount} {currency} transferred to {to_entity} at {timestamp}")
-            
-            # Calculate time range for price data
-            start_time = int((timestamp - timedelta(minutes=0)).timestamp() * 1000)
-            end_time = int((timestamp + timedelta(minutes=15)).timestamp() * 1000)
-            
-            price_data = fetch_price_data(symbol, start_time, end_time)
-            
-            if price_data is None or len(price_data) == 0:
-                print(f"No price data available for {symbol} at {timestamp}")
-                continue
-            
-            price_data['time_diff'] = abs(price_data['open_time'] - timestamp)
-            closest_index = price_data['time_diff'].idxmin()
-            closest_row = price_data.loc[closest_index]
-            price_at_tx = closest_row['open']
-            
-            after_tx = price_data[price_data['open_time'] >= pd.Timestamp(timestamp)]
-            
-            if len(after_tx) == 0:
-                print(f"No price data available after the transaction time for {symbol}")
-                continue
-            
-            # Find the lowest price in the window after the transaction
-            lowest_price = after_tx['low'].min()
-            lowest_price_time = after_tx.loc[after_tx['low'].idxmin(), 'open_time']
-            
-            # Calculate price drop percentage
-            price_drop_pct = ((lowest_price - price_at_tx) / price_at_tx) * 100
-            minutes_until_lowest = (lowest_price_time - timestamp).total_seconds() / 60
-            
-            result = {
-                'transaction_id': i,
-                'currency': currency,
-                'amount': amount,
-                'usd_value': usd_value,
-                'timestamp': timestamp,
-                'to_exchange': to_entity,
-                'price_at_tx': price_at_tx,
-                'lowest_price': lowest_price,
-                'minutes_until_lowest': minutes_until_lowest,
-                'price_drop_pct': price_drop_pct,
-                'price_drop_usd': price_at_tx - lowest_price
-            }
-            
-            results.append(result)
-            print(f"Price impact: {price_drop_pct:.2f}% drop within {minutes_until_lowest:.1f} minutes")
-            
-            time.sleep(0.2)
-            
-        except Exception as e:
-            print(f"Error analyzing transaction {i}: {e}")
-            continue
+    results, horizon_tables = analyze_chunk(filtered_df, cache_dir, offline, max_workers,
+                                            window_minutes, horizons, workers=workers)
     
     if results:
-        results_df = pd.DataFrame(results)
-        
+        results_df = pd.concat(results).sort_values('transaction_id').reset_index(drop=True)
+    
         currency_stats = results_df.groupby('currency').agg({
             'price_drop_pct': ['mean', 'min', 'count'],
             'minutes_until_lowest': 'mean'
         })
-        
+    
         print("\nPrice Impact Summary by Currency:")
         print(currency_stats)
-        
+    
         results_df.to_csv("whale_price_impact.csv", index=False)
         print(f"Saved detailed price impact data to whale_price_impact.csv")
-        
-        plt.figure(figsize=(10, 6))
-        avg_drops = currency_stats['price_drop_pct']['mean'].sort_values()
-        avg_drops.plot(kind='barh', color='darkred')
-        plt.axvline(x=0, color='black', linestyle='-', alpha=0.3)
-        plt.title('Average Price Drop Within 10 Minutes After Whale Transfer', fontsize=14)
-        plt.xlabel('Price Drop (%)', fontsize=12)
-        plt.ylabel('Currency', fontsize=12)
-        plt.grid(axis='x', linestyle='--', alpha=0.7)
-        plt.tight_layout()
-        plt.savefig('price_drop_by_currency.png')
-        
+    
+        if horizon_tables:
+            horizons_df = pd.concat(horizon_tables, ignore_index=True)
+            horizons_df.to_csv("whale_price_impact_horizons.csv", index=False)
+            print("\nMean Impact by Horizon (minutes):")
+            print(horizons_df.pivot_table(index='metric', columns='horizon_min', values='value', aggfunc='mean'))
+            print(f"Saved {len(horizons_df)} horizon x metric rows to whale_price_impact_horizons.csv")
+    
+        plot_price_drops(currency_stats, window_minutes)
+    
         return results_df
     else:
         print("No valid price impact data was produced")
         return pd.DataFrame()
 
+def iter_transfer_chunks(source, chunksize=50_000):
+    """Filtered transfer chunks from a CSV path, an alert_store .db, or an iterable of
+    DataFrames / lists of alert dicts (e.g. pages handed to a scraper sink)."""
+    if isinstance(source, str) and source.endswith(".db"):
+        with AlertStore(source) as store:
+            for chunk in store.iter_query(chunksize, from_type=UNKNOWN, to_type=EXCHANGE, columns=STORE_COLUMNS):
+                chunk['currency'] = chunk['currency'].astype(str)
+                yield chunk
+        return
+    chunks = pd.read_csv(source, chunksize=chunksize) if isinstance(source, str) else source
+    offset = 0
+    for chunk in chunks:
+        if not isinstance(chunk, pd.DataFrame):
+            chunk = pd.DataFrame(list(chunk))
+        if not isinstance(source, str):
+            # keep transaction ids unique across pages
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield filter_transfers(chunk)
+
+def stream_whale_transfers(source="whale_alert_data.csv", chunksize=50_000, max_workers=4,
+                           cache_dir="kline_cache", offline=False,
+                           window_minutes=15, horizons=DEFAULT_HORIZONS,
+                           out="whale_price_impact.csv", horizons_out="whale_price_impact_horizons.csv", workers=1):
+    """Chunked analyze_whale_transfers: memory stays flat in the input size.
+    
+    Each chunk is filtered, analysed against the candle cache and appended to
+    ``out``; per-currency summaries are running aggregates (plus a quantile
+    sketch), so the summary table and the plot are those of the batch run.
+    Quantiles, including the overall ``median_drop_approx``, come from the
+    sketch and are only within 1% of the exact ones.
+    Returns a dict with ``currency_stats``, ``quantiles``, ``horizon_means``,
+    ``top_drops`` and ``overall``.
+    """
+    print(f"Streaming data from {source if isinstance(source, str) else 'iterator'} in chunks of {chunksize}...")
+    drops, minutes, sketches = {}, {}, {}
+    overall = {'drop': RunningStats(), 'minutes': RunningStats(), 'sketch': QuantileSketch()}
+    horizon_sums = {}
+    top = pd.DataFrame()
+    written = horizon_rows = transfers = 0
+    
+    for n, filtered_df in enumerate(iter_transfer_chunks(source, chunksize)):
+        transfers += len(filtered_df)
+        if len(filtered_df) == 0:
+            continue
+        results, horizon_tables = analyze_chunk(filtered_df, cache_dir, offline, max_workers,
+                                                window_minutes, horizons, verbose=False, workers=workers)
+        if results:
+            chunk_df = pd.concat(results).sort_values('transaction_id').reset_index(drop=True)
+            chunk_df.to_csv(out, index=False, mode='a' if written else 'w', header=not written)
+            written += len(chunk_df)
+            for currency, group in chunk_df.groupby('currency'):
+                drops.setdefault(currency, RunningStats()).add(group['price_drop_pct'].values)
+                minutes.setdefault(currency, RunningStats()).add(group['minutes_until_lowest'].values)
+                sketches.setdefault(currency, QuantileSketch()).add(group['price_drop_pct'].values)
+            overall['drop'].add(chunk_df['price_drop_pct'].values)
+            overall['minutes'].add(chunk_df['minutes_until_lowest'].values)
+            overall['sketch'].add(chunk_df['price_drop_pct'].values)
+            top = pd.concat([top, chunk_df.nsmallest(5, 'price_drop_pct')]).nsmallest(5, 'price_drop_pct')
+        if horizon_tables:
+            chunk_h = pd.concat(horizon_tables, ignore_index=True)
+            chunk_h.to_csv(horizons_out, index=False, mode='a' if horizon_rows else 'w', header=not horizon_rows)
+            horizon_rows += len(chunk_h)
+            valid = chunk_h[chunk_h['value'].notna()]
+            for key, s in valid.groupby(['metric', 'horizon_min'])['value'].agg(['sum', 'count']).iterrows():
+                total, count = horizon_sums.get(key, (0.0, 0))
+                horizon_sums[key] = (total + s['sum'], count + s['count'])
+        print(f"Chunk {n}: {len(filtered_df)} transfers, {written} impact rows so far")
+    
+    print(f"Found {transfers} transactions from unknown wallets to exchanges")
+    if not written:
+        print("No valid price impact data was produced")
+        return {}
+    
+    currencies = sorted(drops)
+    currency_stats = pd.DataFrame({
+        ('price_drop_pct', 'mean'): [drops[c].mean for c in currencies],
+        ('price_drop_pct', 'min'): [drops[c].min for c in currencies],
+        ('price_drop_pct', 'count'): [drops[c].count for c in currencies],
+        ('minutes_until_lowest', 'mean'): [minutes[c].mean for c in currencies],
+    }, index=pd.Index(currencies, name='currency'))
+    quantiles = pd.DataFrame({f"p{int(q * 100)}": [sketches[c].quantile(q) for c in currencies] for q in QUANTILES},
+                             index=currency_stats.index)
+    
+    print("\nPrice Impact Summary by Currency:")
+    print(currency_stats)
+    print("\nPrice Drop Quantiles by Currency (sketch, ±1%):")
+    print(quantiles)
+    print(f"Saved detailed price impact data to {out}")
+    
+    horizon_means = None
+    if horizon_sums:
+        horizon_means = pd.Series({k: t / c for k, (t, c) in horizon_sums.items() if c}).unstack()
+        horizon_means.index.name, horizon_means.columns.name = 'metric', 'horizon_min'
+        print("\nMean Impact by Horizon (minutes):")
+        print(horizon_means)
+        print(f"Saved {horizon_rows} horizon x metric rows to {horizons_out}")
+    
+    plot_price_drops(currency_stats, window_minutes)
+    
+    return {'currency_stats': currency_stats, 'quantiles': quantiles, 'horizon_means': horizon_means,
+            'top_drops': top.reset_index(drop=True),
+            'overall': {'rows': written, 'mean_drop': overall['drop'].mean,
+                        'median_drop_approx': overall['sketch'].quantile(0.5),
+                        'mean_minutes': overall['minutes'].mean}}
+
 if __name__ == "__main__":
-    result = analyze_whale_transfers()
+    import argparse
+    
+    ap = argparse.ArgumentParser(description="Price impact of unknown wallet -> exchange whale transfers")
+    ap.add_argument("source", nargs="?", default="whale_alert_data.csv", help="alerts CSV or alert_store .db")
+    ap.add_argument("--workers", type=int, default=1, help="processes, one symbol at a time each")
+    ap.add_argument("--chunksize", type=int, help="stream the input in chunks of this many rows")
+    ap.add_argument("--cache-dir", default="kline_cache")
+    ap.add_argument("--offline", action="store_true", help="use cached candles only")
+    args = ap.parse_args()
+    
+    if args.chunksize:
+        summary = stream_whale_transfers(args.source, args.chunksize, cache_dir=args.cache_dir,
+                                         offline=args.offline, workers=args.workers)
+        result = summary.get('top_drops', pd.DataFrame())
+        overall = summary.get('overall')
+    else:
+        result = analyze_whale_transfers(args.source, cache_dir=args.cache_dir, offline=args.offline,
+                                         workers=args.workers)
+        if len(result) > 0:
+            overall = {'mean_drop': result['price_drop_pct'].mean(), 'median_drop': result['price_drop_pct'].median(),
+                       'mean_minutes': result['minutes_until_lowest'].mean()}
     
     if len(result) > 0:
         print("\nTop 5 Largest Price Drops:")
         top_drops = result.sort_values('price_drop_pct').head(5)
         for i, row in top_drops.iterrows():
             print(f"{row['currency']}: {row['price_drop_pct']:.2f}% drop after {row['amount']} units transferred to {row['to_exchange']}")
-        
+    
         print("\nOverall Statistics:")
-        print(f"Average Price Drop: {result['price_drop_pct'].mean():.2f}%")
-        print(f"Median Price Drop: {result['price_drop_pct'].median():.2f}%")
-        print(f"Average Time to Lowest Price: {result['minutes_until_lowest'].mean():.2f} minutes")
\ No newline at end of file
+        print(f"Average Price Drop: {overall['mean_drop']:.2f}%")
+        if 'median_drop_approx' in overall:
+            print(f"Median Price Drop (sketch, ±1%): {overall['median_drop_approx']:.2f}%")
+        else:
+            print(f"Median Price Drop: {overall['median_drop']:.2f}%")
+        print(f"Average Time to Lowest Price: {overall['mean_minutes']:.2f} minutes")